@@ -3,28 +3,48 @@ GeoTEO - Geospatial & Meteorological Dashboard
 Complete app with smart reports for every city showing weather and air quality information
 """
 
+import atexit
+import base64
+import mmap
 import dash
-from dash import dcc, html, Input, Output, State, callback, ctx, ALL, no_update
+import dash._callback
+import dash._utils
+from dash import dcc, html, Input, Output, State, callback, ctx, ALL, no_update, Patch, DiskcacheManager, ClientsideFunction
+from dash.exceptions import PreventUpdate
+import diskcache
 import dash_bootstrap_components as dbc
 import plotly.graph_objects as go
 import plotly.express as px
+import plotly.io as pio
 import pandas as pd
 import numpy as np
+import pyarrow.csv as pa_csv
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Optional
 from loguru import logger
 import sys
-import json
-import base64
+import time
 from pathlib import Path
+import orjson
+import flask
+from flask.json.provider import DefaultJSONProvider
+from flask_compress import Compress
 
 # Import backend modules
 from backend.api_client import OpenAQClient
 from backend.data_processor import DataProcessor
-from backend.cache_manager import CacheManager
+from backend.cache_manager import CacheManager, make_key
 from backend.weather_client import WeatherAPIClient
 from backend.ml_predictor import AirQualityPredictor
 from backend.report_generator import ReportGenerator
 from backend.database import Database
+from backend.cluster_index import ClusterIndex, viewport_from_relayout
+from backend.tiler import TilePyramid
+from backend.raster import render_density_image
+from backend.refresher import DataRefresher
+from backend.store_codec import encode_records, decode_records, decode_frame, export_table, lookup_record, search_records
 from backend.openai_client import OpenAIClient
 import config
 
@@ -38,12 +58,15 @@ db = Database()
 api_client = OpenAQClient(db=db)  # Pass db to check for stored API keys
 data_processor = DataProcessor()
 cache_manager = CacheManager()
-weather_client = WeatherAPIClient()
+weather_client = WeatherAPIClient(cache=cache_manager)  # Weather responses are shared across workers and users
 ml_predictor = AirQualityPredictor()
 report_gen = ReportGenerator()
 # Initialize OpenAI client - will check .env (config) first, then database
 openai_client = OpenAIClient(db=db)
 
+# Background callbacks run long jobs (PDF reports) in worker processes instead of blocking request threads
+background_callback_manager = DiskcacheManager(diskcache.Cache(str(config.CACHE_DIR / "background")))
+
 # Initialize Dash app
 app = dash.Dash(
     __name__,
@@ -56,131 +79,98 @@ app = dash.Dash(
         {"name": "viewport", "content": "width=device-width, initial-scale=1, maximum-scale=1, user-scalable=no"}
     ],
     title="GeoTEO - Geospatial & Meteorological Dashboard",
-    suppress_callback_exceptions=True
+    update_title=None,  # Keep the document title fixed instead of flashing "Updating..." on every callback
+    suppress_callback_exceptions=True,
+    serve_locally=config.SERVE_LOCALLY,  # Dash's own JS bundles come from the CDN unless configured otherwise
+    background_callback_manager=background_callback_manager
 )
 
-# Add global dark theme CSS
-app.index_string = '''
-<!DOCTYPE html>
-<html>
-    <head>
-        {%metas%}
-        <title>{%title%}</title>
-        {%favicon%}
-        {%css%}
-        <style>
-            body {
-                background-color: #1e1e1e !important;
-                color: #cccccc !important;
-            }
-            .card {
-                background-color: #2d2d30 !important;
-                border: 1px solid #3e3e42 !important;
-                border-radius: 0 !important;
-                color: #cccccc !important;
-            }
-            .card-header {
-                background-color: #252526 !important;
-                border-bottom: 1px solid #3e3e42 !important;
-                color: #cccccc !important;
-            }
-            .card-body {
-                background-color: #2d2d30 !important;
-                color: #cccccc !important;
-            }
-            .nav-link {
-                color: #cccccc !important;
-                border-radius: 0 !important;
-            }
-            .nav-link:hover {
-                background-color: #2a2d2e !important;
-                color: #ffffff !important;
-            }
-            .nav-link.active {
-                background-color: #094771 !important;
-                color: #ffffff !important;
-            }
-            .form-label {
-                color: #cccccc !important;
-            }
-            .text-muted {
-                color: #858585 !important;
-            }
-            .btn-primary {
-                background-color: #007acc !important;
-                border-color: #007acc !important;
-                border-radius: 0 !important;
-            }
-            .btn-primary:hover {
-                background-color: #005a9e !important;
-                border-color: #005a9e !important;
-            }
-            .btn-dark {
-                background-color: #2d2d30 !important;
-                border-color: #3e3e42 !important;
-                color: #cccccc !important;
-                border-radius: 0 !important;
-            }
-            .btn-dark:hover {
-                background-color: #3e3e42 !important;
-            }
-            .form-control, .form-select {
-                background-color: #1e1e1e !important;
-                border: 1px solid #3e3e42 !important;
-                color: #cccccc !important;
-                border-radius: 0 !important;
-            }
-            .form-control:focus, .form-select:focus {
-                background-color: #1e1e1e !important;
-                border-color: #007acc !important;
-                color: #cccccc !important;
-            }
-            .badge {
-                border-radius: 0 !important;
-            }
-            .modal-content {
-                background-color: #252526 !important;
-                border: 1px solid #3e3e42 !important;
-                border-radius: 0 !important;
-            }
-            .modal-header {
-                border-bottom: 1px solid #3e3e42 !important;
-                color: #cccccc !important;
-            }
-            .modal-body {
-                background-color: #252526 !important;
-                color: #cccccc !important;
-            }
-            .tab-content {
-                background-color: #2d2d30 !important;
-                color: #cccccc !important;
-            }
-            .nav-tabs .nav-link {
-                border-radius: 0 !important;
-                border: 1px solid #3e3e42 !important;
-                background-color: #2d2d30 !important;
-                color: #cccccc !important;
-            }
-            .nav-tabs .nav-link.active {
-                background-color: #1e1e1e !important;
-                border-bottom-color: #1e1e1e !important;
-                color: #007acc !important;
-            }
-        </style>
-    </head>
-    <body>
-        {%app_entry%}
-        <footer>
-            {%config%}
-            {%scripts%}
-            {%renderer%}
-        </footer>
-    </body>
-</html>
-'''
-
 server = app.server
 
+# Compress callback JSON, HTML and CSS; Brotli at a low quality level keeps the CPU cost per response small
+server.config.update(
+    COMPRESS_ALGORITHM=["br", "gzip"],
+    COMPRESS_BR_LEVEL=4,
+    COMPRESS_LEVEL=5,  # gzip fallback for clients without Brotli support
+    COMPRESS_MIMETYPES=["application/json", "text/html", "text/css", "application/javascript"],
+)
+Compress(server)
+# Asset URLs carry an mtime fingerprint (?m=...), so browsers can cache them long-term
+server.config["SEND_FILE_MAX_AGE_DEFAULT"] = config.ASSETS_MAX_AGE
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson for faster callback payload encoding/decoding"""
+    
+    option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.option).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+server.json = OrjsonProvider(server)
+# Dash encodes callback responses (figures included) through plotly's JSON engine; pin it to orjson
+# rather than relying on "auto" detection, so NumPy trace arrays are dumped without a tolist() pass
+pio.json.config.default_engine = "orjson"
+
+
+def _orjson_default(obj):
+    """Serialize the values orjson can't encode natively: Dash components, object arrays, NumPy scalars"""
+    if hasattr(obj, "to_plotly_json"):
+        return obj.to_plotly_json()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def callback_to_json(response):
+    """
+    Encode a callback response in a single orjson pass
+    
+    plotly's orjson engine gives up as soon as it meets a Dash component and re-walks the whole
+    response in Python before encoding; serializing components through a default hook avoids that.
+    Anything the hook can't handle still goes through plotly's encoder.
+    
+    Args:
+        response: Callback response dictionary
+        
+    Returns:
+        JSON string
+    """
+    try:
+        return orjson.dumps(response, default=_orjson_default,
+                            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode()
+    except TypeError:
+        return pio.json.to_json_plotly(response)
+
+
+# Dash has no public hook for encoding callback responses, so this replaces the private
+# dash._callback.to_json. Fail at import if an upgrade renames it or stops using plotly's encoder there,
+# rather than silently losing the patch (a re-import finds the previous patch in place)
+_dash_callback_to_json = getattr(dash._callback, "to_json", None)
+if _dash_callback_to_json is not dash._utils.to_json and getattr(_dash_callback_to_json, "__name__", None) != "callback_to_json":
+    raise RuntimeError(f"dash._callback.to_json is not Dash's encoder (found {_dash_callback_to_json!r}); "
+                       f"callback_to_json needs updating for dash {dash.__version__}")
+dash._callback.to_json = callback_to_json
+
+# Styles repeated across the server-rendered views; callbacks share these instead of rebuilding identical dicts
+CARD_STYLE = {"backgroundColor": "#2d2d30", "border": "1px solid #3e3e42"}
+TEXT_STYLE = {"color": "#cccccc"}
+MUTED_TEXT_STYLE = {"color": "#858585"}
+HEADER_TEXT_STYLE = {"fontWeight": "600"}
+BODY_TEXT_STYLE = {"color": "#cccccc", "lineHeight": "1.6"}
+LIST_CARD_STYLE = {"backgroundColor": "#2d2d30", "border": "1px solid #3e3e42", "color": "#cccccc"}
+LIST_ITEM_STYLE = {"color": "#858585", "marginBottom": "8px"}
+WEATHER_ROW_STYLE = {"marginBottom": "8px"}
+WEATHER_PANEL_STYLE = {"fontSize": "14px", "color": "#cccccc"}
+# Dark theme applied to every analytics figure
+DARK_FIGURE_LAYOUT = dict(plot_bgcolor="#1e1e1e", paper_bgcolor="#2d2d30", font_color="#cccccc")
+
 # App layout with sidebar navigation
 app.layout = html.Div([
     # Sidebar Navigation
@@ -259,10 +249,9 @@ app.layout = html.Div([
         # Search Modal
         dbc.Modal([
             dbc.ModalHeader("Search Location"),
-            dbc.ModalBody([
-                dbc.Input(id="search-input", placeholder="Search city, country...", type="text", className="mb-3", debounce=True),
-                html.Div(id="search-results")
-            ])
+            # The search input and results are built on first open (assets/controls.js)
+            dbc.ModalBody(id="search-modal-body", children=[]),
+            dcc.Store(id="search-debounce-ms", data=config.SEARCH_DEBOUNCE_MS)
         ], id="search-modal", size="lg", is_open=False),
         
         # Marker Action Modal - Enhanced for GeoTEO (Geospatial + Meteo)
@@ -290,7 +279,7 @@ app.layout = html.Div([
                         dbc.Row([
                             dbc.Col([
                                 html.H2(id="current-location", children="Global", style={"fontSize": "28px", "fontWeight": "600", "marginBottom": "4px"}),
-                                html.P(id="current-time", children=datetime.now().strftime("%A, %B %d"), style={"color": "rgba(255,255,255,0.8)", "marginBottom": "20px"}),
+                                html.P(id="current-time", children="", style={"color": "rgba(255,255,255,0.8)", "marginBottom": "20px"}),
                                 html.Div(id="data-status-alert", children=[])
                             ], width=12),
                         ]),
@@ -309,10 +298,10 @@ app.layout = html.Div([
                 
                 # Quick Stats
                 dbc.Row([
-                    dbc.Col([dbc.Card([dbc.CardBody([html.I(className="fas fa-map-marker-alt", style={"fontSize": "24px", "color": "#007acc"}), html.H3(id="stat-stations", children="0", style={"fontSize": "28px", "fontWeight": "700", "margin": "8px 0", "color": "#cccccc"}), html.P("Stations", style={"fontSize": "12px", "color": "#858585", "marginBottom": "0"})], style={"textAlign": "center", "backgroundColor": "#2d2d30"})], style={"border": "1px solid #3e3e42", "boxShadow": "0 2px 8px rgba(0,0,0,0.3)", "backgroundColor": "#2d2d30"})], width=3, xs=6, className="mb-3"),
-                    dbc.Col([dbc.Card([dbc.CardBody([html.I(className="fas fa-globe", style={"fontSize": "24px", "color": "#007acc"}), html.H3(id="stat-countries", children="0", style={"fontSize": "28px", "fontWeight": "700", "margin": "8px 0", "color": "#cccccc"}), html.P("Countries", style={"fontSize": "12px", "color": "#858585", "marginBottom": "0"})], style={"textAlign": "center", "backgroundColor": "#2d2d30"})], style={"border": "1px solid #3e3e42", "boxShadow": "0 2px 8px rgba(0,0,0,0.3)", "backgroundColor": "#2d2d30"})], width=3, xs=6, className="mb-3"),
-                    dbc.Col([dbc.Card([dbc.CardBody([html.I(className="fas fa-wind", style={"fontSize": "24px", "color": "#007acc"}), html.H3(id="stat-wind", children="--", style={"fontSize": "28px", "fontWeight": "700", "margin": "8px 0", "color": "#cccccc"}), html.P("Wind km/h", style={"fontSize": "12px", "color": "#858585", "marginBottom": "0"})], style={"textAlign": "center", "backgroundColor": "#2d2d30"})], style={"border": "1px solid #3e3e42", "boxShadow": "0 2px 8px rgba(0,0,0,0.3)", "backgroundColor": "#2d2d30"})], width=3, xs=6, className="mb-3"),
-                    dbc.Col([dbc.Card([dbc.CardBody([html.I(className="fas fa-tint", style={"fontSize": "24px", "color": "#007acc"}), html.H3(id="stat-humidity", children="--", style={"fontSize": "28px", "fontWeight": "700", "margin": "8px 0", "color": "#cccccc"}), html.P("Humidity %", style={"fontSize": "12px", "color": "#858585", "marginBottom": "0"})], style={"textAlign": "center", "backgroundColor": "#2d2d30"})], style={"border": "1px solid #3e3e42", "boxShadow": "0 2px 8px rgba(0,0,0,0.3)", "backgroundColor": "#2d2d30"})], width=3, xs=6, className="mb-3")
+                    dbc.Col([dbc.Card([dbc.CardBody([html.I(className="fas fa-map-marker-alt stat-icon"), html.H3(id="stat-stations", children="0", className="stat-value"), html.P("Stations", className="stat-label")], className="stat-card-body")], className="stat-card")], width=3, xs=6, className="mb-3"),
+                    dbc.Col([dbc.Card([dbc.CardBody([html.I(className="fas fa-globe stat-icon"), html.H3(id="stat-countries", children="0", className="stat-value"), html.P("Countries", className="stat-label")], className="stat-card-body")], className="stat-card")], width=3, xs=6, className="mb-3"),
+                    dbc.Col([dbc.Card([dbc.CardBody([html.I(className="fas fa-wind stat-icon"), html.H3(id="stat-wind", children="--", className="stat-value"), html.P("Wind km/h", className="stat-label")], className="stat-card-body")], className="stat-card")], width=3, xs=6, className="mb-3"),
+                    dbc.Col([dbc.Card([dbc.CardBody([html.I(className="fas fa-tint stat-icon"), html.H3(id="stat-humidity", children="--", className="stat-value"), html.P("Humidity %", className="stat-label")], className="stat-card-body")], className="stat-card")], width=3, xs=6, className="mb-3")
                 ]),
                 
                 # Map Card
@@ -335,60 +324,78 @@ app.layout = html.Div([
     # Hidden stores
     dcc.Store(id="locations-data"),
     dcc.Store(id="weather-data"),
+    dcc.Store(id="weather-render-key"),  # Identifies what weather-data was last requested for
+    dcc.Store(id="dashboard-stats"),
+    dcc.Store(id="plotly-template", data=pio.templates[pio.templates.default].to_plotly_json()),  # Sent once for clientside figures
     dcc.Store(id="map-type-store", data="markers"),
+    dcc.Store(id="map-render-mode"),
     dcc.Store(id="theme-store", data="light"),
     dcc.Store(id="current-view", data="map"),
     dcc.Store(id="selected-location", data=None),  # ISSUE-002: Store for selected location
     dcc.Store(id="clicked-location", data=None),  # Store for clicked marker location
-    dcc.Interval(id="interval-component", interval=300000, n_intervals=0),
+    dcc.Store(id="marker-modal-payload", data=None),  # Marker modal data rendered by assets/marker.js
+    dcc.Store(id="marker-modal-key", data=None),  # Identifies what marker-modal-payload was built for
+    dcc.Interval(id="interval-component", interval=config.DATA_REFRESH_INTERVAL * 1000, n_intervals=0),
     dcc.Download(id="download-report")  # Download component for reports
 ], style={"display": "flex", "minHeight": "100vh", "width": "100vw", "overflow": "hidden", "backgroundColor": "#1e1e1e"})
 
 
+@lru_cache(maxsize=1)
+def encoded_layout():
+    """Encode the static layout once, with an ETag identifying it"""
+    body = callback_to_json(app.layout)
+    return body, make_key("layout", body)
+
+
+def serve_layout():
+    """Serve the pre-encoded layout, answering 304 to browsers that already have it"""
+    body, etag = encoded_layout()
+    response = flask.Response(body, mimetype="application/json")
+    response.set_etag(etag)
+    return response.make_conditional(flask.request)
+
+
+# The layout never changes at runtime, so it isn't re-serialized on every page load
+server.view_functions[app.config.routes_pathname_prefix + "_dash-layout"] = serve_layout
+
+
 # Callbacks
 
 # Sidebar Navigation Callback
-@callback(
-    [Output("map-view", "style"), Output("other-views", "children"), Output("other-views", "style"), Output("page-title", "children"), Output("current-view", "data")],
+# Switching views is pure UI state, so it runs in the browser (assets/navigation.js)
+app.clientside_callback(
+    ClientsideFunction(namespace="navigation", function_name="switchView"),
+    [Output("map-view", "style"), Output("other-views", "style"), Output("page-title", "children"), Output("current-view", "data")],
     [Input("nav-map", "n_clicks"), Input("nav-analytics", "n_clicks"), 
      Input("nav-favorites", "n_clicks"), Input("nav-history", "n_clicks"), Input("nav-settings", "n_clicks"),
      Input("marker-add-favorite-btn", "n_clicks"), Input({"type": "search-favorite", "index": ALL}, "n_clicks")],
     State("current-view", "data")
 )
-def update_main_content(map_clicks, analytics_clicks, fav_clicks, hist_clicks, settings_clicks, marker_fav_clicks, search_fav_clicks, current_view):
-    ctx_triggered = ctx.triggered[0]["prop_id"] if ctx.triggered else ""
-    
-    if "nav-map" in ctx_triggered or (not ctx_triggered and current_view != "map"):
-        # Map View - show map, hide other views
-        return [
-            {"display": "block"},
-            html.Div(),
-            {"display": "none"},
-            "Map View",
-            "map"
-        ]
-    elif "nav-analytics" in ctx_triggered:
-        # Analytics View - hide map, show analytics
-        return [
-            {"display": "none"},
-            dbc.Card([
-                dbc.CardHeader([
-                    dbc.Tabs(id="main-tabs", active_tab="insights", children=[
-                        dbc.Tab(label="💡 Insights", tab_id="insights"),
-                        dbc.Tab(label="📈 Trends", tab_id="trends"),
-                        dbc.Tab(label="⚖️ Compare", tab_id="compare"),
-                        dbc.Tab(label="🤖 Smart Analytics", tab_id="smart-analytics"),
-                        dbc.Tab(label="📥 Export", tab_id="export")
-                    ])
-                ]),
-                dbc.CardBody([html.Div(id="tab-content")])
-            ], style={"border": "1px solid #3e3e42", "overflow": "hidden", "boxShadow": "0 2px 8px rgba(0,0,0,0.3)", "backgroundColor": "#2d2d30"}),
-            {"display": "block"},
-            "Analytics",
-            "analytics"
-        ]
-    elif "nav-favorites" in ctx_triggered or "marker-add-favorite-btn" in ctx_triggered or ("search-favorite" in ctx_triggered and current_view == "favorites"):
-        # Favorites View - hide map, show favorites (refresh when favorite is added)
+
+
+# Only the data-backed view bodies are rendered on the server
+@callback(
+    Output("other-views", "children"),
+    Input("current-view", "data")
+)
+def update_main_content(current_view):
+    if current_view == "analytics":
+        # Analytics View
+        return dbc.Card([
+            dbc.CardHeader([
+                dbc.Tabs(id="main-tabs", active_tab="insights", children=[
+                    dbc.Tab(label="💡 Insights", tab_id="insights"),
+                    dbc.Tab(label="📈 Trends", tab_id="trends"),
+                    dbc.Tab(label="⚖️ Compare", tab_id="compare"),
+                    dbc.Tab(label="🤖 Smart Analytics", tab_id="smart-analytics"),
+                    dbc.Tab(label="📥 Export", tab_id="export")
+                ])
+            ]),
+            # Recreated with tab-content, so the render key always describes what tab-content shows
+            dbc.CardBody([html.Div(id="tab-content"), dcc.Store(id="tab-render-key")])
+        ], style={"border": "1px solid #3e3e42", "overflow": "hidden", "boxShadow": "0 2px 8px rgba(0,0,0,0.3)", "backgroundColor": "#2d2d30"})
+    elif current_view == "favorites":
+        # Favorites View (re-rendered when a favorite is added, since current-view is set again)
         favorites = db.get_favorites()
         fav_list = []
         for fav in favorites:
@@ -401,18 +408,12 @@ def update_main_content(map_clicks, analytics_clicks, fav_clicks, hist_clicks, s
                     ])
                 ], className="mb-2", style={"backgroundColor": "#2d2d30", "border": "1px solid #3e3e42", "color": "#cccccc"})
             )
-        return [
-            {"display": "none"},
-            html.Div([
-                html.H4("Favorites", className="mb-4"),
-                html.Div(fav_list if fav_list else [html.P("No favorites yet", className="text-muted")])
-            ]),
-            {"display": "block"},
-            "Favorites",
-            "favorites"
-        ]
-    elif "nav-history" in ctx_triggered:
-        # History View - hide map, show history
+        return html.Div([
+            html.H4("Favorites", className="mb-4"),
+            html.Div(fav_list if fav_list else [html.P("No favorites yet", className="text-muted")])
+        ])
+    elif current_view == "history":
+        # History View
         history = db.get_history(limit=50)
         hist_list = []
         for item in history:
@@ -424,21 +425,19 @@ def update_main_content(map_clicks, analytics_clicks, fav_clicks, hist_clicks, s
                     ])
                 ], className="mb-2")
             )
-        return [
-            {"display": "none"},
-            html.Div([
-                html.H4("Recent History", className="mb-4"),
-                dbc.Button("Clear History", id="clear-history-btn", color="danger", className="mb-3"),
-                html.Div(hist_list if hist_list else [html.P("No history", className="text-muted")])
-            ]),
-            {"display": "block"},
-            "History",
-            "history"
-        ]
-    elif "nav-settings" in ctx_triggered:
+        return html.Div([
+            html.H4("Recent History", className="mb-4"),
+            dbc.Button("Clear History", id="clear-history-btn", color="danger", className="mb-3"),
+            html.Div(hist_list if hist_list else [html.P("No history", className="text-muted")])
+        ])
+    elif current_view == "settings":
         # Settings View - reuse the settings tab content
-        settings = db.get_all_settings()
-        api_keys_info = db.get_all_api_keys()
+        # One database round-trip for every value shown below
+        snapshot = db.get_settings_snapshot()
+        settings = snapshot["settings"]
+        openaq_key = snapshot["api_keys"].get("openaq") or config.OPENAQ_API_KEY
+        weather_key = snapshot["api_keys"].get("weather") or config.WEATHER_API_KEY
+        openai_key = snapshot["api_keys"].get("openai")
         
         settings_content = html.Div([
             html.H4("Settings", className="mb-4"),
@@ -448,24 +447,24 @@ def update_main_content(map_clicks, analytics_clicks, fav_clicks, hist_clicks, s
                 dbc.CardHeader([html.H5("🔑 API Keys", className="mb-0")]),
                 dbc.CardBody([
                     html.Div([
-                        html.Label("OpenAQ API Key", className="form-label", style={"fontWeight": "600"}),
-                        dbc.Input(id="openaq-key-input", type="password", placeholder="Enter OpenAQ API key", value=db.get_api_key("openaq") or config.OPENAQ_API_KEY or "", className="mb-2"),
+                        html.Label("OpenAQ API Key", className="form-label", style=HEADER_TEXT_STYLE),
+                        dbc.Input(id="openaq-key-input", type="password", placeholder="Enter OpenAQ API key", value=openaq_key or "", className="mb-2"),
                         dbc.Button("Save", id="save-openaq-key-btn", color="primary", size="sm", className="me-2"),
-                        dbc.Badge("Configured" if (db.get_api_key("openaq") or config.OPENAQ_API_KEY) else "Not Set", color="success" if (db.get_api_key("openaq") or config.OPENAQ_API_KEY) else "secondary", className="ms-2")
+                        dbc.Badge("Configured" if openaq_key else "Not Set", color="success" if openaq_key else "secondary", className="ms-2")
                     ], className="mb-4"),
                     
                     html.Div([
-                        html.Label("WeatherAPI Key", className="form-label", style={"fontWeight": "600"}),
-                        dbc.Input(id="weather-key-input", type="password", placeholder="Enter WeatherAPI key", value=db.get_api_key("weather") or config.WEATHER_API_KEY or "", className="mb-2"),
+                        html.Label("WeatherAPI Key", className="form-label", style=HEADER_TEXT_STYLE),
+                        dbc.Input(id="weather-key-input", type="password", placeholder="Enter WeatherAPI key", value=weather_key or "", className="mb-2"),
                         dbc.Button("Save", id="save-weather-key-btn", color="primary", size="sm", className="me-2"),
-                        dbc.Badge("Configured" if (db.get_api_key("weather") or config.WEATHER_API_KEY) else "Not Set", color="success" if (db.get_api_key("weather") or config.WEATHER_API_KEY) else "secondary", className="ms-2")
+                        dbc.Badge("Configured" if weather_key else "Not Set", color="success" if weather_key else "secondary", className="ms-2")
                     ], className="mb-4"),
                     
                     html.Div([
-                        html.Label("OpenAI API Key (Optional)", className="form-label", style={"fontWeight": "600"}),
-                        dbc.Input(id="openai-key-input", type="password", placeholder="Enter OpenAI API key", value=db.get_api_key("openai") or "", className="mb-2"),
+                        html.Label("OpenAI API Key (Optional)", className="form-label", style=HEADER_TEXT_STYLE),
+                        dbc.Input(id="openai-key-input", type="password", placeholder="Enter OpenAI API key", value=openai_key or "", className="mb-2"),
                         dbc.Button("Save", id="save-openai-key-btn", color="primary", size="sm", className="me-2"),
-                        dbc.Badge("Configured" if db.get_api_key("openai") else "Not Set", color="success" if db.get_api_key("openai") else "secondary", className="ms-2"),
+                        dbc.Badge("Configured" if openai_key else "Not Set", color="success" if openai_key else "secondary", className="ms-2"),
                         html.Small("Used for AI-powered insights and Smart Analytics", className="text-muted d-block mt-1")
                     ], className="mb-4")
                 ])
@@ -476,20 +475,20 @@ def update_main_content(map_clicks, analytics_clicks, fav_clicks, hist_clicks, s
                 dbc.CardHeader([html.H5("⚙️ Application Settings", className="mb-0")]),
                 dbc.CardBody([
                     html.Div([
-                        html.Label("Data Refresh Interval (seconds)", className="form-label", style={"fontWeight": "600"}),
+                        html.Label("Data Refresh Interval (seconds)", className="form-label", style=HEADER_TEXT_STYLE),
                         dbc.Input(id="refresh-interval-input", type="number", min=60, max=3600, step=60, value=settings.get("refresh_interval", "300"), className="mb-2"),
                         dbc.Button("Save", id="save-refresh-interval-btn", color="primary", size="sm")
                     ], className="mb-4"),
                     
                     html.Div([
-                        html.Label("AQI Alert Threshold", className="form-label", style={"fontWeight": "600"}),
+                        html.Label("AQI Alert Threshold", className="form-label", style=HEADER_TEXT_STYLE),
                         dbc.Input(id="aqi-threshold-input", type="number", min=0, max=500, value=settings.get("aqi_alert_threshold", "150"), className="mb-2"),
                         html.Small("Get notified when AQI exceeds this value", className="text-muted d-block mb-2"),
                         dbc.Button("Save", id="save-aqi-threshold-btn", color="primary", size="sm")
                     ], className="mb-4"),
                     
                     html.Div([
-                        html.Label("Notifications", className="form-label", style={"fontWeight": "600"}),
+                        html.Label("Notifications", className="form-label", style=HEADER_TEXT_STYLE),
                         dbc.Switch(id="notifications-switch", label="Enable notifications", value=settings.get("notifications_enabled", "true") == "true")
                     ], className="mb-4")
                 ])
@@ -500,122 +499,353 @@ def update_main_content(map_clicks, analytics_clicks, fav_clicks, hist_clicks, s
                 dbc.CardHeader([html.H5("💾 Database Information", className="mb-0")]),
                 dbc.CardBody([
                     html.P(f"Database Location: {db.db_path}", className="mb-2"),
-                    html.P(f"Favorites: {len(db.get_favorites())}", className="mb-2"),
-                    html.P(f"History Entries: {len(db.get_history())}", className="mb-0")
+                    html.P(f"Favorites: {snapshot['favorites_count']}", className="mb-2"),
+                    html.P(f"History Entries: {snapshot['history_count']}", className="mb-0")
                 ])
             ])
         ])
         
-        return [
-            {"display": "none"},
-            settings_content,
-            {"display": "block"},
-            "Settings",
-            "settings"
-        ]
+        return settings_content
+    
+    # Map view has no server-rendered body
+    return html.Div()
+
+
+EMPTY_STATS = {"stations": 0, "countries": 0, "default_location": None, "weather_sample": [], "aqi_summary": None, "trends": None}
+
+
+def build_snapshot(locations):
+    """Process raw locations into the locations-data payload and dashboard stats"""
+    processed_df = data_processor.process_batch(locations)
+    country_codes = processed_df["country_code"]
+    countries = country_codes[country_codes != ""].nunique()
+    mapped_df = with_coordinates(processed_df)
+    if len(mapped_df) > config.MAP_TILE_THRESHOLD:
+        # Build the heatmap tile pyramid at ingest so the first heatmap render is a lookup
+        get_tile_pyramid(mapped_df)
+    # Ship the Store payload as compressed Arrow instead of a JSON list of records
+    payload = encode_records(processed_df)
+    aqi = processed_df["max_aqi"].to_numpy(dtype="float64", na_value=np.nan)
+    top10 = processed_df.iloc[top_n_indices(aqi, 10)]
+    # Negating keeps NaNs excluded and ties in first-seen order, like DataFrame.nsmallest
+    best10 = processed_df.iloc[top_n_indices(-aqi, 10)]
+    country_avg = processed_df.groupby("country")["max_aqi"].mean().sort_values(ascending=False).head(15)
+    # Stations spread evenly through the list stand in for all of them in the global weather stats
+    sample = mapped_df.iloc[np.unique(np.linspace(0, len(mapped_df) - 1, config.WEATHER_SAMPLE_SIZE).astype(int))] if len(mapped_df) else mapped_df
+    # Everything the stat cards and weather panel need is computed here in one pass
+    stats = {
+        "stations": len(processed_df),
+        "countries": int(countries),
+        "default_location": {
+            "name": processed_df["name"].iloc[0],
+            "coordinates": processed_df["coordinates"].iloc[0]
+        } if len(processed_df) else None,
+        "weather_sample": [[lat, lon] for lat, lon in zip(sample["lat"].tolist(), sample["lon"].tolist())],
+        # AQI reductions shared by the AQI header, the insights tab and the trends distribution
+        "aqi_summary": dict(
+            summarize_aqi(aqi),
+            top10={"name": top10["name"].tolist(), "country": top10["country"].tolist(), "max_aqi": top10["max_aqi"].tolist()}
+        ),
+        # Country averages and cleanest stations for the trends tab
+        "trends": {
+            "country_avg": {"country": country_avg.index.tolist(), "avg_aqi": country_avg.tolist()},
+            "best10": {"name": best10["name"].tolist(), "country": best10["country"].tolist(), "max_aqi": best10["max_aqi"].tolist()}
+        },
+        # Lets clients skip re-downloading a payload they already have
+        "version": make_key("locations", payload)
+    }
+    return payload, stats
+
+
+def refresh_locations(revalidate=False):
+    """
+    Fetch locations from OpenAQ and cache the processed snapshot shared by all clients
+    
+    Args:
+        revalidate: Ask OpenAQ even if its last answer is within OPENAQ_FRESH_TTL (explicit refresh)
+        
+    Returns:
+        Tuple of (Store payload, dashboard stats)
+    """
+    cache_key = "locations:all"
+    cached = cache_manager.get(cache_key)
+    try:
+        locations = api_client.get_locations(limit=500, revalidate=revalidate)
+        # get_locations returns a list, but if API call failed, it might be empty
+        # The error is already logged in _make_request
+        if locations:
+            cache_manager.set(cache_key, locations, timeout=300)
+        elif not cached:
+            # If no cached data and API call returned empty, log warning
+            logger.warning("No locations retrieved from OpenAQ API. Check your API key configuration.")
+    except Exception as e:
+        logger.error(f"Error fetching locations: {e}")
+        # Check if it's an authentication error
+        if "401" in str(e) or "Unauthorized" in str(e):
+            logger.error("OpenAQ API authentication failed. Please configure your API key in Settings.")
+        locations = None
+    locations = locations or cached
+    
+    if not locations:
+        return [], EMPTY_STATS
     
-    # Default to map view
-    return [
-        {"display": "block"},
-        html.Div(),
-        {"display": "none"},
-        "Map View",
-        "map"
-    ]
+    # Refreshes that return the same locations reuse the processed snapshot instead of rebuilding it
+    snapshot_key = make_key("locations:processed", locations)
+    snapshot = cache_manager.get(snapshot_key)
+    if snapshot is None:
+        try:
+            snapshot = build_snapshot(locations)
+        except Exception as e:
+            logger.error(f"Error processing location data: {e}")
+            return [], EMPTY_STATS
+        cache_manager.set(snapshot_key, snapshot, timeout=2 * config.DATA_REFRESH_INTERVAL)
+    # Outlive the refresh interval so clients never miss between background refreshes
+    cache_manager.set("locations:snapshot", snapshot, timeout=2 * config.DATA_REFRESH_INTERVAL)
+    payload, stats = snapshot
+    cache_manager.set(locations_ref(stats["version"])["key"], payload, timeout=2 * config.DATA_REFRESH_INTERVAL)
+    return snapshot
+
+
+def locations_ref(version):
+    """Build the locations-data Store value naming the server-side payload; the version is its content hash, so it doubles as the key"""
+    return {"key": version}
+
+
+def load_locations(ref):
+    """
+    Resolve a locations-data reference to the payload it names
+    
+    Args:
+        ref: locations-data Store value from locations_ref
+        
+    Returns:
+        Encoded locations payload, or an empty list when there is none
+    """
+    if not ref:
+        return []
+    payload = cache_manager.get(ref["key"])
+    if payload is None:
+        # Expired since the client last refreshed; serve the current snapshot until its next update
+        snapshot = cache_manager.get("locations:snapshot")
+        payload = snapshot[0] if snapshot else []
+    return payload
 
 
 @callback(
-    [Output("locations-data", "data"), Output("stat-stations", "children"), Output("stat-countries", "children")],
+    [Output("locations-data", "data"), Output("dashboard-stats", "data")],
     [Input("interval-component", "n_intervals"), Input("refresh-btn", "n_clicks"), Input("sidebar-refresh-btn", "n_clicks")],
+    State("dashboard-stats", "data"),
     prevent_initial_call=False
 )
-def update_data(n, clicks, sidebar_clicks):
+def update_data(n, clicks, sidebar_clicks, current_stats):
     try:
-        logger.info("Fetching data...")
-        cache_key = "locations:all"
-        cached = cache_manager.get(cache_key)
-        
         # Check if refresh was clicked
-        ctx_triggered = ctx.triggered[0]["prop_id"] if ctx.triggered else ""
-        force_refresh = "refresh-btn" in ctx_triggered or "sidebar-refresh-btn" in ctx_triggered
+        force_refresh = ctx.triggered_id in ("refresh-btn", "sidebar-refresh-btn")
         
-        if cached and not force_refresh:
-            locations = cached
-        else:
-            try:
-                locations = api_client.get_locations(limit=500)
-                # get_locations returns a list, but if API call failed, it might be empty
-                # The error is already logged in _make_request
-                if locations:
-                    cache_manager.set(cache_key, locations, timeout=300)
-                elif not cached:
-                    # If no cached data and API call returned empty, log warning
-                    logger.warning("No locations retrieved from OpenAQ API. Check your API key configuration.")
-            except Exception as e:
-                logger.error(f"Error fetching locations: {e}")
-                # Check if it's an authentication error
-                if "401" in str(e) or "Unauthorized" in str(e):
-                    logger.error("OpenAQ API authentication failed. Please configure your API key in Settings.")
-                locations = cached if cached else []
+        # Clients read the snapshot kept fresh by data_refresher, so OpenAQ load doesn't grow with client count
+        snapshot = None if force_refresh else cache_manager.get("locations:snapshot")
+        if snapshot is None:
+            logger.info("Fetching data...")
+            snapshot = refresh_locations(revalidate=force_refresh)
+        payload, stats = snapshot
     except Exception as e:
         logger.error(f"Error in update_data callback: {e}")
-        return [], "0", "0"
+        return [], EMPTY_STATS
     
-    if not locations:
-        return [], "0", "0"
+    if not force_refresh and current_stats and current_stats.get("version") == stats.get("version"):
+        return no_update, no_update
+    # The browser only holds a reference; callbacks load the payload from the server-side cache
+    return (locations_ref(stats["version"]) if payload else []), stats
+
+
+# Built once at import; plotly copies these into each figure, so sharing them is safe
+AQI_COLORSCALE = [[0, "rgb(0,228,0)"], [0.17, "rgb(255,255,0)"], [0.33, "rgb(255,126,0)"], [0.5, "rgb(255,0,0)"], [0.67, "rgb(143,63,151)"], [1, "rgb(126,0,35)"]]
+MAP_LAYOUT = dict(mapbox=dict(style="open-street-map", center=dict(lat=20, lon=0), zoom=1.5), height=400, margin=dict(l=0, r=0, t=0, b=0))
+# Marker hovers are formatted by plotly.js from customdata ([location_id, name, country, max_aqi, label])
+MARKER_HOVERTEMPLATE = "<b>%{customdata[1]}</b><br>AQI: %{customdata[3]}<extra></extra>"
+CLUSTER_HOVERTEMPLATE = "<b>%{customdata[1]}</b><br>%{customdata[4]}: %{customdata[3]}<extra></extra>"
+EMPTY_FIGURE = go.Figure()
+NO_DATA_MAP_FIGURE = go.Figure()
+NO_DATA_MAP_FIGURE.add_annotation(
+    text="No data available. Please configure your OpenAQ API key in Settings.",
+    xref="paper", yref="paper",
+    x=0.5, y=0.5, showarrow=False,
+    font=dict(size=16, color="#666")
+)
+NO_DATA_MAP_FIGURE.update_layout(
+    plot_bgcolor="#1e1e1e",
+    paper_bgcolor="#2d2d30",
+    height=400,
+    margin=dict(l=0, r=0, t=0, b=0)
+)
+
+
+def top_n_indices(values, n):
+    """Positions of the n largest non-NaN values, largest first (ties keep first, like DataFrame.nlargest)"""
+    valid = np.flatnonzero(~np.isnan(values))
+    if len(valid) > n:
+        # O(N) partial selection instead of a full sort
+        kth = np.partition(values[valid], -n)[-n]
+        valid = valid[values[valid] >= kth]
+    return valid[np.argsort(-values[valid], kind="stable")][:n]
+
+
+AQI_BAND_EDGES = [50, 100, 150, 200]
+AQI_BAND_LABELS = ["Good (0-50)", "Moderate (51-100)", "Unhealthy (101-150)", "Very Unhealthy (151-200)", "Hazardous (201+)"]
+
+
+def summarize_aqi(aqi):
+    """Average, good/high counts and band distribution of station AQIs from one bucketing pass"""
+    valid = aqi[~np.isnan(aqi)]
+    # Band i holds edges[i-1] < aqi <= edges[i]; good is band 0 and high (> 150) is bands 3 and 4
+    bands = np.bincount(np.searchsorted(AQI_BAND_EDGES, valid, side="left"), minlength=len(AQI_BAND_LABELS))
+    return {
+        "avg": int(valid.mean()) if len(valid) else None,
+        "high": int(bands[3:].sum()),
+        "good": int(bands[0]),
+        "bands": bands.tolist()
+    }
+
+
+def with_coordinates(df):
+    """Keep only stations with finite coordinates"""
+    # lat/lon are flattened by DataProcessor.process_location_data, so validity is a single NumPy pass
+    lat = df["lat"].to_numpy(dtype="float64", na_value=np.nan)
+    lon = df["lon"].to_numpy(dtype="float64", na_value=np.nan)
+    return df[np.isfinite(lat) & np.isfinite(lon)]
+
+
+def get_tile_pyramid(df):
+    """Get the heatmap tile pyramid for the given stations, building and caching it on a miss"""
+    lat = df["lat"].to_numpy(dtype="float64")
+    lon = df["lon"].to_numpy(dtype="float64")
+    aqi = df["max_aqi"].to_numpy(dtype="float64", na_value=0)
+    key = TilePyramid.cache_key(lat, lon, aqi, df["location_id"].tolist())
+    pyramid = cache_manager.get(key)
+    if pyramid is None:
+        pyramid = TilePyramid(lat, lon, aqi, max_zoom=config.MAP_TILE_MAX_ZOOM)
+        cache_manager.set(key, pyramid, timeout=config.CACHE_TIMEOUT)
+    return pyramid
+
+
+def get_cluster_index(df):
+    """Get the cluster index for the given stations, building and caching it on a miss"""
+    lat = df["lat"].to_numpy(dtype="float64")
+    lon = df["lon"].to_numpy(dtype="float64")
+    aqi = df["max_aqi"].to_numpy(dtype="float64", na_value=0)
+    key = ClusterIndex.cache_key(lat, lon, aqi, df["location_id"].tolist())
+    index = cache_manager.get(key)
+    if index is None:
+        index = ClusterIndex(lat, lon, aqi, radius=config.MAP_CLUSTER_RADIUS)
+        cache_manager.set(key, index, timeout=config.CACHE_TIMEOUT)
+    return index
+
+
+@lru_cache(maxsize=8)
+def load_cached_figure(cache_key):
+    """
+    Load a serialized figure from the shared cache, memoized per process
     
-    try:
-        processed = [data_processor.process_location_data(loc) for loc in locations if loc]
-        countries = len(set(loc.get("country_code") for loc in processed if loc.get("country_code")))
-        return processed, str(len(processed)), str(countries)
-    except Exception as e:
-        logger.error(f"Error processing location data: {e}")
-        return [], "0", "0"
+    Keys are derived from the figure's inputs, so a memoized figure never goes stale. Repeat
+    map-type toggles skip both the cache read and the JSON parse.
+    
+    Args:
+        cache_key: Key the serialized figure was cached under
+        
+    Returns:
+        Figure dictionary
+        
+    Raises:
+        KeyError: If the figure isn't cached (misses are not memoized)
+    """
+    cached = cache_manager.get(cache_key)
+    if cached is None:
+        raise KeyError(cache_key)
+    return orjson.loads(cached)
+
+
+def patch_figure(updates):
+    """Build a Patch assigning each (path, value) in updates, e.g. ("data", 0, "lon")"""
+    patched = Patch()
+    for path, value in updates.items():
+        target = patched
+        for key in path[:-1]:
+            target = target[key]
+        target[path[-1]] = value
+    return patched
 
 
 @callback(
-    Output("main-map", "figure"),
-    [Input("locations-data", "data"), Input("map-type-store", "data")],
+    [Output("main-map", "figure"), Output("map-render-mode", "data")],
+    [Input("locations-data", "data"), Input("map-type-store", "data"), Input("main-map", "relayoutData")],
+    State("map-render-mode", "data"),
     prevent_initial_call=False
 )
-def update_map(data, map_type):
-    if not data:
+def update_map(data, map_type, relayout_data, render_mode):
+    bbox, zoom = viewport_from_relayout(relayout_data)
+    df = decode_frame(load_locations(data), columns=["lat", "lon", "max_aqi", "location_id", "id", "name", "country"])
+    # Thresholds count only the stations that get drawn, so they agree with what each branch renders
+    mapped = with_coordinates(df) if not df.empty else df
+    clustered = map_type not in ("heatmap", "density") and len(mapped) > config.MAP_CLUSTER_THRESHOLD
+    rasterized = map_type == "density" and len(mapped) > config.MAP_RASTER_THRESHOLD
+    # Both density views take pre-aggregated cells once the stations outnumber MAP_TILE_THRESHOLD
+    tiled = map_type in ("heatmap", "density") and not rasterized and len(mapped) > config.MAP_TILE_THRESHOLD
+    viewport_dependent = clustered or tiled or rasterized
+    if ctx.triggered_id == "main-map":
+        # Pan/zoom only matters for views that are aggregated server-side
+        if zoom is None or not viewport_dependent:
+            return no_update, no_update
+    
+    if df.empty:
         # Show helpful message when no data
-        fig = go.Figure()
-        fig.add_annotation(
-            text="No data available. Please configure your OpenAQ API key in Settings.",
-            xref="paper", yref="paper",
-            x=0.5, y=0.5, showarrow=False,
-            font=dict(size=16, color="#666")
-        )
-        fig.update_layout(
-            plot_bgcolor="#1e1e1e",
-            paper_bgcolor="#2d2d30",
-            height=400,
-            margin=dict(l=0, r=0, t=0, b=0)
-        )
-        return fig
+        return NO_DATA_MAP_FIGURE, None
+    
+    # Figures of the same mode share everything but their data arrays, which is all a Patch has to send
+    mode = "heatmap" if map_type == "heatmap" else "raster" if rasterized else "density" if map_type == "density" else "markers"
+    patch = render_mode == mode
+    
+    # Cache the serialized figure so repeat renders skip both figure construction and JSON encoding
+    cache_key = make_key("map_figure", [data, map_type, [bbox, zoom] if viewport_dependent else None])
+    if not patch:
+        try:
+            return load_cached_figure(cache_key), mode
+        except KeyError:
+            pass
     
     try:
-        df = pd.DataFrame(data)
-        if df.empty:
-            return go.Figure()
-        
-        df["lat"] = df["coordinates"].apply(lambda x: x.get("latitude") if isinstance(x, dict) and x else None)
-        df["lon"] = df["coordinates"].apply(lambda x: x.get("longitude") if isinstance(x, dict) and x else None)
-        df = df.dropna(subset=["lat", "lon"])
+        df = mapped
         
         if df.empty:
-            return go.Figure()
+            return EMPTY_FIGURE, None
         
-        aqi_colors = [[0, "rgb(0,228,0)"], [0.17, "rgb(255,255,0)"], [0.33, "rgb(255,126,0)"], [0.5, "rgb(255,0,0)"], [0.67, "rgb(143,63,151)"], [1, "rgb(126,0,35)"]]
+        if tiled:
+            # Send only the pre-aggregated cells visible at this zoom instead of every station
+            tiles = get_tile_pyramid(df).get_tiles(bbox=bbox, zoom=zoom if zoom is not None else 1.5)
+            lon, lat, z = tiles["lon"], tiles["lat"], tiles["mean_aqi"]
+        elif mode in ("heatmap", "density"):
+            lon, lat, z = df["lon"].to_numpy(), df["lat"].to_numpy(), df["max_aqi"].to_numpy()
         
-        if map_type == "heatmap":
-            fig = go.Figure(go.Densitymapbox(lon=df["lon"], lat=df["lat"], z=df["max_aqi"], radius=25, colorscale=aqi_colors, zmin=0, zmax=300, colorbar=dict(title="AQI")))
-            fig.update_layout(mapbox=dict(style="open-street-map", center=dict(lat=20, lon=0), zoom=1.5), height=400, margin=dict(l=0,r=0,t=0,b=0))
-        elif map_type == "density":
-            fig = px.density_mapbox(df, lat="lat", lon="lon", z="max_aqi", radius=20, center=dict(lat=20, lon=0), zoom=1.5, mapbox_style="open-street-map", color_continuous_scale=aqi_colors, range_color=[0,300], height=400)
-            fig.update_layout(margin=dict(l=0,r=0,t=0,b=0))
+        if mode == "heatmap":
+            updates = {("data", 0, "lon"): lon, ("data", 0, "lat"): lat, ("data", 0, "z"): z}
+            if not patch:
+                fig = go.Figure(go.Densitymapbox(lon=lon, lat=lat, z=z, radius=25, colorscale=AQI_COLORSCALE, zmin=0, zmax=300, colorbar=dict(title="AQI")))
+                fig.update_layout(**MAP_LAYOUT, uirevision="main-map")
+        elif mode == "raster":
+            # Rasterize server-side and ship one PNG layer instead of every station
+            layer = render_density_image(df["lat"], df["lon"], df["max_aqi"].to_numpy(dtype="float64", na_value=0), AQI_COLORSCALE, bbox=bbox)
+            updates = {("layout", "mapbox", "layers"): [layer] if layer else []}
+            if not patch:
+                fig = go.Figure(go.Scattermapbox(
+                    lon=[None], lat=[None], mode="markers", hoverinfo="skip",
+                    marker=dict(color=[0], colorscale=AQI_COLORSCALE, cmin=0, cmax=300, colorbar=dict(title="AQI"), showscale=True)
+                ))
+                fig.update_layout(**MAP_LAYOUT, uirevision="main-map")
+                fig.update_layout(mapbox_layers=updates[("layout", "mapbox", "layers")])
+        elif mode == "density":
+            updates = {("data", 0, "lon"): lon, ("data", 0, "lat"): lat, ("data", 0, "z"): z}
+            if not patch:
+                fig = px.density_mapbox(pd.DataFrame({"lat": lat, "lon": lon, "max_aqi": z}), lat="lat", lon="lon", z="max_aqi", radius=20, center=dict(lat=20, lon=0), zoom=1.5, mapbox_style="open-street-map", color_continuous_scale=AQI_COLORSCALE, range_color=[0,300], height=400)
+                fig.update_layout(margin=MAP_LAYOUT["margin"])
         else:
             # ISSUE-002: Add click events to markers
             # Ensure location_id exists (fallback to id if needed)
@@ -625,37 +855,70 @@ def update_map(data, map_type):
                 else:
                     df["location_id"] = df.index.astype(str)
             
-            # Prepare customdata for click events - use list of lists for Plotly
-            customdata = df[["location_id", "name", "country", "max_aqi"]].values.tolist()
+            if clustered:
+                # Aggregate into at most MAP_MAX_MARKERS clusters for the current viewport
+                clusters = get_cluster_index(df).get_clusters(bbox=bbox, zoom=zoom if zoom is not None else 1.5, max_clusters=config.MAP_MAX_MARKERS)
+                members = df.iloc[clusters["member"]]
+                singles = clusters["count"] == 1
+                
+                # Only single-station markers carry a location_id, so cluster clicks don't open the modal
+                names = members["name"].astype(str).to_numpy(dtype=object)
+                aqi = clusters["max_aqi"].astype(int)
+                counts = clusters["count"].astype(str).astype(object) + " stations"
+                # The trailing column labels the reading, since a cluster shows its members' max AQI
+                customdata = np.column_stack([
+                    np.where(singles, members["location_id"].to_numpy(dtype=object), ""),
+                    np.where(singles, names, counts),
+                    np.where(singles, members["country"].to_numpy(dtype=object), ""),
+                    np.array(aqi.tolist(), dtype=object),
+                    np.where(singles, "AQI", "Max AQI")
+                ]).tolist()
+                hovertemplate = CLUSTER_HOVERTEMPLATE
+                lon, lat, color = clusters["lon"], clusters["lat"], clusters["max_aqi"]
+                size = 10 + 4 * np.log2(clusters["count"])
+            else:
+                # Prepare customdata for click events - use list of lists for Plotly
+                customdata = df[["location_id", "name", "country", "max_aqi"]].to_numpy().tolist()
+                hovertemplate = MARKER_HOVERTEMPLATE
+                lon, lat, color = df["lon"].to_numpy(), df["lat"].to_numpy(), df["max_aqi"].to_numpy()
+                size = 10
             
-            fig = go.Figure(go.Scattermapbox(
-                lon=df["lon"], 
-                lat=df["lat"], 
-                mode="markers", 
-                marker=dict(size=10, color=df["max_aqi"], colorscale=aqi_colors, cmin=0, cmax=300, colorbar=dict(title="AQI"), opacity=0.8), 
-                text=df.apply(lambda r: f"<b>{r['name']}</b><br>AQI: {r['max_aqi']}", axis=1), 
-                hovertemplate="%{text}<extra></extra>",
-                customdata=customdata
-            ))
-            fig.update_layout(
-                mapbox=dict(style="open-street-map", center=dict(lat=20, lon=0), zoom=1.5), 
-                height=400, 
-                margin=dict(l=0,r=0,t=0,b=0),
-                clickmode='event+select'  # Enable click events
-            )
+            updates = {
+                ("data", 0, "lon"): lon, ("data", 0, "lat"): lat,
+                ("data", 0, "marker", "size"): size, ("data", 0, "marker", "color"): color,
+                ("data", 0, "hovertemplate"): hovertemplate, ("data", 0, "customdata"): customdata
+            }
+            if not patch:
+                fig = go.Figure(go.Scattermapbox(
+                    lon=lon, 
+                    lat=lat, 
+                    mode="markers", 
+                    marker=dict(size=size, color=color, colorscale=AQI_COLORSCALE, cmin=0, cmax=300, colorbar=dict(title="AQI"), opacity=0.8), 
+                    hovertemplate=hovertemplate,
+                    customdata=customdata
+                ))
+                fig.update_layout(
+                    **MAP_LAYOUT,
+                    clickmode='event+select',  # Enable click events
+                    uirevision="main-map"  # Keep the user's pan/zoom when clusters are recomputed
+                )
         
-        return fig
+        if patch:
+            return patch_figure(updates), no_update
+        fig_json = pio.to_json(fig, validate=False)
+        cache_manager.set(cache_key, fig_json, timeout=config.CACHE_TIMEOUT)
+        return orjson.loads(fig_json), mode
     except Exception as e:
         logger.error(f"Error updating map: {e}")
-        return go.Figure()
+        return EMPTY_FIGURE, None
 
 
 @callback(
     [Output("main-aqi", "children"), Output("aqi-status-badge", "children"), Output("data-status-alert", "children")],
-    Input("locations-data", "data")
+    Input("dashboard-stats", "data")
 )
-def update_aqi(data):
-    if not data:
+def update_aqi(stats):
+    if not stats or not stats.get("stations"):
         alert = dbc.Alert([
             html.I(className="fas fa-exclamation-triangle me-2"),
             html.Strong("No Data Available"),
@@ -667,14 +930,14 @@ def update_aqi(data):
         ], color="warning", className="mb-3")
         return "--", "", alert
     try:
-        df = pd.DataFrame(data)
-        if df.empty or "max_aqi" not in df.columns:
+        summary = stats.get("aqi_summary")
+        if not summary or summary["avg"] is None:
             alert = dbc.Alert([
                 html.I(className="fas fa-info-circle me-2"),
                 "No air quality data available. Please check your API key configuration."
             ], color="info", className="mb-3")
             return "--", "", alert
-        avg_aqi = int(df["max_aqi"].mean())
+        avg_aqi = summary["avg"]
         category = data_processor.get_aqi_category(avg_aqi)
         color = data_processor.get_aqi_color(avg_aqi)
         badge = dbc.Badge(category, color="light", style={"backgroundColor": color, "padding": "8px 16px", "fontSize": "14px"})
@@ -688,6 +951,43 @@ def update_aqi(data):
         return "--", "", alert
 
 
+@dataclass(frozen=True, slots=True)
+class LocationView:
+    """Fields of a stored location record read by the marker, search and favorite callbacks"""
+    id: str
+    name: str
+    country: str
+    lat: Optional[float]
+    lon: Optional[float]
+    aqi: Optional[float]
+    sensors: list
+
+
+def normalize_location(location_data):
+    """
+    Extract the commonly used fields of a location record once
+    
+    Args:
+        location_data: Location dictionary from the locations store
+        
+    Returns:
+        LocationView (missing coordinates and non-numeric AQI become None)
+    """
+    coords = location_data.get("coordinates")
+    if not isinstance(coords, dict):
+        coords = {}
+    aqi = location_data.get("max_aqi", 0)
+    return LocationView(
+        id=str(location_data.get("location_id") or location_data.get("id", "")),
+        name=location_data.get("name", "Unknown"),
+        country=location_data.get("country", ""),
+        lat=coords.get("latitude"),
+        lon=coords.get("longitude"),
+        aqi=aqi if isinstance(aqi, (int, float)) else None,
+        sensors=location_data.get("sensors") or []
+    )
+
+
 # ISSUE-002: Map click handler - opens action modal
 @callback(
     [Output("clicked-location", "data"), Output("marker-action-modal", "is_open")],
@@ -707,20 +1007,13 @@ def handle_map_click(click_data, locations_data):
             # customdata is [location_id, name, country, max_aqi]
             location_id = str(customdata[0])
             # Find full location data
-            if locations_data:
-                for loc in locations_data:
-                    if isinstance(loc, dict):
-                        loc_id = str(loc.get("location_id") or loc.get("id", ""))
-                        if loc_id == location_id:
-                            # Add to history
-                            db.add_to_history(
-                                location_id=location_id,
-                                name=loc.get("name", "Unknown"),
-                                country=loc.get("country", ""),
-                                latitude=loc.get("coordinates", {}).get("latitude") if isinstance(loc.get("coordinates"), dict) else None,
-                                longitude=loc.get("coordinates", {}).get("longitude") if isinstance(loc.get("coordinates"), dict) else None
-                            )
-                            return loc, True  # Open modal
+            loc = lookup_record(load_locations(locations_data), location_id)
+            if loc:
+                # Add to history
+                view = normalize_location(loc)
+                db.add_to_history(location_id=location_id, name=view.name, country=view.country,
+                                  latitude=view.lat, longitude=view.lon)
+                return loc, True  # Open modal
     except Exception as e:
         logger.error(f"Error handling map click: {e}")
     return None, False
@@ -728,95 +1021,162 @@ def handle_map_click(click_data, locations_data):
 
 # ISSUE-003: Fix weather to use selected location
 @callback(
-    [Output("weather-info", "children"), Output("stat-wind", "children"), Output("stat-humidity", "children"), Output("current-location", "children")],
-    [Input("locations-data", "data"), Input("selected-location", "data")]
+    Output("weather-render-key", "data"),
+    [Input("dashboard-stats", "data"), Input("selected-location", "data")],
+    State("weather-render-key", "data")
 )
-def update_weather(data, selected_loc):
-    """Update weather for selected location or first location"""
-    if not data or not config.WEATHER_API_KEY:
-        return "", "--", "--", "Global"
+def request_weather(stats, selected_loc, rendered_key):
+    """Start a weather fetch only when it would show different readings"""
+    # A selected location's weather doesn't depend on the stations; either way readings are reused for WEATHER_CACHE_TTL
+    if selected_loc and isinstance(selected_loc, dict):
+        source = selected_loc
+    else:
+        source = [(stats or {}).get("weather_sample"), (stats or {}).get("default_location")]
+    render_key = [bool(stats and stats.get("stations")), bool(config.WEATHER_API_KEY), source, int(time.time() // config.WEATHER_CACHE_TTL)]
+    # Checked in the foreground so unchanged refreshes never queue a background job
+    if rendered_key == render_key:
+        raise PreventUpdate
+    return render_key
+
+
+@callback(
+    [Output("weather-info", "children"), Output("weather-data", "data"), Output("current-location", "children")],
+    Input("weather-render-key", "data"),
+    [State("dashboard-stats", "data"), State("selected-location", "data")],
+    prevent_initial_call=True,
+    # WeatherAPI round trips run off the request thread; the panel dims until the readings arrive
+    background=True,
+    running=[(Output("weather-info", "style"), {"opacity": 0.5}, {"opacity": 1})]
+)
+def update_weather(render_key, stats, selected_loc):
+    """Fetch and render the weather requested by request_weather"""
+    return render_weather(stats, selected_loc)
+
+
+def render_weather(stats, selected_loc):
+    """Build the weather panel for the selected location, or the average over sampled stations"""
+    if not stats or not stats.get("stations") or not config.WEATHER_API_KEY:
+        return "", None, "Global"
     
-    # ISSUE-003: Use selected location if available, otherwise first location
-    try:
-        if selected_loc and isinstance(selected_loc, dict):
-            loc = selected_loc
-            location_name = loc.get("name", "Selected Location")
-        else:
-            loc = data[0] if isinstance(data, list) and len(data) > 0 else None
-            location_name = "Global"
-        
-        if not loc:
-            return "", "--", "--", location_name
-        
-        coords = loc.get("coordinates", {}) if isinstance(loc, dict) else {}
-        lat, lon = coords.get("latitude"), coords.get("longitude")
+    # ISSUE-003: Use selected location if available, otherwise the global average
+    sample = stats.get("weather_sample")
+    if not (selected_loc and isinstance(selected_loc, dict)) and sample:
+        # One concurrent round of requests instead of standing in the first station for every station
+        weather = weather_client.average_current_weather(weather_client.get_current_weather_batch(sample))
+        location_name = "Global"
+    else:
+        try:
+            if selected_loc and isinstance(selected_loc, dict):
+                loc = selected_loc
+                location_name = loc.get("name", "Selected Location")
+            else:
+                loc = stats.get("default_location")
+                location_name = "Global"
+            
+            if not loc:
+                return "", None, location_name
+            
+            coords = loc.get("coordinates", {}) if isinstance(loc, dict) else {}
+            lat, lon = coords.get("latitude"), coords.get("longitude")
+            
+            if not lat or not lon:
+                return "", None, location_name
+        except (IndexError, TypeError, AttributeError):
+            return "", None, "Global"
         
-        if not lat or not lon:
-            return "", "--", "--", location_name
-    except (IndexError, TypeError, AttributeError):
-        return "", "--", "--", "Global"
-    
-    weather = weather_client.get_current_weather(lat, lon)
+        weather = weather_client.get_current_weather(lat, lon)
     if not weather:
-        return "", "--", "--", location_name
+        return "", None, location_name
     
     weather_div = html.Div([
         html.Div([
             html.I(className="fas fa-temperature-high me-2"),
             html.Span(f"{weather.get('temperature_c', '--')}°C")
-        ], style={"marginBottom": "8px"}),
+        ], style=WEATHER_ROW_STYLE),
         html.Div([
             html.I(className="fas fa-wind me-2"),
             html.Span(f"{weather.get('wind_speed_kph', '--')} km/h {weather.get('wind_direction', '')}")
-        ], style={"marginBottom": "8px"}),
+        ], style=WEATHER_ROW_STYLE),
         html.Div([
             html.I(className="fas fa-tint me-2"),
             html.Span(f"{weather.get('humidity', '--')}%")
         ])
-    ], style={"fontSize": "14px", "color": "#cccccc"})
+    ], style=WEATHER_PANEL_STYLE)
     
-    return weather_div, str(weather.get('wind_speed_kph', '--')), f"{weather.get('humidity', '--')}%", location_name
+    return weather_div, weather, location_name
 
 
 @callback(
+    [Output("stat-stations", "children"), Output("stat-countries", "children"), Output("stat-wind", "children"), Output("stat-humidity", "children")],
+    [Input("dashboard-stats", "data"), Input("weather-data", "data")]
+)
+def update_stats(stats, weather):
+    """Render all four stat cards from the dashboard stats and weather stores"""
+    stats = stats or EMPTY_STATS
+    if weather:
+        wind, humidity = str(weather.get('wind_speed_kph', '--')), f"{weather.get('humidity', '--')}%"
+    else:
+        wind, humidity = "--", "--"
+    return str(stats["stations"]), str(stats["countries"]), wind, humidity
+
+
+# Picking a map type is pure UI state, so it runs in the browser (assets/controls.js)
+app.clientside_callback(
+    ClientsideFunction(namespace="controls", function_name="setMapType"),
     Output("map-type-store", "data"),
     [Input("btn-heatmap", "n_clicks"), Input("btn-markers", "n_clicks"), Input("btn-density", "n_clicks")],
     prevent_initial_call=True
 )
-def change_map_type(h, m, d):
-    triggered = ctx.triggered_id
-    if triggered == "btn-heatmap":
-        return "heatmap"
-    elif triggered == "btn-density":
-        return "density"
-    return "markers"
+
+
+# Figures built from data the browser already has are drawn clientside
+app.clientside_callback(
+    ClientsideFunction(namespace="charts", function_name="top10Figure"),
+    Output("insights-graph", "figure"),
+    Input("dashboard-stats", "data"),
+    State("plotly-template", "data")
+)
+
+
+# Tabs whose content doesn't change with the location data
+DATA_INDEPENDENT_TABS = ("smart-analytics", "export")
 
 
 @callback(
-    Output("tab-content", "children"),
-    [Input("main-tabs", "active_tab"), Input("locations-data", "data")]
+    [Output("tab-content", "children"), Output("tab-render-key", "data")],
+    [Input("main-tabs", "active_tab"), Input("dashboard-stats", "data")],
+    [State("locations-data", "data"), State("tab-render-key", "data")]
 )
-def render_tab(tab, data):
+def update_tab(tab, stats, data, rendered_key):
+    """Render the active tab, skipping refreshes that wouldn't change what it shows"""
+    version = bool(data) if tab in DATA_INDEPENDENT_TABS else (stats or {}).get("version")
+    render_key = [tab, version]
+    if rendered_key == render_key and version:
+        raise PreventUpdate
+    return render_tab(tab, stats, load_locations(data)), render_key
+
+
+def render_tab(tab, stats, data):
+    """Build the content of an analytics tab"""
     if not data:
         return html.Div("Loading...", className="text-center py-5")
     
     try:
-        df = pd.DataFrame(data)
-        if df.empty:
-            return html.Div("No data available", className="text-center py-5")
-        
         if tab == "insights":
-            if "max_aqi" not in df.columns or "name" not in df.columns:
+            # Served from the reductions computed once per snapshot, without decoding the payload
+            stats = stats or EMPTY_STATS
+            summary = stats.get("aqi_summary")
+            if not stats["stations"]:
+                return html.Div("No data available", className="text-center py-5")
+            if not summary or summary["avg"] is None:
                 return html.Div("Data format error", className="text-center py-5")
             
-            top10 = df.nlargest(10, "max_aqi") if len(df) > 0 else df
-            # Use Reds scale for pollution (higher = worse, darker red)
-            fig = px.bar(top10, x="name", y="max_aqi", color="max_aqi", color_continuous_scale="Reds", title="Top 10 Most Polluted Locations")
+            high, good, avg = summary["high"], summary["good"], summary["avg"]
             
             insights = [
-                {"icon": "fas fa-exclamation-triangle", "title": "High Pollution Alert", "text": f"{len(df[df['max_aqi'] > 150])} locations with unhealthy air quality", "color": "#ff5252"},
-                {"icon": "fas fa-check-circle", "title": "Good Air Quality", "text": f"{len(df[df['max_aqi'] <= 50])} locations with good air quality", "color": "#4caf50"},
-                {"icon": "fas fa-chart-line", "title": "Average AQI", "text": f"Global average: {int(df['max_aqi'].mean())}", "color": "#2196f3"}
+                {"icon": "fas fa-exclamation-triangle", "title": "High Pollution Alert", "text": f"{high} locations with unhealthy air quality", "color": "#ff5252"},
+                {"icon": "fas fa-check-circle", "title": "Good Air Quality", "text": f"{good} locations with good air quality", "color": "#4caf50"},
+                {"icon": "fas fa-chart-line", "title": "Average AQI", "text": f"Global average: {avg}", "color": "#2196f3"}
             ]
             
             insight_cards = [
@@ -832,23 +1192,21 @@ def render_tab(tab, data):
                 for i in insights
             ]
             
-            return html.Div([dcc.Graph(figure=fig)] + insight_cards)
+            # The top 10 chart is drawn in the browser from dashboard-stats (assets/charts.js)
+            return html.Div([dcc.Graph(id="insights-graph")] + insight_cards)
         
-        elif tab == "trends":
-            # Enhanced Trends Tab with visualizations
-            if "max_aqi" not in df.columns or "country" not in df.columns:
+        if tab == "trends":
+            # Enhanced Trends Tab with visualizations, also served from the per-snapshot reductions
+            stats = stats or EMPTY_STATS
+            summary, trends = stats.get("aqi_summary"), stats.get("trends")
+            if not stats["stations"]:
+                return html.Div("No data available", className="text-center py-5")
+            if not summary or not trends:
                 return html.Div("Data format error", className="text-center py-5")
             
-            # Country-wise analysis
-            country_stats = df.groupby("country").agg({
-                "max_aqi": ["mean", "max", "min", "count"]
-            }).reset_index()
-            country_stats.columns = ["country", "avg_aqi", "max_aqi", "min_aqi", "count"]
-            country_stats = country_stats.sort_values("avg_aqi", ascending=False).head(15)
-            
             # Create visualizations
             fig1 = px.bar(
-                country_stats, 
+                pd.DataFrame(trends["country_avg"]), 
                 x="country", 
                 y="avg_aqi", 
                 color="avg_aqi",
@@ -856,21 +1214,10 @@ def render_tab(tab, data):
                 title="Average AQI by Country (Top 15)",
                 labels={"avg_aqi": "Average AQI", "country": "Country"}
             )
-            fig1.update_layout(
-                plot_bgcolor="#1e1e1e",
-                paper_bgcolor="#2d2d30",
-                font_color="#cccccc",
-                xaxis_tickangle=-45
-            )
+            fig1.update_layout(**DARK_FIGURE_LAYOUT, xaxis_tickangle=-45)
             
-            # AQI distribution
-            aqi_ranges = {
-                "Good (0-50)": len(df[df["max_aqi"] <= 50]),
-                "Moderate (51-100)": len(df[(df["max_aqi"] > 50) & (df["max_aqi"] <= 100)]),
-                "Unhealthy (101-150)": len(df[(df["max_aqi"] > 100) & (df["max_aqi"] <= 150)]),
-                "Very Unhealthy (151-200)": len(df[(df["max_aqi"] > 150) & (df["max_aqi"] <= 200)]),
-                "Hazardous (201+)": len(df[df["max_aqi"] > 200])
-            }
+            # AQI distribution, bucketed once per snapshot
+            aqi_ranges = dict(zip(AQI_BAND_LABELS, summary["bands"]))
             
             fig2 = px.pie(
                 values=list(aqi_ranges.values()),
@@ -878,15 +1225,11 @@ def render_tab(tab, data):
                 title="AQI Distribution",
                 color_discrete_sequence=px.colors.sequential.Reds
             )
-            fig2.update_layout(
-                plot_bgcolor="#1e1e1e",
-                paper_bgcolor="#2d2d30",
-                font_color="#cccccc"
-            )
+            fig2.update_layout(**DARK_FIGURE_LAYOUT)
             
             # Top and bottom locations
-            top_polluted = df.nlargest(10, "max_aqi")[["name", "country", "max_aqi"]]
-            best_air = df.nsmallest(10, "max_aqi")[["name", "country", "max_aqi"]]
+            top_polluted = zip(summary["top10"]["name"], summary["top10"]["country"], summary["top10"]["max_aqi"])
+            best_air = zip(trends["best10"]["name"], trends["best10"]["country"], trends["best10"]["max_aqi"])
             
             return html.Div([
                 dbc.Row([
@@ -905,22 +1248,22 @@ def render_tab(tab, data):
                                 html.Table([
                                     html.Thead([
                                         html.Tr([
-                                            html.Th("Location", style={"color": "#cccccc"}),
-                                            html.Th("Country", style={"color": "#cccccc"}),
-                                            html.Th("AQI", style={"color": "#cccccc"})
+                                            html.Th("Location", style=TEXT_STYLE),
+                                            html.Th("Country", style=TEXT_STYLE),
+                                            html.Th("AQI", style=TEXT_STYLE)
                                         ])
                                     ]),
                                     html.Tbody([
                                         html.Tr([
-                                            html.Td(row["name"], style={"color": "#858585"}),
-                                            html.Td(row["country"], style={"color": "#858585"}),
-                                            html.Td(str(int(row["max_aqi"])), style={"color": "#ff5252", "fontWeight": "600"})
+                                            html.Td(name, style=MUTED_TEXT_STYLE),
+                                            html.Td(country, style=MUTED_TEXT_STYLE),
+                                            html.Td(str(int(aqi)), style={"color": "#ff5252", "fontWeight": "600"})
                                         ])
-                                        for _, row in top_polluted.iterrows()
+                                        for name, country, aqi in top_polluted
                                     ])
-                                ], className="table table-sm", style={"color": "#cccccc"})
+                                ], className="table table-sm", style=TEXT_STYLE)
                             ])
-                        ], style={"backgroundColor": "#2d2d30", "border": "1px solid #3e3e42"})
+                        ], style=CARD_STYLE)
                     ], width=6)
                 ]),
                 dbc.Row([
@@ -931,41 +1274,47 @@ def render_tab(tab, data):
                                 html.Table([
                                     html.Thead([
                                         html.Tr([
-                                            html.Th("Location", style={"color": "#cccccc"}),
-                                            html.Th("Country", style={"color": "#cccccc"}),
-                                            html.Th("AQI", style={"color": "#cccccc"})
+                                            html.Th("Location", style=TEXT_STYLE),
+                                            html.Th("Country", style=TEXT_STYLE),
+                                            html.Th("AQI", style=TEXT_STYLE)
                                         ])
                                     ]),
                                     html.Tbody([
                                         html.Tr([
-                                            html.Td(row["name"], style={"color": "#858585"}),
-                                            html.Td(row["country"], style={"color": "#858585"}),
-                                            html.Td(str(int(row["max_aqi"])), style={"color": "#4caf50", "fontWeight": "600"})
+                                            html.Td(name, style=MUTED_TEXT_STYLE),
+                                            html.Td(country, style=MUTED_TEXT_STYLE),
+                                            html.Td(str(int(aqi)), style={"color": "#4caf50", "fontWeight": "600"})
                                         ])
-                                        for _, row in best_air.iterrows()
+                                        for name, country, aqi in best_air
                                     ])
-                                ], className="table table-sm", style={"color": "#cccccc"})
+                                ], className="table table-sm", style=TEXT_STYLE)
                             ])
-                        ], style={"backgroundColor": "#2d2d30", "border": "1px solid #3e3e42"})
+                        ], style=CARD_STYLE)
                     ], width=12, className="mt-3")
                 ])
             ])
         
-        elif tab == "compare":
+        # Only the columns the remaining tabs read are decoded, leaving the nested sensors alone
+        df = decode_frame(data, columns=["name", "country", "max_aqi"])
+        if df.empty:
+            return html.Div("No data available", className="text-center py-5")
+        
+        if tab == "compare":
             # Enhanced Compare Tab with city selection
-            if "max_aqi" not in df.columns or "name" not in df.columns:
+            if df["max_aqi"].isna().all() or df["name"].isna().all():
                 return html.Div("Data format error", className="text-center py-5")
             
-            # Get unique cities for dropdown
-            cities = df[["name", "country", "max_aqi"]].drop_duplicates().sort_values("name")
-            city_options = [{"label": f"{row['name']}, {row['country']} (AQI: {int(row['max_aqi'])})", 
-                           "value": f"{row['name']}|{row['country']}"} 
-                          for _, row in cities.iterrows()]
+            # Get unique cities for dropdown, labelled with vectorized string ops instead of iterrows
+            cities = df.drop_duplicates().sort_values("name")
+            names, countries = cities["name"].astype(str), cities["country"].astype(str)
+            labels = names + ", " + countries + " (AQI: " + cities["max_aqi"].astype(int).astype(str) + ")"
+            values = names + "|" + countries
+            city_options = [{"label": label, "value": value} for label, value in zip(labels.tolist(), values.tolist())]
             
             return html.Div([
-                html.H5("City Comparison", className="mb-3", style={"color": "#cccccc"}),
+                html.H5("City Comparison", className="mb-3", style=TEXT_STYLE),
                 html.P("Select up to 5 cities to compare their air quality metrics.", 
-                      className="mb-3", style={"color": "#858585"}),
+                      className="mb-3", style=MUTED_TEXT_STYLE),
                 dcc.Dropdown(
                     id="city-compare-dropdown",
                     options=city_options,
@@ -987,13 +1336,13 @@ def render_tab(tab, data):
                         "OpenAI API key not configured. Please add OPENAI_API_KEY to your .env file or configure it in Settings to enable Smart Analytics."
                     ], color="warning", className="mb-3"),
                     html.P("Smart Analytics uses AI to provide deep insights, risk assessments, and recommendations based on your air quality and weather data.", 
-                          style={"color": "#858585"})
+                          style=MUTED_TEXT_STYLE)
                 ])
             
             return html.Div([
-                html.H5("🤖 Smart Analytics", className="mb-3", style={"color": "#cccccc"}),
+                html.H5("🤖 Smart Analytics", className="mb-3", style=TEXT_STYLE),
                 html.P("AI-powered analysis of your air quality and weather data", 
-                      className="mb-3", style={"color": "#858585"}),
+                      className="mb-3", style=MUTED_TEXT_STYLE),
                 dbc.Button([
                     html.I(className="fas fa-brain me-2"),
                     "Generate AI Insights"
@@ -1015,8 +1364,12 @@ def render_tab(tab, data):
         
         elif tab == "settings":
             # Get current settings
-            settings = db.get_all_settings()
-            api_keys_info = db.get_all_api_keys()
+            # One database round-trip for every value shown below
+            snapshot = db.get_settings_snapshot()
+            settings = snapshot["settings"]
+            openaq_key = snapshot["api_keys"].get("openaq") or config.OPENAQ_API_KEY
+            weather_key = snapshot["api_keys"].get("weather") or config.WEATHER_API_KEY
+            openai_key = snapshot["api_keys"].get("openai")
             
             return html.Div([
                 html.H4("Settings", className="mb-4"),
@@ -1029,47 +1382,47 @@ def render_tab(tab, data):
                     dbc.CardBody([
                         # OpenAQ API Key
                         html.Div([
-                            html.Label("OpenAQ API Key", className="form-label", style={"fontWeight": "600"}),
+                            html.Label("OpenAQ API Key", className="form-label", style=HEADER_TEXT_STYLE),
                             dbc.Input(
                                 id="openaq-key-input",
                                 type="password",
                                 placeholder="Enter OpenAQ API key",
-                                value=db.get_api_key("openaq") or config.OPENAQ_API_KEY or "",
+                                value=openaq_key or "",
                                 className="mb-2"
                             ),
                             dbc.Button("Save", id="save-openaq-key-btn", color="primary", size="sm", className="me-2"),
-                            dbc.Badge("Configured" if (db.get_api_key("openaq") or config.OPENAQ_API_KEY) else "Not Set", 
-                                    color="success" if (db.get_api_key("openaq") or config.OPENAQ_API_KEY) else "secondary", className="ms-2")
+                            dbc.Badge("Configured" if openaq_key else "Not Set", 
+                                    color="success" if openaq_key else "secondary", className="ms-2")
                         ], className="mb-4"),
                         
                         # WeatherAPI Key
                         html.Div([
-                            html.Label("WeatherAPI Key", className="form-label", style={"fontWeight": "600"}),
+                            html.Label("WeatherAPI Key", className="form-label", style=HEADER_TEXT_STYLE),
                             dbc.Input(
                                 id="weather-key-input",
                                 type="password",
                                 placeholder="Enter WeatherAPI key",
-                                value=db.get_api_key("weather") or config.WEATHER_API_KEY or "",
+                                value=weather_key or "",
                                 className="mb-2"
                             ),
                             dbc.Button("Save", id="save-weather-key-btn", color="primary", size="sm", className="me-2"),
-                            dbc.Badge("Configured" if (db.get_api_key("weather") or config.WEATHER_API_KEY) else "Not Set",
-                                    color="success" if (db.get_api_key("weather") or config.WEATHER_API_KEY) else "secondary", className="ms-2")
+                            dbc.Badge("Configured" if weather_key else "Not Set",
+                                    color="success" if weather_key else "secondary", className="ms-2")
                         ], className="mb-4"),
                         
                         # OpenAI Key
                         html.Div([
-                            html.Label("OpenAI API Key (Optional)", className="form-label", style={"fontWeight": "600"}),
+                            html.Label("OpenAI API Key (Optional)", className="form-label", style=HEADER_TEXT_STYLE),
                             dbc.Input(
                                 id="openai-key-input",
                                 type="password",
                                 placeholder="Enter OpenAI API key",
-                                value=db.get_api_key("openai") or "",
+                                value=openai_key or "",
                                 className="mb-2"
                             ),
                             dbc.Button("Save", id="save-openai-key-btn", color="primary", size="sm", className="me-2"),
-                            dbc.Badge("Configured" if db.get_api_key("openai") else "Not Set",
-                                    color="success" if db.get_api_key("openai") else "secondary", className="ms-2"),
+                            dbc.Badge("Configured" if openai_key else "Not Set",
+                                    color="success" if openai_key else "secondary", className="ms-2"),
                             html.Small("Used for AI-powered insights and recommendations", className="text-muted d-block mt-1")
                         ], className="mb-4")
                     ])
@@ -1083,7 +1436,7 @@ def render_tab(tab, data):
                     dbc.CardBody([
                         # Refresh Interval
                         html.Div([
-                            html.Label("Data Refresh Interval (seconds)", className="form-label", style={"fontWeight": "600"}),
+                            html.Label("Data Refresh Interval (seconds)", className="form-label", style=HEADER_TEXT_STYLE),
                             dbc.Input(
                                 id="refresh-interval-input",
                                 type="number",
@@ -1098,7 +1451,7 @@ def render_tab(tab, data):
                         
                         # AQI Alert Threshold
                         html.Div([
-                            html.Label("AQI Alert Threshold", className="form-label", style={"fontWeight": "600"}),
+                            html.Label("AQI Alert Threshold", className="form-label", style=HEADER_TEXT_STYLE),
                             dbc.Input(
                                 id="aqi-threshold-input",
                                 type="number",
@@ -1113,7 +1466,7 @@ def render_tab(tab, data):
                         
                         # Notifications
                         html.Div([
-                            html.Label("Notifications", className="form-label", style={"fontWeight": "600"}),
+                            html.Label("Notifications", className="form-label", style=HEADER_TEXT_STYLE),
                             dbc.Switch(
                                 id="notifications-switch",
                                 label="Enable notifications",
@@ -1130,8 +1483,8 @@ def render_tab(tab, data):
                     ]),
                     dbc.CardBody([
                         html.P(f"Database Location: {db.db_path}", className="mb-2"),
-                        html.P(f"Favorites: {len(db.get_favorites())}", className="mb-2"),
-                        html.P(f"History Entries: {len(db.get_history())}", className="mb-0")
+                        html.P(f"Favorites: {snapshot['favorites_count']}", className="mb-2"),
+                        html.P(f"History Entries: {snapshot['history_count']}", className="mb-0")
                     ])
                 ])
             ])
@@ -1142,20 +1495,68 @@ def render_tab(tab, data):
         return html.Div(f"Error: {str(e)}", className="text-center py-5")
 
 
-@callback(
+app.clientside_callback(
+    ClientsideFunction(namespace="controls", function_name="toggleSearch"),
     Output("search-modal", "is_open"),
     Input("search-btn", "n_clicks"),
     State("search-modal", "is_open"),
     prevent_initial_call=True
 )
-def toggle_search(n, is_open):
-    """Toggle search modal - only responds to button click"""
-    if n:
-        return not is_open
-    return is_open
+
+# The date is formatted in each client's locale and time zone rather than frozen at server start
+app.clientside_callback(
+    ClientsideFunction(namespace="controls", function_name="currentDate"),
+    Output("current-time", "children"),
+    Input("interval-component", "n_intervals"),
+    State("current-time", "children")
+)
+
+app.clientside_callback(
+    ClientsideFunction(namespace="controls", function_name="renderSearchBody"),
+    Output("search-modal-body", "children"),
+    Input("search-modal", "is_open"),
+    [State("search-modal-body", "children"), State("search-debounce-ms", "data")],
+    prevent_initial_call=True
+)
 
 
 # ISSUE-001: Search Functionality - Fixed modal closing issue
+def component(namespace, component_type, **props):
+    """Component in Dash's serialized form, skipping Component construction and prop validation"""
+    return {"namespace": namespace, "type": component_type, "props": props}
+
+
+def search_result_card(loc):
+    """
+    Build a search result card for a location
+    
+    Search re-renders up to 20 of these per query, so they are built as plain component
+    dictionaries (the same JSON dbc.Card/html.Div serialize to) instead of Component objects.
+    
+    Args:
+        loc: Location dictionary
+        
+    Returns:
+        Serialized dbc.Card component
+    """
+    html_ns, dbc_ns = "dash_html_components", "dash_bootstrap_components"
+    location_id = loc.get("location_id", "")
+    return component(dbc_ns, "Card", className="mb-2", style=CARD_STYLE, children=[
+        component(dbc_ns, "CardBody", children=[
+            component(html_ns, "Div", children=[
+                component(html_ns, "H6", children=loc.get("name", "Unknown"), className="mb-1", style=TEXT_STYLE),
+                component(html_ns, "Small", children=f"{loc.get('country', 'N/A')} | AQI: {loc.get('max_aqi', 'N/A')}", className="text-muted")
+            ]),
+            component(html_ns, "Div", children=[
+                component(dbc_ns, "Button", children="View on Map", id={"type": "search-select", "index": location_id},
+                          color="primary", size="sm", className="me-2 mt-2"),
+                component(dbc_ns, "Button", children="Add to Favorites", id={"type": "search-favorite", "index": location_id},
+                          color="success", size="sm", className="mt-2")
+            ])
+        ])
+    ])
+
+
 @callback(
     Output("search-results", "children"),
     Input("search-input", "value"),
@@ -1171,20 +1572,8 @@ def search_locations(query, data):
         if len(query_lower) < 2:
             return html.Div("Please enter at least 2 characters", className="text-muted text-center py-3")
         
-        # Search in location names and countries
-        results = []
-        for loc in data:
-            if not isinstance(loc, dict):
-                continue
-            
-            name = loc.get("name", "").lower()
-            country = loc.get("country", "").lower()
-            country_code = loc.get("country_code", "").lower()
-            
-            if (query_lower in name or 
-                query_lower in country or 
-                query_lower in country_code):
-                results.append(loc)
+        # Search in location names and countries, limited to the top 20 results
+        results = search_records(load_locations(data), query_lower, limit=20)
         
         if not results:
             return html.Div([
@@ -1192,44 +1581,8 @@ def search_locations(query, data):
                 f"No locations found for '{query}'"
             ], className="text-muted text-center py-3")
         
-        # Limit to top 20 results
-        results = results[:20]
-        
         # Create result cards
-        result_cards = []
-        for loc in results:
-            coords = loc.get("coordinates", {})
-            lat = coords.get("latitude") if isinstance(coords, dict) else None
-            lon = coords.get("longitude") if isinstance(coords, dict) else None
-            aqi = loc.get("max_aqi", "N/A")
-            aqi_color = data_processor.get_aqi_color(aqi) if isinstance(aqi, (int, float)) else "#666"
-            
-            result_cards.append(
-                dbc.Card([
-                    dbc.CardBody([
-                        html.Div([
-                            html.H6(loc.get("name", "Unknown"), className="mb-1", style={"color": "#cccccc"}),
-                            html.Small(f"{loc.get('country', 'N/A')} | AQI: {aqi}", className="text-muted")
-                        ]),
-                        html.Div([
-                            dbc.Button(
-                                "View on Map",
-                                id={"type": "search-select", "index": loc.get("location_id", "")},
-                                color="primary",
-                                size="sm",
-                                className="me-2 mt-2"
-                            ),
-                            dbc.Button(
-                                "Add to Favorites",
-                                id={"type": "search-favorite", "index": loc.get("location_id", "")},
-                                color="success",
-                                size="sm",
-                                className="mt-2"
-                            )
-                        ])
-                    ])
-                ], className="mb-2", style={"backgroundColor": "#2d2d30", "border": "1px solid #3e3e42"})
-            )
+        result_cards = [search_result_card(loc) for loc in results]
         
         return html.Div([
             html.P(f"Found {len(results)} location(s)", className="text-muted mb-3"),
@@ -1252,22 +1605,16 @@ def select_location_from_search(n_clicks_list, data):
     """Select location from search results"""
     if ctx.triggered and data:
         try:
-            triggered_id = ctx.triggered[0]["prop_id"]
-            if "search-select" in triggered_id:
-                location_id = json.loads(triggered_id.split(".")[0])["index"]
-                for loc in data:
-                    if isinstance(loc, dict):
-                        loc_id = str(loc.get("location_id") or loc.get("id", ""))
-                        if loc_id == str(location_id):
-                            # Add to history
-                            db.add_to_history(
-                                location_id=loc_id,
-                                name=loc.get("name", "Unknown"),
-                                country=loc.get("country", ""),
-                                latitude=loc.get("coordinates", {}).get("latitude") if isinstance(loc.get("coordinates"), dict) else None,
-                                longitude=loc.get("coordinates", {}).get("longitude") if isinstance(loc.get("coordinates"), dict) else None
-                            )
-                            return loc, False  # Close modal
+            triggered_id = ctx.triggered_id
+            if isinstance(triggered_id, dict) and triggered_id.get("type") == "search-select":
+                loc_id = str(triggered_id["index"])
+                loc = lookup_record(load_locations(data), loc_id)
+                if loc:
+                    # Add to history
+                    view = normalize_location(loc)
+                    db.add_to_history(location_id=loc_id, name=view.name, country=view.country,
+                                      latitude=view.lat, longitude=view.lon)
+                    return loc, False  # Close modal
         except Exception as e:
             logger.error(f"Error selecting location from search: {e}")
     return no_update, no_update
@@ -1283,22 +1630,15 @@ def add_favorite_from_search(n_clicks_list, data, current_view):
     """Add location to favorites from search"""
     if ctx.triggered and data:
         try:
-            triggered_id = ctx.triggered[0]["prop_id"]
-            if "search-favorite" in triggered_id:
-                location_id = json.loads(triggered_id.split(".")[0])["index"]
-                for loc in data:
-                    if isinstance(loc, dict):
-                        loc_id = str(loc.get("location_id") or loc.get("id", ""))
-                        if loc_id == str(location_id):
-                            # Check if already in favorites to avoid duplicates
-                            if not db.is_favorite(loc_id):
-                                db.add_favorite(
-                                    location_id=loc_id,
-                                    name=loc.get("name", "Unknown"),
-                                    country=loc.get("country", ""),
-                                    latitude=loc.get("coordinates", {}).get("latitude") if isinstance(loc.get("coordinates"), dict) else None,
-                                    longitude=loc.get("coordinates", {}).get("longitude") if isinstance(loc.get("coordinates"), dict) else None
-                                )
+            triggered_id = ctx.triggered_id
+            if isinstance(triggered_id, dict) and triggered_id.get("type") == "search-favorite":
+                loc_id = str(triggered_id["index"])
+                loc = lookup_record(load_locations(data), loc_id)
+                # Check if already in favorites to avoid duplicates
+                if loc and not db.is_favorite(loc_id):
+                    view = normalize_location(loc)
+                    db.add_favorite(location_id=loc_id, name=view.name, country=view.country,
+                                    latitude=view.lat, longitude=view.lon)
         except Exception as e:
             logger.error(f"Error adding favorite from search: {e}")
     return no_update, no_update
@@ -1328,7 +1668,9 @@ def save_openaq_key(n, key_value):
         db.save_api_key("openaq", key_value)
         # Reinitialize API client with new key
         global api_client
+        previous_client = api_client
         api_client = OpenAQClient(api_key=key_value, db=db)
+        previous_client.close()
         return "Saved!"
     return "Save"
 
@@ -1404,17 +1746,18 @@ def save_notifications(value):
     Output("export-pdf-btn", "children"),
     Input("export-pdf-btn", "n_clicks"),
     State("locations-data", "data"),
-    prevent_initial_call=True
+    prevent_initial_call=True,
+    background=True,
+    running=[(Output("export-pdf-btn", "disabled"), True, False)]
 )
 def export_pdf(n, data):
     if n and data:
         try:
-            df = pd.DataFrame(data)
-            # Generate comparison report for all locations
-            locations_list = df.to_dict('records')
+            # Generate comparison report for all locations, converting only the columns it prints
+            locations_list = decode_records(load_locations(data), columns=["name", "country", "max_aqi", "max_aqi_category"])
             if locations_list:
                 report_path = report_gen.generate_comparison_report(locations_list)
-                return f"PDF Saved: {report_path.name}!"
+                return f"PDF Saved: {Path(report_path).name}!"
         except Exception as e:
             logger.error(f"Error exporting PDF: {e}")
             return "Error!"
@@ -1425,14 +1768,18 @@ def export_pdf(n, data):
     Output("export-excel-btn", "children"),
     Input("export-excel-btn", "n_clicks"),
     State("locations-data", "data"),
-    prevent_initial_call=True
+    prevent_initial_call=True,
+    background=True,
+    running=[(Output("export-excel-btn", "disabled"), True, False)]
 )
 def export_excel(n, data):
     if n and data:
         try:
-            df = pd.DataFrame(data)
+            table = export_table(load_locations(data))
             excel_path = config.EXPORTS_DIR / f"airwatch_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-            df.to_excel(excel_path, index=False)
+            # xlsxwriter writes noticeably faster than openpyxl and never reads the file back
+            with pd.ExcelWriter(excel_path, engine="xlsxwriter") as writer:
+                table.to_pandas().to_excel(writer, index=False)
             return "Excel Exported!"
         except Exception as e:
             logger.error(f"Error exporting Excel: {e}")
@@ -1449,9 +1796,9 @@ def export_excel(n, data):
 def export_csv(n, data):
     if n and data:
         try:
-            df = pd.DataFrame(data)
             csv_path = config.EXPORTS_DIR / f"airwatch_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-            df.to_csv(csv_path, index=False)
+            # Write straight from the Arrow table instead of round-tripping through pandas
+            pa_csv.write_csv(export_table(load_locations(data)), csv_path)
             return "CSV Exported!"
         except Exception as e:
             logger.error(f"Error exporting CSV: {e}")
@@ -1480,6 +1827,7 @@ def update_city_comparison(selected_cities, locations_data):
             selected_list = selected_list[:5]
         
         # Extract city data
+        locations_data = decode_records(load_locations(locations_data))
         comparison_data = []
         for city_str in selected_list:
             name, country = city_str.split("|")
@@ -1521,45 +1869,45 @@ def update_city_comparison(selected_cities, locations_data):
                     html.Table([
                         html.Thead([
                             html.Tr([
-                                html.Th("City", style={"color": "#cccccc"}),
-                                html.Th("Country", style={"color": "#cccccc"}),
-                                html.Th("AQI", style={"color": "#cccccc"}),
-                                html.Th("Category", style={"color": "#cccccc"})
+                                html.Th("City", style=TEXT_STYLE),
+                                html.Th("Country", style=TEXT_STYLE),
+                                html.Th("AQI", style=TEXT_STYLE),
+                                html.Th("Category", style=TEXT_STYLE)
                             ])
                         ]),
                         html.Tbody([
                             html.Tr([
-                                html.Td(row[0], style={"color": "#858585"}),
-                                html.Td(row[1], style={"color": "#858585"}),
+                                html.Td(row[0], style=MUTED_TEXT_STYLE),
+                                html.Td(row[1], style=MUTED_TEXT_STYLE),
                                 html.Td(row[2]),
                                 html.Td(row[3])
                             ])
                             for row in comparison_rows
                         ])
-                    ], className="table table-striped", style={"color": "#cccccc"})
+                    ], className="table table-striped", style=TEXT_STYLE)
                 ])
-            ], style={"backgroundColor": "#2d2d30", "border": "1px solid #3e3e42"}, className="mb-3"),
+            ], style=CARD_STYLE, className="mb-3"),
             
             # AI Comparison if available
             dbc.Card([
                 dbc.CardHeader("🤖 AI-Powered Analysis"),
                 dbc.CardBody([
                     html.Div([
-                        html.H6("Summary", className="mb-2", style={"color": "#cccccc"}),
+                        html.H6("Summary", className="mb-2", style=TEXT_STYLE),
                         html.P(ai_comparison.get("comparison_summary", "Analysis unavailable"), 
-                              style={"color": "#858585"}) if ai_comparison and not ai_comparison.get("error") else
+                              style=MUTED_TEXT_STYLE) if ai_comparison and not ai_comparison.get("error") else
                         html.P("AI comparison requires OpenAI API key configuration", 
                               style={"color": "#858585", "fontStyle": "italic"})
                     ]),
                     html.Div([
-                        html.H6("Key Insights", className="mb-2 mt-3", style={"color": "#cccccc"}),
+                        html.H6("Key Insights", className="mb-2 mt-3", style=TEXT_STYLE),
                         html.Ul([
                             html.Li(insight, style={"color": "#858585", "marginBottom": "5px"})
                             for insight in (ai_comparison.get("insights", []) if ai_comparison and not ai_comparison.get("error") else [])
                         ])
                     ]) if ai_comparison and not ai_comparison.get("error") and ai_comparison.get("insights") else html.Div()
                 ])
-            ], style={"backgroundColor": "#2d2d30", "border": "1px solid #3e3e42"}) if ai_comparison and not ai_comparison.get("error") else html.Div()
+            ], style=CARD_STYLE) if ai_comparison and not ai_comparison.get("error") else html.Div()
         ])
         
     except Exception as e:
@@ -1572,7 +1920,10 @@ def update_city_comparison(selected_cities, locations_data):
     [Output("ai-insights-content", "children"), Output("generate-ai-insights-btn", "children")],
     Input("generate-ai-insights-btn", "n_clicks"),
     [State("locations-data", "data"), State("selected-location", "data")],
-    prevent_initial_call=True
+    prevent_initial_call=True,
+    # The OpenAI round-trip takes seconds, so keep it off the request threads like the PDF reports
+    background=True,
+    running=[(Output("generate-ai-insights-btn", "disabled"), True, False)]
 )
 def generate_ai_insights(n_clicks, locations_data, selected_location):
     """Generate AI-powered insights"""
@@ -1611,7 +1962,7 @@ def generate_ai_insights(n_clicks, locations_data, selected_location):
                     logger.error(f"Error fetching weather for AI insights: {e}")
         
         # Generate AI insights
-        ai_result = openai_client.generate_analytics_insights(locations_data, weather_data)
+        ai_result = openai_client.generate_analytics_insights(decode_records(load_locations(locations_data)), weather_data)
         
         if ai_result.get("error"):
             return html.Div([
@@ -1637,9 +1988,9 @@ def generate_ai_insights(n_clicks, locations_data, selected_location):
                 dbc.Card([
                     dbc.CardHeader("📋 Executive Summary"),
                     dbc.CardBody([
-                        html.P(insights.get("summary"), style={"color": "#cccccc", "lineHeight": "1.6"})
+                        html.P(insights.get("summary"), style=BODY_TEXT_STYLE)
                     ])
-                ], style={"backgroundColor": "#2d2d30", "border": "1px solid #3e3e42"}, className="mb-3")
+                ], style=CARD_STYLE, className="mb-3")
             )
         
         # Key Findings
@@ -1651,11 +2002,11 @@ def generate_ai_insights(n_clicks, locations_data, selected_location):
                         dbc.CardHeader("🔍 Key Findings"),
                         dbc.CardBody([
                             html.Ul([
-                                html.Li(finding, style={"color": "#858585", "marginBottom": "8px"})
+                                html.Li(finding, style=LIST_ITEM_STYLE)
                                 for finding in findings_list
                             ])
                         ])
-                    ], style={"backgroundColor": "#2d2d30", "border": "1px solid #3e3e42"}, className="mb-3")
+                    ], style=CARD_STYLE, className="mb-3")
                 )
         
         # Risk Assessment
@@ -1664,9 +2015,9 @@ def generate_ai_insights(n_clicks, locations_data, selected_location):
                 dbc.Card([
                     dbc.CardHeader("⚠️ Risk Assessment"),
                     dbc.CardBody([
-                        html.P(insights.get("risk_assessment"), style={"color": "#cccccc", "lineHeight": "1.6"})
+                        html.P(insights.get("risk_assessment"), style=BODY_TEXT_STYLE)
                     ])
-                ], style={"backgroundColor": "#2d2d30", "border": "1px solid #3e3e42"}, className="mb-3")
+                ], style=CARD_STYLE, className="mb-3")
             )
         
         # Geographic Insights
@@ -1675,9 +2026,9 @@ def generate_ai_insights(n_clicks, locations_data, selected_location):
                 dbc.Card([
                     dbc.CardHeader("🌍 Geographic Insights"),
                     dbc.CardBody([
-                        html.P(insights.get("geographic_insights"), style={"color": "#cccccc", "lineHeight": "1.6"})
+                        html.P(insights.get("geographic_insights"), style=BODY_TEXT_STYLE)
                     ])
-                ], style={"backgroundColor": "#2d2d30", "border": "1px solid #3e3e42"}, className="mb-3")
+                ], style=CARD_STYLE, className="mb-3")
             )
         
         # Recommendations
@@ -1689,11 +2040,11 @@ def generate_ai_insights(n_clicks, locations_data, selected_location):
                         dbc.CardHeader("💡 Recommendations"),
                         dbc.CardBody([
                             html.Ul([
-                                html.Li(rec, style={"color": "#858585", "marginBottom": "8px"})
+                                html.Li(rec, style=LIST_ITEM_STYLE)
                                 for rec in rec_list
                             ])
                         ])
-                    ], style={"backgroundColor": "#2d2d30", "border": "1px solid #3e3e42"}, className="mb-3")
+                    ], style=CARD_STYLE, className="mb-3")
                 )
         
         # Weather Correlation
@@ -1702,9 +2053,9 @@ def generate_ai_insights(n_clicks, locations_data, selected_location):
                 dbc.Card([
                     dbc.CardHeader("🌤️ Weather Correlation"),
                     dbc.CardBody([
-                        html.P(insights.get("weather_correlation"), style={"color": "#cccccc", "lineHeight": "1.6"})
+                        html.P(insights.get("weather_correlation"), style=BODY_TEXT_STYLE)
                     ])
-                ], style={"backgroundColor": "#2d2d30", "border": "1px solid #3e3e42"}, className="mb-3")
+                ], style=CARD_STYLE, className="mb-3")
             )
         
         # If no structured data, show raw response
@@ -1716,7 +2067,7 @@ def generate_ai_insights(n_clicks, locations_data, selected_location):
                         html.Pre(ai_result.get("raw_response"), 
                                 style={"color": "#cccccc", "whiteSpace": "pre-wrap", "fontFamily": "inherit"})
                     ])
-                ], style={"backgroundColor": "#2d2d30", "border": "1px solid #3e3e42"})
+                ], style=CARD_STYLE)
             )
         
         return html.Div(result_cards), [
@@ -1748,10 +2099,10 @@ def remove_favorite(n_clicks_list, current_view):
     try:
         # Only process if a remove button was actually clicked (not just view regeneration)
         if ctx.triggered and current_view == "favorites":
-            triggered_id = ctx.triggered[0]["prop_id"]
-            if "remove-fav" in triggered_id and ctx.triggered[0]["value"]:
+            triggered_id = ctx.triggered_id
+            if isinstance(triggered_id, dict) and triggered_id.get("type") == "remove-fav" and ctx.triggered[0]["value"]:
                 # Check if this button was actually clicked (value > 0)
-                location_id = json.loads(triggered_id.split(".")[0])["index"]
+                location_id = triggered_id["index"]
                 db.remove_favorite(location_id)
         
         # Refresh favorites view only if we're on favorites tab
@@ -1766,7 +2117,7 @@ def remove_favorite(n_clicks_list, current_view):
                             html.P(f"Country: {fav.get('country', 'N/A')}", className="text-muted mb-2"),
                             dbc.Button("Remove", id={"type": "remove-fav", "index": fav["location_id"]}, color="danger", size="sm")
                         ])
-                    ], className="mb-2", style={"backgroundColor": "#2d2d30", "border": "1px solid #3e3e42", "color": "#cccccc"})
+                    ], className="mb-2", style=LIST_CARD_STYLE)
                 )
             return html.Div([
                 html.H4("Favorites", className="mb-4"),
@@ -1777,276 +2128,101 @@ def remove_favorite(n_clicks_list, current_view):
     return no_update
 
 
+# Fields the marker modal's forecast cards display
+FORECAST_DAY_FIELDS = ("date", "condition", "max_temp_c", "min_temp_c", "max_wind_kph", "avg_humidity", "uv_index")
+
+
+def display_fields(values, fields=None):
+    """
+    Stringify the scalar fields of a weather dictionary for the clientside marker modal
+    
+    Numbers are formatted by Python so the browser shows them exactly as str() would
+    (e.g. 20.0 stays "20.0"); missing fields are dropped and fall back to placeholders.
+    
+    Args:
+        values: Weather or forecast day dictionary
+        fields: Keys to keep (all scalar fields if None)
+        
+    Returns:
+        Dictionary of display strings
+    """
+    if fields is not None:
+        values = {key: values.get(key) for key in fields}
+    return {key: value if isinstance(value, str) else str(value)
+            for key, value in values.items() if isinstance(value, (str, int, float))}
+
+
 # Marker Action Modal Callbacks - Enhanced for GeoTEO
+# The server only gathers the data; assets/marker.js renders the header and tabs from this payload
 @callback(
-    [Output("marker-modal-header", "children"), Output("marker-modal-body", "children")],
-    Input("clicked-location", "data")
+    [Output("marker-modal-payload", "data"), Output("marker-modal-key", "data")],
+    Input("clicked-location", "data"),
+    State("marker-modal-key", "data")
 )
-def update_marker_modal(location_data):
-    """Update marker modal with comprehensive geospatial and meteorological information"""
+def update_marker_modal(location_data, shown_key):
+    """Collect air quality, weather and favorite status for the clicked marker"""
     if not location_data or not isinstance(location_data, dict):
-        return "Location Details", html.Div("No location selected")
+        return None, None
     
-    name = location_data.get("name", "Unknown")
-    country = location_data.get("country", "N/A")
-    aqi = location_data.get("max_aqi", 0)
-    aqi_category = data_processor.get_aqi_category(aqi) if isinstance(aqi, (int, float)) else "Unknown"
-    aqi_color = data_processor.get_aqi_color(aqi) if isinstance(aqi, (int, float)) else "#666"
+    loc = normalize_location(location_data)
+    is_favorite = db.is_favorite(loc.id)
     
-    coords = location_data.get("coordinates", {})
-    lat = coords.get("latitude") if isinstance(coords, dict) else None
-    lon = coords.get("longitude") if isinstance(coords, dict) else None
+    # Re-opening the same marker reuses the payload already in the browser, until the cached
+    # current conditions could have changed or the favorite status did
+    modal_key = [loc.id, loc.aqi, is_favorite, int(time.time() // config.WEATHER_CACHE_TTL)]
+    if shown_key == modal_key:
+        raise PreventUpdate
     
-    is_favorite = db.is_favorite(str(location_data.get("location_id") or location_data.get("id", "")))
+    aqi_category = data_processor.get_aqi_category(loc.aqi) if loc.aqi is not None else "Unknown"
+    aqi_color = data_processor.get_aqi_color(loc.aqi) if loc.aqi is not None else "#666"
     
     # Fetch weather data if coordinates are available
     weather_data = None
     forecast_data = None
     weather_analysis = None
     
-    if lat and lon and config.WEATHER_API_KEY:
+    if loc.lat and loc.lon and config.WEATHER_API_KEY:
         try:
-            weather_data = weather_client.get_current_weather(lat, lon)
-            forecast_data = weather_client.get_forecast(lat, lon, days=3)
-            if weather_data and aqi:
-                weather_analysis = weather_client.analyze_weather_air_quality_correlation(weather_data, aqi)
+            # Current conditions and forecast are requested concurrently
+            weather_data, forecast_data = weather_client.get_weather_bundle(loc.lat, loc.lon, days=3)
+            if weather_data and loc.aqi:
+                weather_analysis = weather_client.analyze_weather_air_quality_correlation(weather_data, loc.aqi)
         except Exception as e:
             logger.error(f"Error fetching weather data: {e}")
     
-    # Build modal content with tabs for different information
-    tabs_content = []
-    
-    # Tab 1: Overview (Air Quality + Current Weather)
-    overview_content = html.Div([
-        # Air Quality Section
-        html.Div([
-            html.H5("🌍 Air Quality", className="mb-3", style={"color": "#cccccc", "fontWeight": "600"}),
-            html.Div([
-                html.Div([
-                    html.P("Air Quality Index", className="mb-1", style={"fontSize": "14px", "color": "#858585"}),
-                    html.H3(str(aqi), style={"fontSize": "48px", "fontWeight": "700", "color": aqi_color, "margin": "0"}),
-                    dbc.Badge(aqi_category, style={"backgroundColor": aqi_color, "color": "#fff", "marginTop": "8px", "fontSize": "12px"})
-                ], style={"textAlign": "center", "padding": "20px", "backgroundColor": "#1e1e1e", "borderRadius": "4px", "marginBottom": "20px"})
-            ]),
-            # Pollutants info
-            html.Div([
-                html.P("Monitored Pollutants:", className="mb-2", style={"fontSize": "14px", "color": "#cccccc", "fontWeight": "600"}),
-                html.Div([
-                    html.Span(f"• {poll.get('display_name', 'Unknown')}: {poll.get('value', 'N/A')} {poll.get('units', '')}", 
-                             style={"display": "block", "fontSize": "12px", "color": "#858585", "marginBottom": "4px"})
-                    for poll in location_data.get("sensors", [])[:5]
-                ]) if location_data.get("sensors") else html.P("No sensor data available", style={"fontSize": "12px", "color": "#666"})
-            ])
-        ], className="mb-4"),
-        
-        # Current Weather Section
-        html.Div([
-            html.H5("🌤️ Current Weather", className="mb-3", style={"color": "#cccccc", "fontWeight": "600"}),
-            html.Div([
-                dbc.Row([
-                    dbc.Col([
-                        html.Div([
-                            html.I(className="fas fa-temperature-high", style={"fontSize": "24px", "color": "#ff6b6b", "marginRight": "10px"}),
-                            html.Div([
-                                html.H4(f"{weather_data.get('temperature_c', '--')}°C" if weather_data else "--", 
-                                       style={"margin": "0", "fontSize": "28px", "fontWeight": "700", "color": "#cccccc"}),
-                                html.Small(f"Feels like {weather_data.get('feels_like_c', '--')}°C" if weather_data else "", 
-                                          style={"color": "#858585", "fontSize": "12px"})
-                            ])
-                        ], style={"display": "flex", "alignItems": "center", "padding": "15px", "backgroundColor": "#1e1e1e", "borderRadius": "4px"})
-                    ], width=6, className="mb-2"),
-                    dbc.Col([
-                        html.Div([
-                            html.I(className="fas fa-cloud", style={"fontSize": "20px", "color": "#74b9ff", "marginRight": "10px"}),
-                            html.Div([
-                                html.P(weather_data.get('condition', 'N/A') if weather_data else "N/A", 
-                                      style={"margin": "0", "fontSize": "14px", "fontWeight": "600", "color": "#cccccc"}),
-                                html.Small(f"Cloud: {weather_data.get('cloud_cover', '--')}%" if weather_data else "", 
-                                          style={"color": "#858585", "fontSize": "11px"})
-                            ])
-                        ], style={"display": "flex", "alignItems": "center", "padding": "15px", "backgroundColor": "#1e1e1e", "borderRadius": "4px"})
-                    ], width=6, className="mb-2")
-                ]),
-                dbc.Row([
-                    dbc.Col([
-                        html.Div([
-                            html.I(className="fas fa-wind", style={"fontSize": "18px", "color": "#a29bfe", "marginRight": "8px"}),
-                            html.Div([
-                                html.P(f"{weather_data.get('wind_speed_kph', '--')} km/h" if weather_data else "--", 
-                                      style={"margin": "0", "fontSize": "14px", "fontWeight": "600", "color": "#cccccc"}),
-                                html.Small(weather_data.get('wind_direction', '') if weather_data else "", 
-                                          style={"color": "#858585", "fontSize": "11px"})
-                            ])
-                        ], style={"display": "flex", "alignItems": "center", "padding": "12px", "backgroundColor": "#1e1e1e", "borderRadius": "4px"})
-                    ], width=4, className="mb-2"),
-                    dbc.Col([
-                        html.Div([
-                            html.I(className="fas fa-tint", style={"fontSize": "18px", "color": "#0984e3", "marginRight": "8px"}),
-                            html.Div([
-                                html.P(f"{weather_data.get('humidity', '--')}%" if weather_data else "--", 
-                                      style={"margin": "0", "fontSize": "14px", "fontWeight": "600", "color": "#cccccc"}),
-                                html.Small("Humidity", style={"color": "#858585", "fontSize": "11px"})
-                            ])
-                        ], style={"display": "flex", "alignItems": "center", "padding": "12px", "backgroundColor": "#1e1e1e", "borderRadius": "4px"})
-                    ], width=4, className="mb-2"),
-                    dbc.Col([
-                        html.Div([
-                            html.I(className="fas fa-compress-arrows-alt", style={"fontSize": "18px", "color": "#00b894", "marginRight": "8px"}),
-                            html.Div([
-                                html.P(f"{weather_data.get('pressure_mb', '--')} mb" if weather_data else "--", 
-                                      style={"margin": "0", "fontSize": "14px", "fontWeight": "600", "color": "#cccccc"}),
-                                html.Small("Pressure", style={"color": "#858585", "fontSize": "11px"})
-                            ])
-                        ], style={"display": "flex", "alignItems": "center", "padding": "12px", "backgroundColor": "#1e1e1e", "borderRadius": "4px"})
-                    ], width=4, className="mb-2")
-                ], className="mt-2"),
-                html.Div([
-                    html.P([
-                        html.I(className="fas fa-sun", style={"marginRight": "8px", "color": "#fdcb6e"}),
-                        html.Span(f"UV Index: {weather_data.get('uv_index', '--')}" if weather_data else "UV Index: --", 
-                                 style={"fontSize": "13px", "color": "#cccccc"}),
-                        html.Span(" | ", style={"margin": "0 8px", "color": "#666"}),
-                        html.I(className="fas fa-eye", style={"marginRight": "8px", "color": "#6c5ce7"}),
-                        html.Span(f"Visibility: {weather_data.get('visibility_km', '--')} km" if weather_data else "Visibility: --", 
-                                 style={"fontSize": "13px", "color": "#cccccc"})
-                    ], style={"marginTop": "15px", "padding": "10px", "backgroundColor": "#1e1e1e", "borderRadius": "4px"})
-                ]) if weather_data else html.Div()
-            ]) if weather_data else html.Div([
-                html.P("Weather data unavailable. Please configure WEATHER_API_KEY in your .env file.", 
-                      style={"color": "#858585", "fontSize": "13px", "fontStyle": "italic"})
-            ])
-        ])
-    ])
-    
-    tabs_content.append(dbc.Tab(overview_content, label="Overview", tab_id="tab-overview"))
-    
-    # Tab 2: Weather Forecast (if available)
-    if forecast_data and forecast_data.get("forecast"):
-        forecast_content = html.Div([
-            html.H5("📅 3-Day Weather Forecast", className="mb-3", style={"color": "#cccccc", "fontWeight": "600"}),
-            html.Div([
-                dbc.Card([
-                    dbc.CardBody([
-                        html.Div([
-                            html.H6(day.get("date", "N/A"), className="mb-2", style={"color": "#cccccc", "fontWeight": "600"}),
-                            html.P(day.get("condition", "N/A"), className="mb-2", style={"fontSize": "13px", "color": "#858585"}),
-                            html.Div([
-                                html.Span(f"↑ {day.get('max_temp_c', '--')}°C", style={"color": "#ff6b6b", "fontWeight": "600", "marginRight": "15px"}),
-                                html.Span(f"↓ {day.get('min_temp_c', '--')}°C", style={"color": "#74b9ff", "fontWeight": "600"})
-                            ], className="mb-2"),
-                            html.Div([
-                                html.Small([
-                                    html.I(className="fas fa-wind", style={"marginRight": "4px"}),
-                                    f"{day.get('max_wind_kph', '--')} km/h"
-                                ], style={"color": "#858585", "fontSize": "11px", "marginRight": "15px"}),
-                                html.Small([
-                                    html.I(className="fas fa-tint", style={"marginRight": "4px"}),
-                                    f"{day.get('avg_humidity', '--')}%"
-                                ], style={"color": "#858585", "fontSize": "11px"}),
-                                html.Small([
-                                    html.I(className="fas fa-sun", style={"marginRight": "4px"}),
-                                    f"UV: {day.get('uv_index', '--')}"
-                                ], style={"color": "#858585", "fontSize": "11px"})
-                            ])
-                        ])
-                    ])
-                ], style={"backgroundColor": "#1e1e1e", "border": "1px solid #3e3e42", "marginBottom": "10px"})
-                for day in forecast_data["forecast"]
-            ])
-        ])
-        tabs_content.append(dbc.Tab(forecast_content, label="Forecast", tab_id="tab-forecast"))
-    
-    # Tab 3: Analysis (Weather-Air Quality Correlation)
-    if weather_analysis:
-        analysis_content = html.Div([
-            html.H5("🔬 Weather-Air Quality Analysis", className="mb-3", style={"color": "#cccccc", "fontWeight": "600"}),
-            html.Div([
-                dbc.Row([
-                    dbc.Col([
-                        html.Div([
-                            html.P("Wind Impact", className="mb-1", style={"fontSize": "12px", "color": "#858585"}),
-                            html.H6(weather_analysis.get("wind_impact", "unknown").title(), 
-                                   style={"color": "#cccccc", "fontWeight": "600"})
-                        ], style={"padding": "15px", "backgroundColor": "#1e1e1e", "borderRadius": "4px", "textAlign": "center"})
-                    ], width=4),
-                    dbc.Col([
-                        html.Div([
-                            html.P("Humidity Impact", className="mb-1", style={"fontSize": "12px", "color": "#858585"}),
-                            html.H6(weather_analysis.get("humidity_impact", "unknown").title(), 
-                                   style={"color": "#cccccc", "fontWeight": "600"})
-                        ], style={"padding": "15px", "backgroundColor": "#1e1e1e", "borderRadius": "4px", "textAlign": "center"})
-                    ], width=4),
-                    dbc.Col([
-                        html.Div([
-                            html.P("Temperature Impact", className="mb-1", style={"fontSize": "12px", "color": "#858585"}),
-                            html.H6(weather_analysis.get("temperature_impact", "unknown").title(), 
-                                   style={"color": "#cccccc", "fontWeight": "600"})
-                        ], style={"padding": "15px", "backgroundColor": "#1e1e1e", "borderRadius": "4px", "textAlign": "center"})
-                    ], width=4)
-                ], className="mb-3"),
-                html.Div([
-                    html.P("Overall Conditions", className="mb-2", style={"fontSize": "14px", "color": "#cccccc", "fontWeight": "600"}),
-                    dbc.Badge(weather_analysis.get("overall_conditions", "unknown").title(), 
-                             color="success" if weather_analysis.get("overall_conditions") == "favorable" else 
-                                   "warning" if weather_analysis.get("overall_conditions") == "moderate" else "danger",
-                             style={"fontSize": "13px", "padding": "8px 15px"})
-                ], className="mb-3"),
-                html.Div([
-                    html.P("Recommendations", className="mb-2", style={"fontSize": "14px", "color": "#cccccc", "fontWeight": "600"}),
-                    html.Ul([
-                        html.Li(rec, style={"fontSize": "12px", "color": "#858585", "marginBottom": "5px"})
-                        for rec in weather_analysis.get("recommendations", [])
-                    ])
-                ]) if weather_analysis.get("recommendations") else html.Div()
-            ])
-        ])
-        tabs_content.append(dbc.Tab(analysis_content, label="Analysis", tab_id="tab-analysis"))
-    
-    # Tab 4: Location Details
-    details_content = html.Div([
-        html.H5("📍 Location Information", className="mb-3", style={"color": "#cccccc", "fontWeight": "600"}),
-        html.Div([
-            html.P([
-                html.Strong("Name: ", style={"color": "#cccccc"}),
-                html.Span(name, style={"color": "#858585"})
-            ], className="mb-2"),
-            html.P([
-                html.Strong("Country: ", style={"color": "#cccccc"}),
-                html.Span(country, style={"color": "#858585"})
-            ], className="mb-2"),
-            html.P([
-                html.Strong("Coordinates: ", style={"color": "#cccccc"}),
-                html.Span(f"{lat}, {lon}" if lat and lon else "N/A", style={"color": "#858585"})
-            ], className="mb-2"),
-            html.P([
-                html.Strong("Location ID: ", style={"color": "#cccccc"}),
-                html.Span(str(location_data.get("location_id") or location_data.get("id", "N/A")), 
-                         style={"color": "#858585", "fontFamily": "monospace", "fontSize": "12px"})
-            ], className="mb-2"),
-            html.P([
-                html.Strong("Status: ", style={"color": "#cccccc"}),
-                html.Span("⭐ In Favorites" if is_favorite else "Not in Favorites", 
-                         style={"color": "#858585"})
-            ], className="mb-0")
-        ], style={"padding": "15px", "backgroundColor": "#1e1e1e", "borderRadius": "4px"})
-    ])
-    tabs_content.append(dbc.Tab(details_content, label="Details", tab_id="tab-details"))
-    
-    # Create tabs component
-    tabs = dbc.Tabs(tabs_content, active_tab="tab-overview", className="mb-3")
-    
-    modal_body = html.Div([
-        html.Div([
-            html.H4(name, className="mb-1", style={"color": "#cccccc", "fontWeight": "700"}),
-            html.P([
-                html.I(className="fas fa-map-marker-alt me-2", style={"color": "#007acc"}),
-                f"{country}"
-            ], className="text-muted mb-3", style={"fontSize": "14px"})
-        ], className="mb-3"),
-        tabs
-    ])
-    
-    return f"🌍 {name} - GeoTEO Report", modal_body
+    payload = {
+        "name": loc.name,
+        "country": str(loc.country or "N/A"),
+        "aqi": str(loc.aqi) if loc.aqi is not None else "N/A",
+        "aqi_category": aqi_category,
+        "aqi_color": aqi_color,
+        "pollutants": [
+            f"• {poll.get('display_name', 'Unknown')}: {poll.get('value', 'N/A')} {poll.get('units', '')}"
+            for poll in loc.sensors[:5]
+        ],
+        "weather": display_fields(weather_data) if weather_data else None,
+        "forecast": [display_fields(day, FORECAST_DAY_FIELDS) for day in forecast_data["forecast"]] if forecast_data and forecast_data.get("forecast") else [],
+        "analysis": weather_analysis or None,
+        "coordinates": f"{loc.lat}, {loc.lon}" if loc.lat and loc.lon else "N/A",
+        "location_id": loc.id or "N/A",
+        "is_favorite": is_favorite
+    }
+    return payload, modal_key
+
+
+app.clientside_callback(
+    ClientsideFunction(namespace="marker", function_name="renderModal"),
+    [Output("marker-modal-header", "children"), Output("marker-modal-body", "children")],
+    Input("marker-modal-payload", "data")
+)
+
+# Only the selected tab's body is built; switching tabs renders the next one from the same payload
+app.clientside_callback(
+    ClientsideFunction(namespace="marker", function_name="renderTab"),
+    Output("marker-tab-body", "children"),
+    Input("marker-tabs", "active_tab"),
+    State("marker-modal-payload", "data")
+)
 
 
 @callback(
@@ -2059,16 +2235,11 @@ def add_favorite_from_marker(n_clicks, location_data):
     """Add location to favorites from marker modal"""
     if n_clicks and location_data:
         try:
-            loc_id = str(location_data.get("location_id") or location_data.get("id", ""))
+            loc = normalize_location(location_data)
             # Check if already in favorites to avoid duplicates
-            if not db.is_favorite(loc_id):
-                db.add_favorite(
-                    location_id=loc_id,
-                    name=location_data.get("name", "Unknown"),
-                    country=location_data.get("country", ""),
-                    latitude=location_data.get("coordinates", {}).get("latitude") if isinstance(location_data.get("coordinates"), dict) else None,
-                    longitude=location_data.get("coordinates", {}).get("longitude") if isinstance(location_data.get("coordinates"), dict) else None
-                )
+            if not db.is_favorite(loc.id):
+                db.add_favorite(location_id=loc.id, name=loc.name, country=loc.country,
+                                latitude=loc.lat, longitude=loc.lon)
             return False  # Close modal
         except Exception as e:
             logger.error(f"Error adding favorite from marker: {e}")
@@ -2100,13 +2271,35 @@ def close_marker_modal(n_clicks):
     return no_update
 
 
+def send_file_mapped(path, type=None):
+    """
+    dcc.send_file equivalent that base64-encodes straight from a memory map
+    
+    The OS pages the file in as the encoder reads it, instead of the whole PDF first being
+    copied into a bytes object.
+    
+    Args:
+        path: Path of the file to send
+        type: MIME type passed to the Download component
+        
+    Returns:
+        Download component data dictionary
+    """
+    path = Path(path)
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        content = base64.b64encode(mm).decode()
+    return dict(content=content, filename=path.name, type=type, base64=True)
+
+
 @callback(
     [Output("marker-action-modal", "is_open", allow_duplicate=True), 
      Output("marker-generate-report-btn", "children", allow_duplicate=True),
      Output("download-report", "data")],
     Input("marker-generate-report-btn", "n_clicks"),
     State("clicked-location", "data"),
-    prevent_initial_call=True
+    prevent_initial_call=True,
+    background=True,
+    running=[(Output("marker-generate-report-btn", "disabled"), True, False)]
 )
 def generate_smart_report(n_clicks, location_data):
     """Generate comprehensive smart report with geospatial and meteorological data and trigger download"""
@@ -2114,23 +2307,21 @@ def generate_smart_report(n_clicks, location_data):
         return no_update, no_update, no_update
     
     try:
-        # Get coordinates
-        coords = location_data.get("coordinates", {})
-        lat = coords.get("latitude") if isinstance(coords, dict) else None
-        lon = coords.get("longitude") if isinstance(coords, dict) else None
+        loc = normalize_location(location_data)
         
         # Fetch weather data if available
         weather_data = None
         forecast_data = None
         weather_analysis = None
         
-        if lat and lon and config.WEATHER_API_KEY:
+        # Without an AQI reading there is nothing to correlate the weather with, so skip both requests;
+        # the report leaves out its weather sections when weather_data is None
+        if loc.lat and loc.lon and loc.aqi and config.WEATHER_API_KEY:
             try:
-                weather_data = weather_client.get_current_weather(lat, lon)
-                forecast_data = weather_client.get_forecast(lat, lon, days=3)
+                # Current conditions and forecast are requested concurrently
+                weather_data, forecast_data = weather_client.get_weather_bundle(loc.lat, loc.lon, days=3)
                 if weather_data:
-                    aqi = location_data.get("max_aqi", 0)
-                    weather_analysis = weather_client.analyze_weather_air_quality_correlation(weather_data, aqi)
+                    weather_analysis = weather_client.analyze_weather_air_quality_correlation(weather_data, loc.aqi)
             except Exception as e:
                 logger.error(f"Error fetching weather for report: {e}")
         
@@ -2150,29 +2341,14 @@ def generate_smart_report(n_clicks, location_data):
         
         logger.info(f"Smart report generated: {report_path}")
         
-        # Read the file and prepare for download
+        # Hand the file to the download component
         report_file = Path(report_path)
         if report_file.exists():
-            # Read file as binary
-            with open(report_file, 'rb') as f:
-                file_content = f.read()
-            
-            # Encode to base64 for download
-            file_base64 = base64.b64encode(file_content).decode()
-            
-            # Get filename for download
-            filename = report_file.name
-            
             # Return: close modal, update button, trigger download
             return False, [  # Close modal
                 html.I(className="fas fa-check me-2"),
                 "Report Downloaded!"
-            ], dict(
-                content=file_base64,
-                filename=filename,
-                base64=True,
-                type="application/pdf"
-            )
+            ], send_file_mapped(report_file, type="application/pdf")
         else:
             logger.error(f"Report file not found: {report_path}")
             return no_update, [
@@ -2188,5 +2364,24 @@ def generate_smart_report(n_clicks, location_data):
         ], no_update
 
 
+# One server-side refresher replaces per-client OpenAQ fetches; it is started by
+# gunicorn.conf.py or __main__ so importing app doesn't start polling OpenAQ
+data_refresher = DataRefresher(refresh_locations, interval=config.DATA_REFRESH_INTERVAL)
+
+
+def start_data_refresher():
+    """Start the background refresher unless another process on this host already runs it"""
+    if config.DATA_REFRESH_ENABLED:
+        data_refresher.start_as_leader(config.CACHE_DIR / "refresher.lock")
+
+
+@atexit.register
+def close_http_clients():
+    """Close the pooled API sessions when the process exits"""
+    api_client.close()
+    weather_client.close()
+
+
 if __name__ == "__main__":
+    start_data_refresher()
     app.run_server(debug=config.FLASK_DEBUG, host=config.HOST, port=config.PORT)
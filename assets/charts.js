@@ -0,0 +1,51 @@
+/* GeoTEO analytics charts (clientside callbacks) */
+
+/* plotly.express "Reds" continuous scale: higher = worse, darker red */
+const REDS = [
+    [0.0, "rgb(255,245,240)"], [0.125, "rgb(254,224,210)"], [0.25, "rgb(252,187,161)"],
+    [0.375, "rgb(252,146,114)"], [0.5, "rgb(251,106,74)"], [0.625, "rgb(239,59,44)"],
+    [0.75, "rgb(203,24,29)"], [0.875, "rgb(165,15,21)"], [1.0, "rgb(103,0,13)"]
+];
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    charts: {
+        /*
+         * Top 10 most polluted locations bar chart.
+         * Mirrors the former server-side px.bar(x="name", y="max_aqi",
+         * color="max_aqi", color_continuous_scale="Reds") figure.
+         */
+        top10Figure: function(stats, template) {
+            const top10 = stats && stats.aqi_summary && stats.aqi_summary.top10;
+            if (!top10) {
+                return dash_clientside.no_update;
+            }
+            return {
+                data: [{
+                    type: "bar",
+                    x: top10.name,
+                    y: top10.max_aqi,
+                    marker: {color: top10.max_aqi, coloraxis: "coloraxis", pattern: {shape: ""}},
+                    hovertemplate: "name=%{x}<br>max_aqi=%{marker.color}<extra></extra>",
+                    alignmentgroup: "True",
+                    offsetgroup: "",
+                    legendgroup: "",
+                    name: "",
+                    orientation: "v",
+                    showlegend: false,
+                    textposition: "auto",
+                    xaxis: "x",
+                    yaxis: "y"
+                }],
+                layout: {
+                    template: template,
+                    title: {text: "Top 10 Most Polluted Locations"},
+                    xaxis: {anchor: "y", domain: [0.0, 1.0], title: {text: "name"}},
+                    yaxis: {anchor: "x", domain: [0.0, 1.0], title: {text: "max_aqi"}},
+                    coloraxis: {colorbar: {title: {text: "max_aqi"}}, colorscale: REDS},
+                    legend: {tracegroupgap: 0},
+                    barmode: "relative"
+                }
+            };
+        }
+    }
+});
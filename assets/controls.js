@@ -0,0 +1,60 @@
+/* GeoTEO map and search controls (clientside callbacks) */
+
+// Building a formatter is the expensive part of locale date formatting, so it is done once
+const DATE_FORMAT = new Intl.DateTimeFormat(undefined, {weekday: "long", month: "long", day: "numeric"});
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    controls: {
+        /*
+         * Record the map type picked by the heatmap/markers/density buttons.
+         * Mirrors the former server-side change_map_type.
+         */
+        setMapType: function(heatmapClicks, markersClicks, densityClicks) {
+            const triggered = dash_clientside.callback_context.triggered;
+            const propId = triggered && triggered.length ? triggered[0].prop_id : "";
+            if (propId.startsWith("btn-heatmap.")) {
+                return "heatmap";
+            }
+            if (propId.startsWith("btn-density.")) {
+                return "density";
+            }
+            return "markers";
+        },
+
+        /* Today's date in the browser's locale, e.g. "Wednesday, October 14"; unchanged ticks skip the re-render */
+        currentDate: function(nIntervals, shown) {
+            const today = DATE_FORMAT.format(new Date());
+            return today === shown ? dash_clientside.no_update : today;
+        },
+
+        /* Toggle the search modal - only responds to button click */
+        toggleSearch: function(nClicks, isOpen) {
+            return nClicks ? !isOpen : isOpen;
+        },
+
+        /*
+         * Build the search input and results container the first time the
+         * modal opens; later opens keep the previous query and results.
+         */
+        renderSearchBody: function(isOpen, children, debounceMs) {
+            if (!isOpen || (children && children.length)) {
+                return dash_clientside.no_update;
+            }
+            return [
+                {
+                    namespace: "dash_bootstrap_components",
+                    type: "Input",
+                    props: {
+                        id: "search-input",
+                        placeholder: "Search city, country...",
+                        type: "text",
+                        className: "mb-3",
+                        // Search as the user types, sending the value only once typing pauses
+                        debounce: debounceMs
+                    }
+                },
+                {namespace: "dash_html_components", type: "Div", props: {id: "search-results"}}
+            ];
+        }
+    }
+});
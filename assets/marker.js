@@ -0,0 +1,263 @@
+/* GeoTEO marker modal rendering (clientside callbacks) */
+
+(function() {
+    const HTML = "dash_html_components";
+    const DBC = "dash_bootstrap_components";
+
+    /* Component in Dash's serialized form, as the server would return it */
+    function h(type, props) {
+        return {namespace: HTML, type: type, props: props};
+    }
+
+    function b(type, props) {
+        return {namespace: DBC, type: type, props: props};
+    }
+
+    /* Mirrors dict.get(key, default): only missing values fall back */
+    function get(values, key, fallback) {
+        const value = values[key];
+        return value === undefined || value === null ? fallback : value;
+    }
+
+    /* Mirrors str.title() for the lowercase analysis labels */
+    function title(text) {
+        return String(text).toLowerCase().replace(/(^|[^a-z])([a-z])/g, (m, before, letter) => before + letter.toUpperCase());
+    }
+
+    const HEADING = {color: "#cccccc", fontWeight: "600"};
+    const TILE = {display: "flex", alignItems: "center", padding: "15px", backgroundColor: "#1e1e1e", borderRadius: "4px"};
+    const SMALL_TILE = {display: "flex", alignItems: "center", padding: "12px", backgroundColor: "#1e1e1e", borderRadius: "4px"};
+    const VALUE = {margin: "0", fontSize: "14px", fontWeight: "600", color: "#cccccc"};
+    const CAPTION = {color: "#858585", fontSize: "11px"};
+    const READING = {fontSize: "13px", color: "#cccccc"};
+    const SECTION_LABEL = {fontSize: "14px", color: "#cccccc", fontWeight: "600"};
+    const IMPACT_LABEL = {fontSize: "12px", color: "#858585"};
+    const IMPACT_TILE = {padding: "15px", backgroundColor: "#1e1e1e", borderRadius: "4px", textAlign: "center"};
+    const IMPACT_VALUE = {color: "#cccccc", fontWeight: "600"};
+    const FORECAST_ICON = {marginRight: "4px"};
+    const FORECAST_CARD = {backgroundColor: "#1e1e1e", border: "1px solid #3e3e42", marginBottom: "10px"};
+    const FORECAST_DATE = {color: "#cccccc", fontWeight: "600"};
+    const FORECAST_CONDITION = {fontSize: "13px", color: "#858585"};
+    const FORECAST_HIGH = {color: "#ff6b6b", fontWeight: "600", marginRight: "15px"};
+    const FORECAST_LOW = {color: "#74b9ff", fontWeight: "600"};
+    const FORECAST_WIND = {color: "#858585", fontSize: "11px", marginRight: "15px"};
+
+    function icon(className, style) {
+        return h("I", {className: className, style: style});
+    }
+
+    function weatherTile(iconNode, value, caption, width, tileStyle) {
+        return b("Col", {
+            children: [h("Div", {children: [iconNode, h("Div", {children: [value, caption]})], style: tileStyle})],
+            width: width, className: "mb-2"
+        });
+    }
+
+    function overview(p) {
+        const airQuality = h("Div", {children: [
+            h("H5", {children: "🌍 Air Quality", className: "mb-3", style: HEADING}),
+            h("Div", {children: [
+                h("Div", {children: [
+                    h("P", {children: "Air Quality Index", className: "mb-1", style: {fontSize: "14px", color: "#858585"}}),
+                    h("H3", {children: p.aqi, style: {fontSize: "48px", fontWeight: "700", color: p.aqi_color, margin: "0"}}),
+                    b("Badge", {children: p.aqi_category, style: {backgroundColor: p.aqi_color, color: "#fff", marginTop: "8px", fontSize: "12px"}})
+                ], style: {textAlign: "center", padding: "20px", backgroundColor: "#1e1e1e", borderRadius: "4px", marginBottom: "20px"}})
+            ]}),
+            h("Div", {children: [
+                h("P", {children: "Monitored Pollutants:", className: "mb-2", style: SECTION_LABEL}),
+                p.pollutants.length
+                    ? h("Div", {children: p.pollutants.map(text => h("Span", {
+                        children: text, style: {display: "block", fontSize: "12px", color: "#858585", marginBottom: "4px"}
+                    }))})
+                    : h("P", {children: "No sensor data available", style: {fontSize: "12px", color: "#666"}})
+            ]})
+        ], className: "mb-4"});
+
+        let weather;
+        if (p.weather) {
+            const w = p.weather;
+            weather = h("Div", {children: [
+                b("Row", {children: [
+                    weatherTile(
+                        icon("fas fa-temperature-high", {fontSize: "24px", color: "#ff6b6b", marginRight: "10px"}),
+                        h("H4", {children: `${get(w, "temperature_c", "--")}°C`, style: {margin: "0", fontSize: "28px", fontWeight: "700", color: "#cccccc"}}),
+                        h("Small", {children: `Feels like ${get(w, "feels_like_c", "--")}°C`, style: {color: "#858585", fontSize: "12px"}}),
+                        6, TILE),
+                    weatherTile(
+                        icon("fas fa-cloud", {fontSize: "20px", color: "#74b9ff", marginRight: "10px"}),
+                        h("P", {children: get(w, "condition", "N/A"), style: VALUE}),
+                        h("Small", {children: `Cloud: ${get(w, "cloud_cover", "--")}%`, style: CAPTION}),
+                        6, TILE)
+                ]}),
+                b("Row", {children: [
+                    weatherTile(
+                        icon("fas fa-wind", {fontSize: "18px", color: "#a29bfe", marginRight: "8px"}),
+                        h("P", {children: `${get(w, "wind_speed_kph", "--")} km/h`, style: VALUE}),
+                        h("Small", {children: get(w, "wind_direction", ""), style: CAPTION}),
+                        4, SMALL_TILE),
+                    weatherTile(
+                        icon("fas fa-tint", {fontSize: "18px", color: "#0984e3", marginRight: "8px"}),
+                        h("P", {children: `${get(w, "humidity", "--")}%`, style: VALUE}),
+                        h("Small", {children: "Humidity", style: CAPTION}),
+                        4, SMALL_TILE),
+                    weatherTile(
+                        icon("fas fa-compress-arrows-alt", {fontSize: "18px", color: "#00b894", marginRight: "8px"}),
+                        h("P", {children: `${get(w, "pressure_mb", "--")} mb`, style: VALUE}),
+                        h("Small", {children: "Pressure", style: CAPTION}),
+                        4, SMALL_TILE)
+                ], className: "mt-2"}),
+                h("Div", {children: [
+                    h("P", {children: [
+                        icon("fas fa-sun", {marginRight: "8px", color: "#fdcb6e"}),
+                        h("Span", {children: `UV Index: ${get(w, "uv_index", "--")}`, style: READING}),
+                        h("Span", {children: " | ", style: {margin: "0 8px", color: "#666"}}),
+                        icon("fas fa-eye", {marginRight: "8px", color: "#6c5ce7"}),
+                        h("Span", {children: `Visibility: ${get(w, "visibility_km", "--")} km`, style: READING})
+                    ], style: {marginTop: "15px", padding: "10px", backgroundColor: "#1e1e1e", borderRadius: "4px"}})
+                ]})
+            ]});
+        } else {
+            weather = h("Div", {children: [
+                h("P", {children: "Weather data unavailable. Please configure WEATHER_API_KEY in your .env file.",
+                        style: {color: "#858585", fontSize: "13px", fontStyle: "italic"}})
+            ]});
+        }
+
+        return h("Div", {children: [
+            airQuality,
+            h("Div", {children: [h("H5", {children: "🌤️ Current Weather", className: "mb-3", style: HEADING}), weather]})
+        ]});
+    }
+
+    function forecast(days) {
+        return h("Div", {children: [
+            h("H5", {children: "📅 3-Day Weather Forecast", className: "mb-3", style: HEADING}),
+            h("Div", {children: days.map(day => b("Card", {children: [
+                b("CardBody", {children: [
+                    h("Div", {children: [
+                        h("H6", {children: get(day, "date", "N/A"), className: "mb-2", style: FORECAST_DATE}),
+                        h("P", {children: get(day, "condition", "N/A"), className: "mb-2", style: FORECAST_CONDITION}),
+                        h("Div", {children: [
+                            h("Span", {children: `↑ ${get(day, "max_temp_c", "--")}°C`, style: FORECAST_HIGH}),
+                            h("Span", {children: `↓ ${get(day, "min_temp_c", "--")}°C`, style: FORECAST_LOW})
+                        ], className: "mb-2"}),
+                        h("Div", {children: [
+                            h("Small", {children: [icon("fas fa-wind", FORECAST_ICON), `${get(day, "max_wind_kph", "--")} km/h`], style: FORECAST_WIND}),
+                            h("Small", {children: [icon("fas fa-tint", FORECAST_ICON), `${get(day, "avg_humidity", "--")}%`], style: CAPTION}),
+                            h("Small", {children: [icon("fas fa-sun", FORECAST_ICON), `UV: ${get(day, "uv_index", "--")}`], style: CAPTION})
+                        ]})
+                    ]})
+                ]})
+            ], style: FORECAST_CARD}))})
+        ]});
+    }
+
+    function analysis(a) {
+        const impact = (label, key) => b("Col", {children: [
+            h("Div", {children: [
+                h("P", {children: label, className: "mb-1", style: IMPACT_LABEL}),
+                h("H6", {children: title(get(a, key, "unknown")), style: IMPACT_VALUE})
+            ], style: IMPACT_TILE})
+        ], width: 4});
+        const overall = a.overall_conditions;
+        const recommendations = a.recommendations || [];
+
+        return h("Div", {children: [
+            h("H5", {children: "🔬 Weather-Air Quality Analysis", className: "mb-3", style: HEADING}),
+            h("Div", {children: [
+                b("Row", {children: [
+                    impact("Wind Impact", "wind_impact"),
+                    impact("Humidity Impact", "humidity_impact"),
+                    impact("Temperature Impact", "temperature_impact")
+                ], className: "mb-3"}),
+                h("Div", {children: [
+                    h("P", {children: "Overall Conditions", className: "mb-2", style: SECTION_LABEL}),
+                    b("Badge", {
+                        children: title(get(a, "overall_conditions", "unknown")),
+                        color: overall === "favorable" ? "success" : overall === "moderate" ? "warning" : "danger",
+                        style: {fontSize: "13px", padding: "8px 15px"}
+                    })
+                ], className: "mb-3"}),
+                recommendations.length
+                    ? h("Div", {children: [
+                        h("P", {children: "Recommendations", className: "mb-2", style: SECTION_LABEL}),
+                        h("Ul", {children: recommendations.map(rec => h("Li", {
+                            children: rec, style: {fontSize: "12px", color: "#858585", marginBottom: "5px"}
+                        }))})
+                    ]})
+                    : h("Div", {})
+            ]})
+        ]});
+    }
+
+    function details(p) {
+        // One text node per row; the bold label is drawn from data-label by .detail-row::before
+        const row = (label, value, className) => h("P", {children: value, "data-label": label, className: `detail-row ${className}`});
+
+        return h("Div", {children: [
+            h("H5", {children: "📍 Location Information", className: "mb-3", style: HEADING}),
+            h("Div", {children: [
+                row("Name: ", p.name, "mb-2"),
+                row("Country: ", p.country, "mb-2"),
+                row("Coordinates: ", p.coordinates, "mb-2"),
+                row("Location ID: ", p.location_id, "detail-row-code mb-2"),
+                row("Status: ", p.is_favorite ? "⭐ In Favorites" : "Not in Favorites", "mb-0")
+            ], style: {padding: "15px", backgroundColor: "#1e1e1e", borderRadius: "4px"}})
+        ]});
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        marker: {
+            /*
+             * Render the marker modal header and tab strip from the compact payload built by
+             * update_marker_modal, so the component tree is never built or serialized server-side.
+             * Tab bodies are left to renderTab, which only builds the one being shown.
+             */
+            renderModal: function(payload) {
+                if (!payload) {
+                    return ["Location Details", h("Div", {children: "No location selected"})];
+                }
+
+                const tabs = [b("Tab", {label: "Overview", tab_id: "tab-overview"})];
+                if (payload.forecast.length) {
+                    tabs.push(b("Tab", {label: "Forecast", tab_id: "tab-forecast"}));
+                }
+                if (payload.analysis) {
+                    tabs.push(b("Tab", {label: "Analysis", tab_id: "tab-analysis"}));
+                }
+                tabs.push(b("Tab", {label: "Details", tab_id: "tab-details"}));
+
+                const body = h("Div", {children: [
+                    h("Div", {children: [
+                        h("H4", {children: payload.name, className: "mb-1", style: {color: "#cccccc", fontWeight: "700"}}),
+                        h("P", {children: [
+                            h("I", {className: "fas fa-map-marker-alt me-2", style: {color: "#007acc"}}),
+                            `${payload.country}`
+                        ], className: "text-muted mb-3", style: {fontSize: "14px"}})
+                    ], className: "mb-3"}),
+                    b("Tabs", {id: "marker-tabs", children: tabs, active_tab: "tab-overview", className: "mb-3"}),
+                    h("Div", {id: "marker-tab-body"})
+                ]});
+
+                return [`🌍 ${payload.name} - GeoTEO Report`, body];
+            },
+
+            /* Render the body of the selected marker modal tab */
+            renderTab: function(activeTab, payload) {
+                if (!payload) {
+                    return window.dash_clientside.no_update;
+                }
+                if (activeTab === "tab-forecast" && payload.forecast.length) {
+                    return forecast(payload.forecast);
+                }
+                if (activeTab === "tab-analysis" && payload.analysis) {
+                    return analysis(payload.analysis);
+                }
+                if (activeTab === "tab-details") {
+                    return details(payload);
+                }
+                return overview(payload);
+            }
+        }
+    });
+})();
@@ -0,0 +1,41 @@
+/* GeoTEO sidebar navigation (clientside callbacks) */
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    navigation: {
+        /*
+         * Show the selected view and record it in current-view.
+         * Mirrors the former server-side update_main_content branching; the
+         * view bodies are still rendered server-side from current-view.
+         */
+        switchView: function(mapClicks, analyticsClicks, favClicks, histClicks, settingsClicks, markerFavClicks, searchFavClicks, currentView) {
+            const triggered = dash_clientside.callback_context.triggered;
+            let propId = triggered && triggered.length ? triggered[0].prop_id : "";
+            if (propId === ".") {
+                propId = "";
+            }
+
+            const mapView = ["Map View", "map"];
+            let view = mapView;
+            if (propId.includes("nav-map") || (!propId && currentView !== "map")) {
+                view = mapView;
+            } else if (propId.includes("nav-analytics")) {
+                view = ["Analytics", "analytics"];
+            } else if (propId.includes("nav-favorites") || propId.includes("marker-add-favorite-btn") ||
+                       (propId.includes("search-favorite") && currentView === "favorites")) {
+                view = ["Favorites", "favorites"];
+            } else if (propId.includes("nav-history")) {
+                view = ["History", "history"];
+            } else if (propId.includes("nav-settings")) {
+                view = ["Settings", "settings"];
+            }
+
+            const onMap = view[1] === "map";
+            return [
+                {display: onMap ? "block" : "none"},
+                {display: onMap ? "none" : "block"},
+                view[0],
+                view[1]
+            ];
+        }
+    }
+});
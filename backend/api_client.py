@@ -3,10 +3,75 @@ OpenAQ API Client
 Handles all interactions with the OpenAQ API
 """
 
+import asyncio
+import email.utils
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+import numpy as np
+import orjson
 import requests
-from typing import Dict, List, Optional, Any
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Iterator, List, Optional, Any, Tuple
 from loguru import logger
 import config
+from backend.cluster_index import bbox_mask
+from backend.http_session import ProcessLocalSession
+
+
+# Responses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+RETRY_BACKOFF = 0.3
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    """
+    Seconds a response asks the client to wait before retrying
+
+    Args:
+        response: HTTP response
+
+    Returns:
+        Delay from the Retry-After header (seconds or HTTP date), or None if absent or invalid
+    """
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(email.utils.parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _lon_range_contains(outer: Tuple[float, float], inner: Tuple[float, float]) -> bool:
+    """
+    Check whether one longitude range lies inside another
+
+    Args:
+        outer: (min_lon, max_lon) range; min_lon > max_lon means it crosses the antimeridian
+        inner: (min_lon, max_lon) range, same convention
+
+    Returns:
+        True if every longitude in inner is also in outer
+    """
+    outer_min, outer_max = outer
+    inner_min, inner_max = inner
+    if outer_min <= outer_max:
+        if inner_min > inner_max:
+            # A wrapped range only fits in a range spanning the whole globe
+            return outer_min <= -180 and outer_max >= 180
+        return outer_min <= inner_min and inner_max <= outer_max
+    if inner_min > inner_max:
+        return outer_min <= inner_min and inner_max <= outer_max
+    # An unwrapped range must sit entirely on one side of the antimeridian
+    return outer_min <= inner_min or inner_max <= outer_max
 
 
 class OpenAQClient:
@@ -50,14 +115,123 @@ class OpenAQClient:
             logger.info(f"OpenAQ API client initialized with API key: {key_preview}")
         else:
             logger.warning("OpenAQ API client initialized without API key - some endpoints may require authentication")
+        
+        # Synchronous requests reuse pooled keep-alive connections to the API host (one pool per process)
+        self._session = ProcessLocalSession(self._build_session)
+        
+        # Raw bodies of responses that carried an ETag/Last-Modified, so repeat requests can be revalidated;
+        # each read decodes its own copy, so a caller mutating a result can't corrupt the cache
+        self._validated: Dict[Tuple, Tuple[Dict[str, str], bytes, float]] = {}
+        self._validated_lock = threading.Lock()
+        
+        # Last complete bounding-box result as coordinate arrays, so boxes inside it are filtered locally
+        self._bbox_sites: Optional[Tuple[Tuple[float, float, float, float], np.ndarray, np.ndarray, List[Dict], float]] = None
+    
+    @staticmethod
+    def _build_session() -> requests.Session:
+        """Build the pooled session used for synchronous requests"""
+        session = requests.Session()
+        # Rate-limited and 5xx responses are retried with backoff (honouring Retry-After); once retries run out
+        # the last response is returned so it reports through the usual HTTPError path
+        retries = Retry(total=config.OPENAQ_MAX_RETRIES, backoff_factor=RETRY_BACKOFF,
+                        status_forcelist=RETRY_STATUSES, raise_on_status=False)
+        session.mount("https://", HTTPAdapter(pool_maxsize=config.OPENAQ_MAX_CONCURRENCY, max_retries=retries))
+        return session
+    
+    @property
+    def session(self) -> requests.Session:
+        """Pooled session owned by the current process"""
+        return self._session.get()
+    
+    @session.setter
+    def session(self, session: requests.Session):
+        self._session.set(session)
+    
+    def close(self):
+        """Release the pooled connections held by the session"""
+        self._session.close()
+    
+    @staticmethod
+    def _validation_key(endpoint: str, params: Optional[Dict]) -> Tuple:
+        return endpoint, tuple(sorted((params or {}).items()))
+    
+    def _conditional(self, endpoint: str, params: Optional[Dict],
+                     revalidate: bool = False) -> Tuple[Optional[Dict[str, str]], Optional[bytes]]:
+        """
+        Request headers plus the body to reuse if the API answers 304 Not Modified
+        
+        Args:
+            endpoint: API endpoint
+            params: Query parameters
+            revalidate: Ask the API even within OPENAQ_FRESH_TTL (for an explicit refresh)
+            
+        Returns:
+            Tuple of (headers, cached raw body); headers are conditional only when a body is cached, and
+            None when the cached body is younger than OPENAQ_FRESH_TTL (and revalidate is False)
+            so no request is needed
+        """
+        with self._validated_lock:
+            cached = self._validated.get(self._validation_key(endpoint, params))
+        if cached is None:
+            return self.headers, None
+        validators, content, stored_at = cached
+        if not revalidate and time.monotonic() - stored_at < config.OPENAQ_FRESH_TTL:
+            return None, content
+        return {**self.headers, **validators}, content
+    
+    def _remember(self, endpoint: str, params: Optional[Dict], response_headers, content: bytes):
+        """Keep a raw response body together with its validators for later conditional requests"""
+        validators = {}
+        if response_headers.get("ETag"):
+            validators["If-None-Match"] = response_headers["ETag"]
+        if response_headers.get("Last-Modified"):
+            validators["If-Modified-Since"] = response_headers["Last-Modified"]
+        if not validators:
+            return
+        key = self._validation_key(endpoint, params)
+        with self._validated_lock:
+            self._validated.pop(key, None)
+            self._validated[key] = (validators, content, time.monotonic())
+            # Drop the oldest entries first so per-station endpoints can't grow this without bound
+            while len(self._validated) > config.OPENAQ_REVALIDATE_SIZE:
+                self._validated.pop(next(iter(self._validated)))
     
-    def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Dict[str, Any]:
+    def _http_error_result(self, error: Exception, response) -> Dict[str, Any]:
+        """
+        Log an HTTP error status and build the empty result returned in its place
+        
+        Args:
+            error: HTTP error raised by requests or httpx
+            response: Response that carried the error status (requests or httpx), if any
+            
+        Returns:
+            Empty result dictionary with the error and status code
+        """
+        status_code = response.status_code if response is not None else None
+        if status_code == 401:
+            logger.error("OpenAQ API authentication failed (401). Please check your API key in Settings or .env file.")
+            logger.error("Get your API key from: https://platform.openaq.org/")
+            # Try to get response body for more details
+            try:
+                if response.text:
+                    error_detail = response.json() if response.headers.get('content-type', '').startswith('application/json') else response.text[:200]
+                    logger.error(f"API error details: {error_detail}")
+            except Exception:
+                pass
+        elif status_code == 403:
+            logger.error("OpenAQ API access forbidden (403). Your API key may not have permission for this endpoint.")
+        else:
+            logger.error(f"API request failed with status {status_code}: {error}")
+        return {"results": [], "meta": {}, "error": str(error), "status_code": status_code}
+    
+    def _make_request(self, endpoint: str, params: Optional[Dict] = None, revalidate: bool = False) -> Dict[str, Any]:
         """
         Make a request to the OpenAQ API
         
         Args:
             endpoint: API endpoint (e.g., '/locations')
             params: Query parameters
+            revalidate: Ask the API even within OPENAQ_FRESH_TTL (for an explicit refresh)
             
         Returns:
             JSON response as dictionary
@@ -65,44 +239,165 @@ class OpenAQClient:
         url = f"{self.base_url}{endpoint}"
         
         try:
-            logger.debug(f"Making request to {url} with params: {params}")
+            # Debug messages are formatted only when debug logging is enabled
+            logger.debug("Making request to {} with params: {}", url, params)
             # Log headers (without exposing full API key)
-            debug_headers = {k: (v[:4] + "..." + v[-4:] if len(v) > 8 else "***") if "key" in k.lower() else v 
-                           for k, v in self.headers.items()}
-            logger.debug(f"Request headers: {debug_headers}")
-            response = requests.get(url, headers=self.headers, params=params, timeout=30)
+            logger.opt(lazy=True).debug("Request headers: {}", lambda: {
+                k: (v[:4] + "..." + v[-4:] if len(v) > 8 else "***") if "key" in k.lower() else v
+                for k, v in self.headers.items()})
+            headers, cached = self._conditional(endpoint, params, revalidate)
+            if headers is None:
+                logger.debug("{} fetched recently, reusing cached response", endpoint)
+                return orjson.loads(cached)
+            response = self.session.get(url, headers=headers, params=params, timeout=30)
+            if response.status_code == 304 and cached is not None:
+                logger.debug("{} not modified, reusing cached response", endpoint)
+                # Restart the freshness window (and pick up any new validators)
+                self._remember(endpoint, params, response.headers, cached)
+                return orjson.loads(cached)
             response.raise_for_status()
             
-            data = response.json()
-            logger.debug(f"Received {len(data.get('results', []))} results")
+            data = orjson.loads(response.content)
+            logger.opt(lazy=True).debug("Received {} results", lambda: len(data.get("results", [])))
+            self._remember(endpoint, params, response.headers, response.content)
             return data
             
         except requests.exceptions.HTTPError as e:
-            status_code = e.response.status_code if hasattr(e, 'response') else None
-            if status_code == 401:
-                logger.error(f"OpenAQ API authentication failed (401). Please check your API key in Settings or .env file.")
-                logger.error(f"Get your API key from: https://platform.openaq.org/")
-                # Try to get response body for more details
-                try:
-                    if hasattr(e, 'response') and e.response.text:
-                        error_detail = e.response.json() if e.response.headers.get('content-type', '').startswith('application/json') else e.response.text[:200]
-                        logger.error(f"API error details: {error_detail}")
-                except:
-                    pass
-            elif status_code == 403:
-                logger.error(f"OpenAQ API access forbidden (403). Your API key may not have permission for this endpoint.")
-            else:
-                logger.error(f"API request failed with status {status_code}: {e}")
-            return {"results": [], "meta": {}, "error": str(e), "status_code": status_code}
-        except requests.exceptions.RequestException as e:
+            return self._http_error_result(e, getattr(e, "response", None))
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
             logger.error(f"API request failed: {e}")
             return {"results": [], "meta": {}, "error": str(e)}
     
+    async def _make_request_async(self,
+                                  client: httpx.AsyncClient,
+                                  endpoint: str,
+                                  params: Optional[Dict] = None,
+                                  revalidate: bool = False) -> Dict[str, Any]:
+        """
+        Make an asynchronous request to the OpenAQ API
+        
+        Args:
+            client: Shared async HTTP client
+            endpoint: API endpoint (e.g., '/locations')
+            params: Query parameters
+            revalidate: Ask the API even within OPENAQ_FRESH_TTL (for an explicit refresh)
+            
+        Returns:
+            JSON response as dictionary (same error shape as _make_request)
+        """
+        url = f"{self.base_url}{endpoint}"
+        
+        try:
+            logger.debug("Making async request to {} with params: {}", url, params)
+            headers, cached = self._conditional(endpoint, params, revalidate)
+            if headers is None:
+                logger.debug("{} fetched recently, reusing cached response", endpoint)
+                return orjson.loads(cached)
+            response = await self._get_with_retries(client, url, headers, params)
+            if response.status_code == 304 and cached is not None:
+                logger.debug("{} not modified, reusing cached response", endpoint)
+                # Restart the freshness window (and pick up any new validators)
+                self._remember(endpoint, params, response.headers, cached)
+                return orjson.loads(cached)
+            response.raise_for_status()
+            
+            data = orjson.loads(response.content)
+            logger.opt(lazy=True).debug("Received {} results", lambda: len(data.get("results", [])))
+            self._remember(endpoint, params, response.headers, response.content)
+            return data
+            
+        except httpx.HTTPStatusError as e:
+            return self._http_error_result(e, e.response)
+        except (httpx.HTTPError, asyncio.TimeoutError, orjson.JSONDecodeError) as e:
+            logger.error(f"API request failed: {e!r}")
+            return {"results": [], "meta": {}, "error": str(e)}
+    
+    async def _get_with_retries(self,
+                                client: httpx.AsyncClient,
+                                url: str,
+                                headers: Dict[str, str],
+                                params: Optional[Dict]) -> httpx.Response:
+        """
+        GET with the same retry policy the sync session's Retry applies
+        
+        Rate-limited and 5xx responses and transport errors are retried up to OPENAQ_MAX_RETRIES
+        times with exponential backoff, waiting for Retry-After when the API sends it. Once retries
+        run out the last response is returned (or the last error raised).
+        
+        Args:
+            client: Shared async HTTP client
+            url: Request URL
+            headers: Request headers
+            params: Query parameters
+            
+        Returns:
+            HTTP response
+        """
+        for attempt in range(config.OPENAQ_MAX_RETRIES + 1):
+            last_attempt = attempt == config.OPENAQ_MAX_RETRIES
+            try:
+                response = await asyncio.wait_for(client.get(url, headers=headers, params=params), timeout=30)
+            except (httpx.TransportError, asyncio.TimeoutError) as e:
+                if last_attempt:
+                    raise
+                delay = RETRY_BACKOFF * 2 ** attempt
+                logger.debug("Request to {} failed ({!r}), retrying in {:.1f}s", url, e, delay)
+            else:
+                if response.status_code not in RETRY_STATUSES or last_attempt:
+                    return response
+                retry_after = _retry_after(response)
+                delay = retry_after if retry_after is not None else RETRY_BACKOFF * 2 ** attempt
+                logger.debug("{} answered {}, retrying in {:.1f}s", url, response.status_code, delay)
+            await asyncio.sleep(delay)
+    
+    async def _fetch_all_async(self, requests_list: List[Tuple[str, Optional[Dict]]],
+                               revalidate: bool = False) -> List[Dict[str, Any]]:
+        """
+        Fetch several endpoints concurrently
+        
+        Args:
+            requests_list: List of (endpoint, params) tuples
+            revalidate: Ask the API even within OPENAQ_FRESH_TTL (for an explicit refresh)
+            
+        Returns:
+            List of JSON responses in the same order as requests_list
+        """
+        semaphore = asyncio.Semaphore(config.OPENAQ_MAX_CONCURRENCY)
+        limits = httpx.Limits(max_connections=config.OPENAQ_MAX_CONCURRENCY)
+        
+        # HTTP/2 multiplexes the fanned-out pages over a single connection instead of opening one per request
+        async with httpx.AsyncClient(limits=limits, timeout=30, http2=True) as client:
+            async def fetch(endpoint: str, params: Optional[Dict]) -> Dict[str, Any]:
+                async with semaphore:
+                    return await self._make_request_async(client, endpoint, params, revalidate)
+            
+            # _make_request_async never raises for HTTP errors, so one failure doesn't cancel the group
+            async with asyncio.TaskGroup() as tg:
+                tasks = [tg.create_task(fetch(endpoint, params)) for endpoint, params in requests_list]
+        
+        return [task.result() for task in tasks]
+    
+    def fetch_all(self, requests_list: List[Tuple[str, Optional[Dict]]], revalidate: bool = False) -> List[Dict[str, Any]]:
+        """
+        Fetch several endpoints concurrently (synchronous wrapper for callbacks)
+        
+        Args:
+            requests_list: List of (endpoint, params) tuples
+            revalidate: Ask the API even within OPENAQ_FRESH_TTL (for an explicit refresh)
+            
+        Returns:
+            List of JSON responses in the same order as requests_list
+        """
+        if not requests_list:
+            return []
+        return asyncio.run(self._fetch_all_async(requests_list, revalidate))
+    
     def get_locations(self, 
                      limit: int = 100, 
                      country: Optional[str] = None,
                      coordinates: Optional[tuple] = None,
-                     radius: Optional[int] = None) -> List[Dict]:
+                     radius: Optional[int] = None,
+                     revalidate: bool = False) -> List[Dict]:
         """
         Get air quality monitoring locations
         
@@ -111,6 +406,7 @@ class OpenAQClient:
             country: Country code (e.g., 'US', 'FR')
             coordinates: (latitude, longitude) tuple for geospatial search
             radius: Search radius in meters (requires coordinates)
+            revalidate: Ask the API even within OPENAQ_FRESH_TTL (for an explicit refresh)
             
         Returns:
             List of location dictionaries
@@ -125,8 +421,22 @@ class OpenAQClient:
             if radius:
                 params["radius"] = radius
         
-        data = self._make_request("/locations", params)
-        return data.get("results", [])
+        page_limit = config.OPENAQ_PAGE_LIMIT
+        if limit <= page_limit:
+            data = self._make_request("/locations", params, revalidate)
+            return data.get("results", [])
+        
+        # Fetch pages concurrently instead of one large request
+        pages = math.ceil(limit / page_limit)
+        responses = self.fetch_all([
+            ("/locations", {**params, "limit": page_limit, "page": page})
+            for page in range(1, pages + 1)
+        ], revalidate)
+        
+        locations = []
+        for data in responses:
+            locations.extend(data.get("results", []))
+        return locations[:limit]
     
     def get_location_by_id(self, location_id: int) -> Optional[Dict]:
         """
@@ -152,8 +462,7 @@ class OpenAQClient:
         Returns:
             Dictionary with latest measurements
         """
-        data = self._make_request(f"/locations/{location_id}/latest")
-        return data
+        return self._make_request(f"/locations/{location_id}/latest")
     
     def get_measurements(self, 
                         sensor_id: int,
@@ -182,6 +491,50 @@ class OpenAQClient:
         data = self._make_request(f"/sensors/{sensor_id}/measurements", params)
         return data.get("results", [])
     
+    def iter_measurements(self,
+                          sensor_id: int,
+                          date_from: Optional[str] = None,
+                          date_to: Optional[str] = None,
+                          page_size: int = 1000,
+                          max_pages: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Iterate over all historical measurements for a sensor, page by page
+        
+        The next page is requested while the caller consumes the current one, so network
+        time overlaps with whatever the caller does with each measurement.
+        
+        Args:
+            sensor_id: Sensor ID
+            date_from: Start date (ISO format)
+            date_to: End date (ISO format)
+            page_size: Measurements per request
+            max_pages: Stop after this many pages (all pages if None)
+            
+        Yields:
+            Measurement dictionaries
+        """
+        endpoint = f"/sensors/{sensor_id}/measurements"
+        params = {"limit": page_size}
+        if date_from:
+            params["date_from"] = date_from
+        if date_to:
+            params["date_to"] = date_to
+        
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            page = 1
+            pending = executor.submit(self._make_request, endpoint, {**params, "page": page})
+            while pending is not None:
+                results = pending.result().get("results", [])
+                # A short page is the last one, so only prefetch after a full page
+                more = len(results) == page_size and (max_pages is None or page < max_pages)
+                page += 1
+                pending = executor.submit(self._make_request, endpoint, {**params, "page": page}) if more else None
+                yield from results
+        finally:
+            # A caller that stops early shouldn't wait for the prefetched page it will never read
+            executor.shutdown(wait=False, cancel_futures=True)
+    
     def get_countries(self) -> List[Dict]:
         """
         Get list of countries with air quality data
@@ -218,7 +571,7 @@ class OpenAQClient:
         
         Args:
             min_lat: Minimum latitude
-            min_lon: Minimum longitude
+            min_lon: Minimum longitude (greater than max_lon if the box crosses the antimeridian)
             max_lat: Maximum latitude
             max_lon: Maximum longitude
             limit: Maximum number of locations
@@ -226,12 +579,28 @@ class OpenAQClient:
         Returns:
             List of locations within bounding box
         """
+        sites = self._bbox_sites
+        if sites is not None:
+            (cached_min_lat, cached_min_lon, cached_max_lat, cached_max_lon), lat, lon, meta, stored_at = sites
+            covered = (cached_min_lat <= min_lat and max_lat <= cached_max_lat
+                       and _lon_range_contains((cached_min_lon, cached_max_lon), (min_lon, max_lon)))
+            if covered and time.monotonic() - stored_at < config.OPENAQ_FRESH_TTL:
+                mask = bbox_mask(lat, lon, (min_lon, min_lat, max_lon, max_lat))
+                return [meta[i] for i in np.flatnonzero(mask)[:limit]]
+        
         params = {
             "bbox": f"{min_lon},{min_lat},{max_lon},{max_lat}",
             "limit": limit
         }
         data = self._make_request("/locations", params)
-        return data.get("results", [])
+        results = data.get("results", [])
+        if "error" not in data and len(results) < limit:
+            # Nothing inside this box was cut off by the limit, so it can answer any box it contains
+            coordinates = [loc.get("coordinates") or {} for loc in results]
+            lat = np.array([c.get("latitude", np.nan) for c in coordinates], dtype="float64")
+            lon = np.array([c.get("longitude", np.nan) for c in coordinates], dtype="float64")
+            self._bbox_sites = ((min_lat, min_lon, max_lat, max_lon), lat, lon, results, time.monotonic())
+        return results
     
     def get_parameters(self) -> List[Dict]:
         """
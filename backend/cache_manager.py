@@ -3,29 +3,106 @@ Cache Manager
 Handles caching of API responses and processed data
 """
 
-import json
-import hashlib
-from typing import Any, Optional
+import pickle
+import threading
+from typing import Any, List, Optional
 from pathlib import Path
 from diskcache import Cache
+import orjson
+import redis
+import xxhash
 from loguru import logger
 import config
 
 
+def make_key(namespace: str, params: Any) -> str:
+    """
+    Build a cache key from a namespace and JSON-like parameters
+    
+    Args:
+        namespace: Key prefix
+        params: Parameters identifying the cached value (non-JSON values are stringified)
+        
+    Returns:
+        Cache key string
+    """
+    # Cache keys don't need a cryptographic hash; xxh3 keeps hashing off the profile even for large payloads
+    payload = orjson.dumps(params, option=orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS, default=str)
+    return f"{namespace}:{xxhash.xxh3_64_intdigest(payload):016x}"
+
+
+class RedisCache:
+    """Redis-backed store exposing the subset of the diskcache API used by CacheManager"""
+    
+    def __init__(self, url: str, prefix: str = "airwatch:"):
+        """
+        Initialize Redis cache
+        
+        Args:
+            url: Redis connection URL
+            prefix: Namespace prepended to every key
+        """
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.client.ping()
+    
+    def get(self, key: str) -> Optional[Any]:
+        raw = self.client.get(self.prefix + key)
+        return pickle.loads(raw) if raw is not None else None
+    
+    def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        raws = self.client.mget([self.prefix + key for key in keys])
+        return [pickle.loads(raw) if raw is not None else None for raw in raws]
+    
+    def set(self, key: str, value: Any, expire: Optional[int] = None) -> bool:
+        return bool(self.client.set(self.prefix + key, pickle.dumps(value), ex=expire or None))
+    
+    def delete(self, key: str) -> bool:
+        return bool(self.client.delete(self.prefix + key))
+    
+    def clear(self) -> int:
+        keys = list(self.client.scan_iter(match=f"{self.prefix}*"))
+        return self.client.delete(*keys) if keys else 0
+    
+    def volume(self) -> int:
+        return int(self.client.info("memory").get("used_memory", 0))
+    
+    def __len__(self) -> int:
+        return sum(1 for _ in self.client.scan_iter(match=f"{self.prefix}*"))
+
+
 class CacheManager:
     """Manages caching of API responses and processed data"""
     
-    def __init__(self, cache_dir: Optional[Path] = None, timeout: int = 300):
+    def __init__(self, cache_dir: Optional[Path] = None, timeout: int = 300, cache_type: Optional[str] = None):
         """
         Initialize cache manager
         
         Args:
             cache_dir: Directory for cache storage
             timeout: Default cache timeout in seconds
+            cache_type: "disk" or "redis" (uses config.CACHE_TYPE if not provided)
         """
         self.cache_dir = cache_dir or config.CACHE_DIR
         self.timeout = timeout
-        self.cache = Cache(str(self.cache_dir))
+        self.cache_type = cache_type or config.CACHE_TYPE
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+        
+        if self.cache_type == "redis":
+            # Shared across gunicorn workers and hosts, so each worker doesn't refetch OpenAQ
+            try:
+                self.cache = RedisCache(config.CACHE_REDIS_URL)
+                logger.info(f"Cache manager initialized with Redis at {config.CACHE_REDIS_URL}")
+                return
+            except redis.RedisError as e:
+                logger.error(f"Could not connect to Redis, falling back to disk cache: {e}")
+                self.cache_type = "disk"
+        
+        # Bound disk usage and evict least-recently-read entries first once the limit is hit
+        self.cache = Cache(str(self.cache_dir), size_limit=config.CACHE_SIZE_LIMIT,
+                           eviction_policy="least-recently-used")
         logger.info(f"Cache manager initialized at {self.cache_dir}")
     
     def _generate_key(self, prefix: str, *args, **kwargs) -> str:
@@ -40,10 +117,7 @@ class CacheManager:
         Returns:
             Cache key string
         """
-        # Create a unique key from all arguments
-        key_data = f"{prefix}:{args}:{sorted(kwargs.items())}"
-        key_hash = hashlib.md5(key_data.encode()).hexdigest()
-        return f"{prefix}:{key_hash}"
+        return make_key(prefix, [args, kwargs])
     
     def get(self, key: str) -> Optional[Any]:
         """
@@ -57,15 +131,50 @@ class CacheManager:
         """
         try:
             value = self.cache.get(key)
+            with self._stats_lock:
+                if value is not None:
+                    self.hits += 1
+                else:
+                    self.misses += 1
             if value is not None:
-                logger.debug(f"Cache hit for key: {key}")
+                logger.debug("Cache hit for key: {}", key)
             else:
-                logger.debug(f"Cache miss for key: {key}")
+                logger.debug("Cache miss for key: {}", key)
             return value
         except Exception as e:
             logger.error(f"Cache get error: {e}")
             return None
     
+    def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        """
+        Get several values from cache in one round trip
+        
+        Args:
+            keys: Cache keys
+            
+        Returns:
+            List of cached values in the order of keys (None where not found/expired)
+        """
+        if not keys:
+            return []
+        try:
+            if isinstance(self.cache, RedisCache):
+                # A single MGET instead of one network round trip per key
+                values = self.cache.get_many(keys)
+            else:
+                # A single SQLite transaction instead of one per key
+                with self.cache.transact():
+                    values = [self.cache.get(key) for key in keys]
+            hits = sum(1 for value in values if value is not None)
+            with self._stats_lock:
+                self.hits += hits
+                self.misses += len(values) - hits
+            logger.debug("Cache get_many: {}/{} hits", hits, len(values))
+            return values
+        except Exception as e:
+            logger.error(f"Cache get_many error: {e}")
+            return [None] * len(keys)
+    
     def set(self, key: str, value: Any, timeout: Optional[int] = None) -> bool:
         """
         Set value in cache
@@ -81,7 +190,7 @@ class CacheManager:
         try:
             expire_time = timeout if timeout is not None else self.timeout
             self.cache.set(key, value, expire=expire_time)
-            logger.debug(f"Cached value for key: {key} (timeout: {expire_time}s)")
+            logger.debug("Cached value for key: {} (timeout: {}s)", key, expire_time)
             return True
         except Exception as e:
             logger.error(f"Cache set error: {e}")
@@ -99,7 +208,7 @@ class CacheManager:
         """
         try:
             result = self.cache.delete(key)
-            logger.debug(f"Deleted cache key: {key}")
+            logger.debug("Deleted cache key: {}", key)
             return result
         except Exception as e:
             logger.error(f"Cache delete error: {e}")
@@ -177,9 +286,12 @@ class CacheManager:
         """
         try:
             return {
+                "type": self.cache_type,
                 "size": len(self.cache),
                 "volume": self.cache.volume(),
-                "directory": str(self.cache_dir)
+                "hits": self.hits,
+                "misses": self.misses,
+                "directory": str(self.cache_dir) if self.cache_type == "disk" else config.CACHE_REDIS_URL
             }
         except Exception as e:
             logger.error(f"Error getting cache stats: {e}")
@@ -0,0 +1,203 @@
+"""
+Cluster Index
+Server-side clustering of monitoring stations for the map view
+"""
+
+import numpy as np
+import xxhash
+from typing import Dict, Optional, Sequence, Tuple
+from loguru import logger
+
+
+# Web Mercator cannot represent the poles
+MAX_MERCATOR_LAT = 85.05112878
+
+
+def to_mercator(lat: np.ndarray, lon: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Project coordinates to normalized Web Mercator
+
+    Args:
+        lat: Latitudes
+        lon: Longitudes
+
+    Returns:
+        Tuple of (x, y) arrays in [0, 1), with y increasing southwards
+    """
+    x = (np.asarray(lon, dtype="float64") + 180.0) / 360.0
+    sin_lat = np.sin(np.radians(np.clip(lat, -MAX_MERCATOR_LAT, MAX_MERCATOR_LAT)))
+    y = 0.5 - np.log((1 + sin_lat) / (1 - sin_lat)) / (4 * np.pi)
+    return x, y
+
+
+def station_digest(lat: np.ndarray, lon: np.ndarray, aqi: np.ndarray, location_ids: Sequence[str]) -> str:
+    """
+    Hash a set of stations for use in cache keys
+
+    Args:
+        lat: Station latitudes
+        lon: Station longitudes
+        aqi: Station AQI values
+        location_ids: Station location IDs
+
+    Returns:
+        Hex digest string
+    """
+    digest = xxhash.xxh3_128()
+    for values in (lat, lon, aqi):
+        digest.update(np.ascontiguousarray(values, dtype="float64").tobytes())
+    digest.update("\x1f".join(str(loc_id) for loc_id in location_ids).encode())
+    return digest.hexdigest()
+
+
+def bbox_mask(lat: np.ndarray, lon: np.ndarray, bbox: Tuple[float, float, float, float]) -> np.ndarray:
+    """
+    Select coordinates inside a viewport
+
+    Args:
+        lat: Latitudes
+        lon: Longitudes
+        bbox: (min_lon, min_lat, max_lon, max_lat) viewport
+
+    Returns:
+        Boolean mask of points inside the viewport
+    """
+    min_lon, min_lat, max_lon, max_lat = bbox
+    mask = (lat >= min_lat) & (lat <= max_lat)
+    if min_lon <= max_lon:
+        mask &= (lon >= min_lon) & (lon <= max_lon)
+    else:
+        # Viewport crosses the antimeridian
+        mask &= (lon >= min_lon) | (lon <= max_lon)
+    return mask
+
+
+class ClusterIndex:
+    """Zoom-aware grid index that aggregates nearby stations into clusters"""
+
+    def __init__(self,
+                 lat: np.ndarray,
+                 lon: np.ndarray,
+                 aqi: np.ndarray,
+                 radius: int = 40,
+                 tile_size: int = 256):
+        """
+        Build cluster index from station coordinates
+
+        Args:
+            lat: Station latitudes
+            lon: Station longitudes
+            aqi: Station AQI values
+            radius: Cluster radius in pixels
+            tile_size: Map tile size in pixels
+        """
+        self.lat = np.asarray(lat, dtype="float64")
+        self.lon = np.asarray(lon, dtype="float64")
+        self.aqi = np.asarray(aqi, dtype="float64")
+        self.radius = radius
+        self.tile_size = tile_size
+
+        # Project once to normalized Web Mercator [0, 1) so every zoom level is a rescale
+        self.x, self.y = to_mercator(self.lat, self.lon)
+
+        logger.debug(f"Cluster index built for {len(self)} stations")
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    @staticmethod
+    def cache_key(lat: np.ndarray, lon: np.ndarray, aqi: np.ndarray, location_ids: Sequence[str]) -> str:
+        """
+        Generate a cache key identifying a set of stations
+
+        Args:
+            lat: Station latitudes
+            lon: Station longitudes
+            aqi: Station AQI values
+            location_ids: Station location IDs
+
+        Returns:
+            Cache key string
+        """
+        return f"cluster_index:{station_digest(lat, lon, aqi, location_ids)}"
+
+    def get_clusters(self,
+                     bbox: Optional[Tuple[float, float, float, float]] = None,
+                     zoom: float = 1.5,
+                     max_clusters: int = 200) -> Dict[str, np.ndarray]:
+        """
+        Aggregate stations visible in a viewport into clusters
+
+        Args:
+            bbox: (min_lon, min_lat, max_lon, max_lat) viewport, or None for the whole world
+            zoom: Current map zoom level
+            max_clusters: Maximum number of clusters to return
+
+        Returns:
+            Dictionary of arrays: lat, lon, max_aqi, count and member (index of a
+            representative station, only meaningful when count == 1)
+        """
+        if bbox is not None:
+            idx = np.flatnonzero(bbox_mask(self.lat, self.lon, bbox))
+        else:
+            idx = np.arange(len(self))
+
+        if len(idx) == 0:
+            empty = np.empty(0, dtype="float64")
+            return {"lat": empty, "lon": empty, "max_aqi": empty,
+                    "count": np.empty(0, dtype="int64"), "member": np.empty(0, dtype="int64")}
+
+        # Widen the grid until the viewport fits within max_clusters cells
+        radius = self.radius
+        while True:
+            cell = radius / (self.tile_size * 2 ** max(zoom, 0))
+            cx = np.floor(self.x[idx] / cell).astype("int64")
+            cy = np.floor(self.y[idx] / cell).astype("int64")
+            keys = (cx << 32) | cy
+            _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+            if len(counts) <= max_clusters or cell >= 1:
+                break
+            radius *= 2
+
+        n_clusters = len(counts)
+        lat = np.bincount(inverse, weights=self.lat[idx], minlength=n_clusters) / counts
+        lon = np.bincount(inverse, weights=self.lon[idx], minlength=n_clusters) / counts
+        max_aqi = np.full(n_clusters, -np.inf)
+        np.maximum.at(max_aqi, inverse, self.aqi[idx])
+        member = np.empty(n_clusters, dtype="int64")
+        member[inverse] = idx
+
+        return {"lat": lat, "lon": lon, "max_aqi": max_aqi, "count": counts, "member": member}
+
+
+def viewport_from_relayout(relayout_data: Optional[Dict]) -> Tuple[Optional[Tuple[float, float, float, float]], Optional[float]]:
+    """
+    Extract map bounds and zoom from a mapbox relayoutData event
+
+    Args:
+        relayout_data: dcc.Graph relayoutData property
+
+    Returns:
+        Tuple of (bbox, zoom); either may be None if not present in the event
+    """
+    if not relayout_data:
+        return None, None
+
+    zoom = relayout_data.get("mapbox.zoom")
+    bbox = None
+
+    derived = relayout_data.get("mapbox._derived") or {}
+    corners = derived.get("coordinates")
+    if corners:
+        lons = [corner[0] for corner in corners]
+        lats = [corner[1] for corner in corners]
+        min_lon, max_lon = min(lons), max(lons)
+        # Normalize longitudes that wrapped past +/-180 while panning
+        if max_lon - min_lon >= 360:
+            min_lon, max_lon = -180.0, 180.0
+        else:
+            min_lon = ((min_lon + 180) % 360) - 180
+            max_lon = ((max_lon + 180) % 360) - 180
+        bbox = (min_lon, min(lats), max_lon, max(lats))
+
+    return bbox, zoom
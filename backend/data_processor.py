@@ -3,14 +3,54 @@ Data Processor
 Processes air quality data, calculates AQI, and generates insights
 """
 
+import math
 import pandas as pd
 import numpy as np
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 from loguru import logger
 import config
 
 
+def _aqi_key(aqi: float):
+    """Round an AQI value so 42.0, 42.3 and 42.7 share a cache entry (non-finite values pass through)"""
+    return int(round(aqi)) if math.isfinite(aqi) else aqi
+
+
+# Module-level so the caches don't key on (and keep alive) a DataProcessor instance
+@lru_cache(maxsize=512)
+def _aqi_category(aqi: int) -> str:
+    if aqi <= 50:
+        return "Good"
+    elif aqi <= 100:
+        return "Moderate"
+    elif aqi <= 150:
+        return "Unhealthy for Sensitive Groups"
+    elif aqi <= 200:
+        return "Unhealthy"
+    elif aqi <= 300:
+        return "Very Unhealthy"
+    else:
+        return "Hazardous"
+
+
+@lru_cache(maxsize=512)
+def _aqi_color(aqi: int) -> str:
+    if aqi <= 50:
+        return "#00e400"  # Green
+    elif aqi <= 100:
+        return "#ffff00"  # Yellow
+    elif aqi <= 150:
+        return "#ff7e00"  # Orange
+    elif aqi <= 200:
+        return "#ff0000"  # Red
+    elif aqi <= 300:
+        return "#8f3f97"  # Purple
+    else:
+        return "#7e0023"  # Maroon
+
+
 class DataProcessor:
     """Processes and analyzes air quality data"""
     
@@ -60,7 +100,63 @@ class DataProcessor:
         
         # If value exceeds all thresholds
         return (500, "Hazardous", "#7e0023")
-    
+
+    def calculate_aqi_batch(self, pollutant: str, values) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Calculate Air Quality Index for an array of concentrations
+
+        Vectorized equivalent of calculate_aqi: one masked pass per threshold band
+        instead of one Python call per value.
+
+        Args:
+            pollutant: Pollutant name (pm25, pm10, no2, o3, etc.)
+            values: Pollutant concentration values
+
+        Returns:
+            Tuple of (AQI values, categories, colors) arrays
+        """
+        pollutant = pollutant.lower()
+        values = np.asarray(values, dtype="float64")
+
+        if pollutant not in self.aqi_thresholds:
+            logger.warning(f"Unknown pollutant: {pollutant}")
+            return (np.zeros(values.shape, dtype="int64"),
+                    np.full(values.shape, "Unknown", dtype=object),
+                    np.full(values.shape, "#cccccc", dtype=object))
+
+        # Values outside every band (including gaps between bands) fall through to Hazardous, as in calculate_aqi
+        aqi = np.full(values.shape, 500.0)
+        categories = np.full(values.shape, "Hazardous", dtype=object)
+        colors = np.full(values.shape, "#7e0023", dtype=object)
+        unassigned = np.ones(values.shape, dtype=bool)
+
+        band_base = {
+            "Moderate": (50, 50),
+            "Unhealthy for Sensitive Groups": (100, 50),
+            "Unhealthy": (150, 50),
+            "Very Unhealthy": (200, 100),
+        }
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for min_val, max_val, category, color in self.aqi_thresholds[pollutant]:
+                mask = unassigned & (values >= min_val) & (values <= max_val)
+                if not mask.any():
+                    continue
+                band = values[mask]
+                if category == "Good":
+                    aqi[mask] = (band / max_val) * 50
+                elif category in band_base:
+                    base, span = band_base[category]
+                    aqi[mask] = base + ((band - min_val) / (max_val - min_val)) * span
+                else:  # Hazardous
+                    aqi[mask] = 300 + np.minimum((band - min_val) / 100, 200)
+                categories[mask] = category
+                colors[mask] = color
+                unassigned &= ~mask
+
+        # int() truncates toward zero
+        return np.trunc(aqi).astype("int64"), categories, colors
+
     def get_health_recommendation(self, category: str) -> Dict[str, str]:
         """
         Get health recommendation for AQI category
@@ -77,51 +173,52 @@ class DataProcessor:
             "icon": "❓"
         })
     
-    def get_aqi_category(self, aqi: int) -> str:
+    def get_aqi_category(self, aqi: float) -> str:
         """
         Get AQI category based on AQI value
         
+        Memoized: the marker modal and summaries ask for the same few hundred AQI values over and over.
+        
         Args:
-            aqi: Air Quality Index value (0-500)
+            aqi: Air Quality Index value (0-500), rounded to the nearest integer
             
         Returns:
             Category name string
         """
-        if aqi <= 50:
-            return "Good"
-        elif aqi <= 100:
-            return "Moderate"
-        elif aqi <= 150:
-            return "Unhealthy for Sensitive Groups"
-        elif aqi <= 200:
-            return "Unhealthy"
-        elif aqi <= 300:
-            return "Very Unhealthy"
-        else:
-            return "Hazardous"
+        return _aqi_category(_aqi_key(aqi))
     
-    def get_aqi_color(self, aqi: int) -> str:
+    def get_aqi_color(self, aqi: float) -> str:
         """
         Get color code for AQI value
         
         Args:
-            aqi: Air Quality Index value (0-500)
+            aqi: Air Quality Index value (0-500), rounded to the nearest integer
             
         Returns:
             Hex color code string
         """
-        if aqi <= 50:
-            return "#00e400"  # Green
-        elif aqi <= 100:
-            return "#ffff00"  # Yellow
-        elif aqi <= 150:
-            return "#ff7e00"  # Orange
-        elif aqi <= 200:
-            return "#ff0000"  # Red
-        elif aqi <= 300:
-            return "#8f3f97"  # Purple
-        else:
-            return "#7e0023"  # Maroon
+        return _aqi_color(_aqi_key(aqi))
+    
+    # Upper AQI bound of each level, matching get_aqi_category/get_aqi_color
+    AQI_LEVEL_BOUNDS = np.array([50, 100, 150, 200, 300])
+    AQI_LEVEL_CATEGORIES = np.array(["Good", "Moderate", "Unhealthy for Sensitive Groups", "Unhealthy", "Very Unhealthy", "Hazardous"], dtype=object)
+    AQI_LEVEL_COLORS = np.array(["#00e400", "#ffff00", "#ff7e00", "#ff0000", "#8f3f97", "#7e0023"], dtype=object)
+    
+    def get_aqi_levels(self, aqi) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get AQI categories and colors for an array of AQI values
+        
+        Vectorized equivalent of get_aqi_category and get_aqi_color: one bucketing
+        pass and two array lookups instead of one Python call per value.
+        
+        Args:
+            aqi: Air Quality Index values
+            
+        Returns:
+            Tuple of (categories, colors) arrays
+        """
+        level = np.searchsorted(self.AQI_LEVEL_BOUNDS, np.asarray(aqi, dtype="float64"), side="left")
+        return self.AQI_LEVEL_CATEGORIES[level], self.AQI_LEVEL_COLORS[level]
     
     def process_location_data(self, location: Dict) -> Dict:
         """
@@ -134,14 +231,22 @@ class DataProcessor:
             Processed location data with AQI
         """
         location_id = str(location.get("id", ""))
+        coordinates = location.get("coordinates") or {}
+        country = location["country"] if isinstance(location.get("country"), dict) else {}
+        point = coordinates if isinstance(coordinates, dict) else {}
+        lat = point.get("latitude")
+        lon = point.get("longitude")
         processed = {
             "id": location.get("id"),
             "location_id": location_id,  # Add location_id for consistency
             "name": location.get("name", "Unknown"),
             "locality": location.get("locality", ""),
-            "country": location.get("country", {}).get("name", "Unknown"),
-            "country_code": location.get("country", {}).get("code", ""),
-            "coordinates": location.get("coordinates", {}),
+            "country": country.get("name", "Unknown"),
+            "country_code": country.get("code", ""),
+            "coordinates": coordinates,
+            # Flat float columns so callbacks can build NumPy arrays without per-row dict access
+            "lat": float(lat) if lat is not None else None,
+            "lon": float(lon) if lon is not None else None,
             "sensors": [],
             "max_aqi": 0,
             "max_aqi_category": "Good",
@@ -149,19 +254,85 @@ class DataProcessor:
             "pollutants": {}
         }
         
-        # Process sensors
-        for sensor in location.get("sensors", []):
+        processed["sensors"] = self._process_sensors(location.get("sensors", []))
+        
+        return processed
+    
+    def _process_sensors(self, sensors: List[Dict]) -> List[Dict]:
+        """
+        Normalize sensor entries of a location
+        
+        Args:
+            sensors: Sensor list from the API location payload
+            
+        Returns:
+            List of processed sensor dictionaries
+        """
+        processed_sensors = []
+        for sensor in sensors or []:
             param = sensor.get("parameter", {})
             param_name = param.get("name", "").lower()
             
-            processed["sensors"].append({
+            processed_sensors.append({
                 "id": sensor.get("id"),
                 "parameter": param_name,
                 "display_name": config.POLLUTANT_NAMES.get(param_name, param_name.upper()),
                 "units": param.get("units", "")
             })
+        return processed_sensors
+    
+    def process_batch(self, locations: List[Dict]) -> pd.DataFrame:
+        """
+        Process a list of locations into a DataFrame in one columnar pass
         
-        return processed
+        Produces the same fields as process_location_data, one row per location.
+        
+        Args:
+            locations: List of location dictionaries from API
+            
+        Returns:
+            DataFrame with processed location data
+        """
+        locations = [loc for loc in locations if loc]
+        if not locations:
+            return pd.DataFrame(columns=[
+                "id", "location_id", "name", "locality", "country", "country_code", "coordinates",
+                "lat", "lon", "sensors", "max_aqi", "max_aqi_category", "max_aqi_color", "pollutants"
+            ])
+        
+        # Read the handful of nested fields directly; json_normalize would deep-copy every nested record (sensors included)
+        countries = [loc["country"] if isinstance(loc.get("country"), dict) else {} for loc in locations]
+        coordinates = [loc.get("coordinates") or {} for loc in locations]
+        points = [point if isinstance(point, dict) else {} for point in coordinates]
+        
+        def column(records: List[Dict], key: str, default=None) -> pd.Series:
+            values = pd.Series([record.get(key) for record in records], dtype=object)
+            return values if default is None else values.fillna(default)
+        
+        # Taken from the records directly so a missing ID doesn't upcast the others to float
+        ids = pd.Series([loc.get("id") for loc in locations], dtype=object)
+        df = pd.DataFrame({
+            "id": ids,
+            "location_id": ids.where(ids.notna(), "").astype(str),
+            "name": column(locations, "name", "Unknown"),
+            "locality": column(locations, "locality", ""),
+            "country": column(countries, "name", "Unknown"),
+            "country_code": column(countries, "code", ""),
+            "coordinates": coordinates,
+            # float32 keeps ~1 m precision and int16 covers the 0-500 AQI scale, shrinking the Store payload
+            "lat": pd.to_numeric(column(points, "latitude"), errors="coerce").astype("float32"),
+            "lon": pd.to_numeric(column(points, "longitude"), errors="coerce").astype("float32"),
+            # Sensors stay nested per location, so they are normalized row by row
+            "sensors": [self._process_sensors(loc.get("sensors")) for loc in locations],
+            "max_aqi": np.zeros(len(locations), dtype="int16"),
+            "pollutants": [{} for _ in locations],
+        })
+        # Category and color follow max_aqi through one vectorized lookup
+        categories, colors = self.get_aqi_levels(df["max_aqi"].to_numpy())
+        df.insert(df.columns.get_loc("pollutants"), "max_aqi_category", categories)
+        df.insert(df.columns.get_loc("pollutants"), "max_aqi_color", colors)
+        
+        return df
     
     def process_measurements(self, measurements: List[Dict], parameter: str) -> pd.DataFrame:
         """
@@ -185,9 +356,10 @@ class DataProcessor:
         
         # Calculate AQI for each measurement
         if "value" in df.columns:
-            df[["aqi", "category", "color"]] = df["value"].apply(
-                lambda x: pd.Series(self.calculate_aqi(parameter, x))
-            )
+            aqi, categories, colors = self.calculate_aqi_batch(parameter, df["value"].to_numpy(dtype="float64", na_value=np.nan))
+            df["aqi"] = aqi
+            df["category"] = categories
+            df["color"] = colors
         
         return df
     
@@ -5,6 +5,7 @@ SQLite database for storing settings, favorites, history, and user data
 
 import sqlite3
 import json
+import threading
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 from datetime import datetime
@@ -22,6 +23,10 @@ class Database:
         
         self.db_path = db_path
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Favorite IDs with the database version they were read at (see _favorite_ids)
+        self._favorites_cache: Optional[tuple] = None
+        self._favorites_lock = threading.Lock()
+        self._version_conn: Optional[sqlite3.Connection] = None
         self._init_database()
         logger.info(f"Database initialized at {self.db_path}")
     
@@ -215,6 +220,7 @@ class Database:
             """, (location_id, name, country, latitude, longitude))
             conn.commit()
             conn.close()
+            self._favorites_cache = None
             logger.info(f"Added favorite: {name}")
             return True
         except Exception as e:
@@ -229,6 +235,7 @@ class Database:
             cursor.execute("DELETE FROM favorites WHERE location_id = ?", (location_id,))
             conn.commit()
             conn.close()
+            self._favorites_cache = None
             logger.info(f"Removed favorite: {location_id}")
             return True
         except Exception as e:
@@ -258,14 +265,45 @@ class Database:
             for row in rows
         ]
     
-    def is_favorite(self, location_id: str) -> bool:
-        """Check if location is favorite"""
+    def count_favorites(self) -> int:
+        """Count favorites without loading them"""
         conn = self._get_connection()
         cursor = conn.cursor()
-        cursor.execute("SELECT 1 FROM favorites WHERE location_id = ?", (location_id,))
-        row = cursor.fetchone()
+        cursor.execute("SELECT COUNT(*) FROM favorites")
+        count = cursor.fetchone()[0]
         conn.close()
-        return row is not None
+        return count
+    
+    def _favorite_ids(self) -> set:
+        """
+        Get the set of favorite location IDs, reloading only after the database changes
+        
+        PRAGMA data_version on a long-lived connection changes whenever any other connection
+        (from this or another worker process) commits, so it is an exact version check that
+        doesn't depend on file timestamps.
+        
+        Returns:
+            Set of favorite location IDs
+        """
+        with self._favorites_lock:
+            if self._version_conn is None:
+                # Only ever used under _favorites_lock
+                self._version_conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            version = self._version_conn.execute("PRAGMA data_version").fetchone()[0]
+            cached = self._favorites_cache
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            cursor.execute("SELECT location_id FROM favorites")
+            ids = {row[0] for row in cursor.fetchall()}
+            conn.close()
+            self._favorites_cache = (version, ids)
+            return ids
+    
+    def is_favorite(self, location_id: str) -> bool:
+        """Check if location is favorite"""
+        return location_id in self._favorite_ids()
     
     # History methods
     def add_to_history(self, location_id: str, name: str, country: str = None,
@@ -307,6 +345,38 @@ class Database:
             for row in rows
         ]
     
+    def count_history(self) -> int:
+        """Count history entries without loading them"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM history")
+        count = cursor.fetchone()[0]
+        conn.close()
+        return count
+    
+    def get_settings_snapshot(self) -> Dict[str, Any]:
+        """
+        Get everything the settings view displays in one connection
+        
+        Returns:
+            Dictionary with settings, active API key values by service, and favorites/history counts
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT key, value FROM settings")
+        settings = {row[0]: row[1] for row in cursor.fetchall()}
+        cursor.execute("SELECT service, key_value FROM api_keys WHERE is_active = 1")
+        api_keys = {row[0]: row[1] for row in cursor.fetchall()}
+        cursor.execute("SELECT (SELECT COUNT(*) FROM favorites), (SELECT COUNT(*) FROM history)")
+        favorites_count, history_count = cursor.fetchone()
+        conn.close()
+        return {
+            "settings": settings,
+            "api_keys": api_keys,
+            "favorites_count": favorites_count,
+            "history_count": history_count
+        }
+    
     def clear_history(self):
         """Clear all history"""
         conn = self._get_connection()
@@ -0,0 +1,60 @@
+"""
+HTTP Session
+Pooled requests sessions that are never shared across forked processes
+"""
+
+import os
+import threading
+from typing import Callable, Optional
+import requests
+
+
+class ProcessLocalSession:
+    """
+    Lazily builds a requests.Session per process
+
+    Background callbacks run in processes forked from the app, which would otherwise inherit
+    the parent's pooled keep-alive sockets and interleave requests on the same connections.
+    """
+
+    def __init__(self, factory: Callable[[], requests.Session]):
+        """
+        Initialize process-local session
+
+        Args:
+            factory: Builds a configured session (adapters, retries)
+        """
+        self.factory = factory
+        self._lock = threading.Lock()
+        self._session: Optional[requests.Session] = None
+        self._pid: Optional[int] = None
+
+    def get(self) -> requests.Session:
+        """
+        Get the session owned by the current process, building it on first use
+
+        Returns:
+            requests.Session
+        """
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._lock:
+                if self._pid != pid:
+                    # The inherited session is dropped, not closed; its sockets belong to the parent
+                    self._session = self.factory()
+                    self._pid = pid
+        return self._session
+
+    def set(self, session: requests.Session):
+        """Use a specific session in the current process"""
+        with self._lock:
+            self._session = session
+            self._pid = os.getpid()
+
+    def close(self):
+        """Release the pooled connections if this process owns them"""
+        with self._lock:
+            if self._session is not None and self._pid == os.getpid():
+                self._session.close()
+            self._session = None
+            self._pid = None
@@ -0,0 +1,116 @@
+"""
+Raster
+Server-side rasterization of station AQI for the density view
+"""
+
+import base64
+import io
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+from PIL import Image
+from scipy.ndimage import uniform_filter
+
+from backend.cluster_index import MAX_MERCATOR_LAT, bbox_mask, to_mercator
+
+
+def _colorize(values: np.ndarray, colorscale: Sequence[Sequence], vmin: float, vmax: float) -> np.ndarray:
+    """
+    Map values to RGB using a Plotly-style colorscale
+
+    Args:
+        values: Values to colorize
+        colorscale: List of [position, "rgb(r,g,b)"] stops
+        vmin: Value mapped to the first stop
+        vmax: Value mapped to the last stop
+
+    Returns:
+        Array of shape values.shape + (3,) with uint8 RGB
+    """
+    positions = np.array([float(stop[0]) for stop in colorscale])
+    rgb = np.array([[int(c) for c in stop[1][4:-1].split(",")] for stop in colorscale], dtype="float64")
+    scaled = np.clip((values - vmin) / (vmax - vmin), 0, 1)
+    channels = [np.interp(scaled, positions, rgb[:, i]) for i in range(3)]
+    return np.stack(channels, axis=-1).astype("uint8")
+
+
+def render_density_image(lat: np.ndarray,
+                         lon: np.ndarray,
+                         aqi: np.ndarray,
+                         colorscale: Sequence[Sequence],
+                         bbox: Optional[Tuple[float, float, float, float]] = None,
+                         width: int = 1024,
+                         height: int = 512,
+                         vmin: float = 0,
+                         vmax: float = 300,
+                         spread: int = 2) -> Optional[Dict]:
+    """
+    Rasterize mean AQI per pixel into a PNG mapbox image layer
+
+    Args:
+        lat: Station latitudes
+        lon: Station longitudes
+        aqi: Station AQI values (stations with a non-finite AQI or position are skipped)
+        colorscale: List of [position, "rgb(r,g,b)"] stops
+        bbox: (min_lon, min_lat, max_lon, max_lat) extent, or None for the data extent
+        width: Image width in pixels
+        height: Image height in pixels
+        vmin: AQI mapped to the start of the colorscale
+        vmax: AQI mapped to the end of the colorscale
+        spread: Radius in pixels each station is spread over
+
+    Returns:
+        Mapbox layer dictionary, or None if no stations fall inside the extent
+    """
+    lat = np.asarray(lat, dtype="float64")
+    lon = np.asarray(lon, dtype="float64")
+    aqi = np.asarray(aqi, dtype="float64")
+
+    # Stations without a position or an AQI can't be binned or colorized
+    valid = np.isfinite(lat) & np.isfinite(lon) & np.isfinite(aqi)
+    if not valid.all():
+        lat, lon, aqi = lat[valid], lon[valid], aqi[valid]
+
+    if bbox is not None and bbox[0] > bbox[2]:
+        # An image layer cannot wrap the antimeridian, so fall back to the data extent
+        bbox = None
+    if bbox is not None:
+        mask = bbox_mask(lat, lon, bbox)
+        lat, lon, aqi = lat[mask], lon[mask], aqi[mask]
+    if len(lat) == 0:
+        return None
+
+    if bbox is None:
+        bbox = (lon.min(), lat.min(), lon.max(), lat.max())
+    min_lon, min_lat, max_lon, max_lat = bbox
+    min_lat, max_lat = max(min_lat, -MAX_MERCATOR_LAT), min(max_lat, MAX_MERCATOR_LAT)
+
+    # Bin in Web Mercator so the image lines up with the basemap when mapbox stretches it
+    x, y = to_mercator(lat, lon)
+    (x0, x1), (y1, y0) = to_mercator(np.array([min_lat, max_lat]), np.array([min_lon, max_lon]))
+    col = ((x - x0) / max(x1 - x0, 1e-12) * width).astype("int64").clip(0, width - 1)
+    row = ((y - y0) / max(y1 - y0, 1e-12) * height).astype("int64").clip(0, height - 1)
+    pixel = row * width + col
+    counts = np.bincount(pixel, minlength=width * height).astype("float64").reshape(height, width)
+    sums = np.bincount(pixel, weights=aqi, minlength=width * height).reshape(height, width)
+
+    if spread > 0:
+        # Smoothing sums and counts alike keeps the per-pixel mean while making stations visible
+        size = 2 * spread + 1
+        counts = uniform_filter(counts, size=size, mode="constant")
+        sums = uniform_filter(sums, size=size, mode="constant")
+
+    filled = counts > 1e-9
+    mean = np.divide(sums, counts, out=np.zeros_like(sums), where=filled)
+    pixels = np.zeros((height, width, 4), dtype="uint8")
+    pixels[..., :3] = _colorize(mean, colorscale, vmin, vmax)
+    pixels[..., 3] = np.where(filled, 220, 0)
+
+    buffer = io.BytesIO()
+    Image.fromarray(pixels, mode="RGBA").save(buffer, format="PNG", compress_level=1)
+    source = "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+    coordinates: List[List[float]] = [
+        [float(min_lon), float(max_lat)], [float(max_lon), float(max_lat)],
+        [float(max_lon), float(min_lat)], [float(min_lon), float(min_lat)],
+    ]
+    return {"sourcetype": "image", "source": source, "coordinates": coordinates, "below": "traces"}
@@ -0,0 +1,80 @@
+"""
+Data Refresher
+Periodically refreshes shared data in the background, independent of connected clients
+"""
+
+import fcntl
+import threading
+from pathlib import Path
+from typing import Any, Callable, Optional
+from loguru import logger
+
+
+class DataRefresher:
+    """Runs a refresh function on a fixed interval in a daemon thread"""
+
+    def __init__(self, refresh: Callable[[], Any], interval: int, name: str = "data-refresher"):
+        """
+        Initialize data refresher
+
+        Args:
+            refresh: Function fetching and caching fresh data
+            interval: Seconds between refreshes
+            name: Thread name
+        """
+        self.refresh = refresh
+        self.interval = interval
+        self.name = name
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock_file = None
+
+    def start(self):
+        """Start refreshing in the background (the first refresh runs immediately)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        logger.info(f"Data refresher started (every {self.interval}s)")
+
+    def start_as_leader(self, lock_path: Path) -> bool:
+        """
+        Start refreshing only if no other process holds the refresher lock
+
+        The lock is released when the holding process exits, so a respawned
+        worker takes over the refresh.
+
+        Args:
+            lock_path: Lock file shared by the processes on this host
+
+        Returns:
+            True if this process became the refresher
+        """
+        lock_file = open(lock_path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            logger.debug("Data refresher already running in another process")
+            return False
+        self._lock_file = lock_file
+        self.start()
+        return True
+
+    def stop(self):
+        """Stop the background thread"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        if self._lock_file:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Background refresh failed: {e}")
+            self._stop.wait(self.interval)
@@ -370,7 +370,11 @@ class ReportGenerator:
                 loc.get("max_aqi_category", "Unknown")
             ])
         
-        comparison_table = Table(comparison_data, colWidths=[2*inch, 1.5*inch, 1*inch, 2*inch])
+        # Single-line rows are 25pt (12pt leading + 3pt top and 10pt bottom padding). Giving their heights up
+        # front stops reportlab re-measuring every remaining cell each time the table splits across a page;
+        # rows with line breaks (None) are still measured. Cells can be None when OpenAQ sends null fields
+        row_heights = [None if any(isinstance(cell, str) and "\n" in cell for cell in row) else 25 for row in comparison_data]
+        comparison_table = Table(comparison_data, colWidths=[2*inch, 1.5*inch, 1*inch, 2*inch], rowHeights=row_heights)
         comparison_table.setStyle(TableStyle([
             ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1f77b4')),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
@@ -0,0 +1,200 @@
+"""
+Store Codec
+Compact encoding of processed location data for the browser-side dcc.Store
+"""
+
+import base64
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+import orjson
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+def encode_records(df: pd.DataFrame) -> str:
+    """
+    Encode processed locations as a zstd-compressed Arrow IPC stream
+
+    Args:
+        df: DataFrame with processed location data
+
+    Returns:
+        Base64 string suitable for a dcc.Store
+    """
+    if "coordinates" in df.columns:
+        # An Arrow column has one shape, so a malformed (e.g. list) value would fail the whole
+        # encode; it carries no usable position anyway, so it is stored as missing
+        df = df.assign(coordinates=[c if isinstance(c, dict) else None for c in df["coordinates"]])
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    options = pa.ipc.IpcWriteOptions(compression="zstd")
+    with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    return base64.b64encode(sink.getvalue().to_pybytes()).decode()
+
+
+@lru_cache(maxsize=4)
+def _decode_table(payload: str) -> pa.Table:
+    """Decode a base64 Arrow IPC stream into a table"""
+    # Every callback on a locations-data change receives the same payload, so they share one
+    # decode; Arrow tables are immutable, so handing out the cached table is safe
+    return pa.ipc.open_stream(base64.b64decode(payload)).read_all()
+
+
+@lru_cache(maxsize=4)
+def _decode_records(payload: str) -> List[Dict]:
+    return _decode_table(payload).to_pylist()
+
+
+@lru_cache(maxsize=8)
+def _decode_frame(payload: str, columns: Optional[Tuple[str, ...]]) -> pd.DataFrame:
+    table = _decode_table(payload)
+    if columns is None:
+        return table.to_pandas()
+    available = [col for col in columns if col in table.column_names]
+    return table.select(available).to_pandas().reindex(columns=list(columns))
+
+
+def decode_records(payload: Any, columns: Optional[List[str]] = None) -> List[Dict]:
+    """
+    Decode a Store payload into a list of location dictionaries
+
+    Full records are memoized per payload, so the dictionaries are shared between
+    callers and must be treated as read-only.
+
+    Args:
+        payload: Value from encode_records, or a plain list of records
+        columns: Fields to include (all if None); only these columns are converted
+
+    Returns:
+        List of location dictionaries (empty if there is no data)
+    """
+    if not payload:
+        return []
+    if isinstance(payload, list):
+        return payload
+    if columns is not None:
+        table = _decode_table(payload)
+        return table.select([col for col in columns if col in table.column_names]).to_pylist()
+    return list(_decode_records(payload))
+
+
+def decode_frame(payload: Any, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Decode a Store payload into a DataFrame, reading only the requested columns
+
+    Frames are memoized per payload and column set; each call gets its own copy.
+
+    Args:
+        payload: Value from encode_records, or a plain list of records
+        columns: Columns to load (all if None); missing columns are filled with None
+
+    Returns:
+        DataFrame with location data
+    """
+    if not payload:
+        return pd.DataFrame(columns=columns)
+    if isinstance(payload, list):
+        return pd.DataFrame(payload, columns=columns)
+    return _decode_frame(payload, tuple(columns) if columns is not None else None).copy()
+
+
+@lru_cache(maxsize=2)
+def _export_table(payload: str) -> pa.Table:
+    table = _decode_table(payload)
+    for i, field in enumerate(table.schema):
+        if pa.types.is_nested(field.type):
+            # CSV/Excel cells are flat, so nested values (coordinates, sensors) become JSON text
+            values = [orjson.dumps(v).decode() if v is not None else None for v in table.column(i).to_pylist()]
+            table = table.set_column(i, field.name, pa.array(values, type=pa.string()))
+    return table
+
+
+def export_table(payload: Any) -> pa.Table:
+    """
+    Decode a Store payload into a flat Arrow table for file exports
+
+    Args:
+        payload: Value from encode_records, or a plain list of records
+
+    Returns:
+        Arrow table with nested columns serialized as JSON strings
+    """
+    if not payload:
+        return pa.table({})
+    if isinstance(payload, list):
+        payload = encode_records(pd.DataFrame(payload))
+    return _export_table(payload)
+
+
+def _record_id(loc: Dict) -> str:
+    return str(loc.get("location_id") or loc.get("id", ""))
+
+
+@lru_cache(maxsize=4)
+def _record_index(payload: str) -> Dict[str, int]:
+    table = _decode_table(payload)
+    location_ids = table.column("location_id").to_pylist() if "location_id" in table.column_names else [None] * table.num_rows
+    ids = table.column("id").to_pylist() if "id" in table.column_names else [None] * table.num_rows
+    index = {}
+    for row, (loc_id, raw_id) in enumerate(zip(location_ids, ids)):
+        # First occurrence wins, matching a linear scan
+        index.setdefault(str(loc_id or (raw_id if raw_id is not None else "")), row)
+    return index
+
+
+def lookup_record(payload: Any, location_id: Any) -> Optional[Dict]:
+    """
+    Find a single location in a Store payload by location ID
+
+    Uses an ID index built once per payload, and converts only the matching row.
+
+    Args:
+        payload: Value from encode_records, or a plain list of records
+        location_id: Location ID to look up
+
+    Returns:
+        Location dictionary, or None if not found
+    """
+    if not payload:
+        return None
+    location_id = str(location_id)
+    if isinstance(payload, list):
+        return next((loc for loc in payload if isinstance(loc, dict) and _record_id(loc) == location_id), None)
+    row = _record_index(payload).get(location_id)
+    if row is None:
+        return None
+    return _decode_table(payload).slice(row, 1).to_pylist()[0]
+
+
+@lru_cache(maxsize=4)
+def _search_index(payload: str) -> pa.Array:
+    table = _decode_table(payload)
+    fields = [pc.fill_null(pc.cast(table.column(col), pa.string()), "") if col in table.column_names
+              else pa.nulls(table.num_rows, pa.string()).fill_null("")
+              for col in ("name", "country", "country_code")]
+    # A separator no single-line query can contain keeps matches from spanning two fields
+    return pc.utf8_lower(pc.binary_join_element_wise(*fields, "\n")).combine_chunks()
+
+
+def search_records(payload: Any, query: str, limit: int = 20) -> List[Dict]:
+    """
+    Find locations whose name, country or country code contains a query
+
+    Matching runs as one Arrow compute scan over a lowercase index built once per payload.
+
+    Args:
+        payload: Value from encode_records, or a plain list of records
+        query: Lowercase search text
+        limit: Maximum number of results
+
+    Returns:
+        Up to limit matching location dictionaries, in payload order
+    """
+    if not payload or not query:
+        return []
+    if isinstance(payload, list):
+        payload = encode_records(pd.DataFrame([loc for loc in payload if isinstance(loc, dict)]))
+    rows = pc.indices_nonzero(pc.match_substring(_search_index(payload), query))[:limit]
+    return _decode_table(payload).take(rows).to_pylist()
@@ -0,0 +1,112 @@
+"""
+Tiler
+Pre-aggregated tile pyramid of station AQI for the heatmap view
+"""
+
+import numpy as np
+from typing import Dict, Optional, Sequence, Tuple
+from loguru import logger
+
+from backend.cluster_index import bbox_mask, station_digest, to_mercator
+
+
+# Cells per tile side at each zoom level (2**5 = 32 cells of 8px on a 256px tile)
+CELL_BITS = 5
+
+
+class TilePyramid:
+    """Per-zoom quadtree aggregation of station AQI, built once per dataset"""
+
+    def __init__(self,
+                 lat: np.ndarray,
+                 lon: np.ndarray,
+                 aqi: np.ndarray,
+                 max_zoom: int = 14):
+        """
+        Aggregate stations into quadtree cells for every zoom level
+
+        Args:
+            lat: Station latitudes
+            lon: Station longitudes
+            aqi: Station AQI values
+            max_zoom: Deepest zoom level to pre-aggregate
+        """
+        lat = np.asarray(lat, dtype="float64")
+        lon = np.asarray(lon, dtype="float64")
+        aqi = np.asarray(aqi, dtype="float64")
+        x, y = to_mercator(lat, lon)
+
+        self.max_zoom = max_zoom
+        self.levels = []
+        for zoom in range(max_zoom + 1):
+            self.levels.append(self._aggregate(x, y, lat, lon, aqi, zoom))
+
+        logger.debug(f"Tile pyramid built for {len(lat)} stations, zoom 0-{max_zoom}")
+
+    @staticmethod
+    def cache_key(lat: np.ndarray, lon: np.ndarray, aqi: np.ndarray, location_ids: Sequence[str]) -> str:
+        """
+        Generate a cache key identifying a set of stations
+
+        Args:
+            lat: Station latitudes
+            lon: Station longitudes
+            aqi: Station AQI values
+            location_ids: Station location IDs
+
+        Returns:
+            Cache key string
+        """
+        return f"tile_pyramid:{station_digest(lat, lon, aqi, location_ids)}"
+
+    @staticmethod
+    def _aggregate(x: np.ndarray, y: np.ndarray, lat: np.ndarray, lon: np.ndarray,
+                   aqi: np.ndarray, zoom: int) -> Dict[str, np.ndarray]:
+        """
+        Aggregate stations into the cells of one zoom level
+
+        Args:
+            x: Normalized Web Mercator x
+            y: Normalized Web Mercator y
+            lat: Station latitudes
+            lon: Station longitudes
+            aqi: Station AQI values
+            zoom: Zoom level
+
+        Returns:
+            Dictionary of per-cell arrays: cell, lat, lon, mean_aqi and count
+        """
+        cells_per_side = 1 << (zoom + CELL_BITS)
+        cx = np.minimum((x * cells_per_side).astype("int64"), cells_per_side - 1)
+        cy = np.minimum((y * cells_per_side).astype("int64"), cells_per_side - 1)
+        # Quadbin-style cell id: zoom in the high bits, then x and y
+        keys = (np.int64(zoom) << 58) | (cx << 29) | cy
+        cell, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+
+        n_cells = len(cell)
+        return {
+            "cell": cell,
+            "lat": np.bincount(inverse, weights=lat, minlength=n_cells) / counts,
+            "lon": np.bincount(inverse, weights=lon, minlength=n_cells) / counts,
+            "mean_aqi": np.bincount(inverse, weights=aqi, minlength=n_cells) / counts,
+            "count": counts,
+        }
+
+    def get_tiles(self,
+                  bbox: Optional[Tuple[float, float, float, float]] = None,
+                  zoom: float = 1.5) -> Dict[str, np.ndarray]:
+        """
+        Get the pre-aggregated cells visible in a viewport
+
+        Args:
+            bbox: (min_lon, min_lat, max_lon, max_lat) viewport, or None for the whole world
+            zoom: Current map zoom level
+
+        Returns:
+            Dictionary of per-cell arrays: cell, lat, lon, mean_aqi and count
+        """
+        level = self.levels[int(np.clip(np.floor(zoom), 0, self.max_zoom))]
+        if bbox is None:
+            return level
+        mask = bbox_mask(level["lat"], level["lon"], bbox)
+        return {name: values[mask] for name, values in level.items()}
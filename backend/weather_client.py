@@ -3,26 +3,95 @@ WeatherAPI Client
 Handles weather data retrieval for correlation with air quality
 """
 
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import orjson
 import requests
-from typing import Dict, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from typing import Any, Dict, List, Optional, Tuple
 from loguru import logger
 import config
+from backend.cache_manager import make_key
+from backend.http_session import ProcessLocalSession
 
 
 class WeatherAPIClient:
     """Client for WeatherAPI.com to fetch meteorological data"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, cache: Optional[Any] = None):
         """
         Initialize WeatherAPI client
         
         Args:
             api_key: WeatherAPI key (optional, uses config if not provided)
+            cache: CacheManager shared with the app, so responses are reused across
+                workers and users (an in-process cache is used if not provided)
         """
         self.api_key = api_key or getattr(config, 'WEATHER_API_KEY', '')
         self.base_url = "http://api.weatherapi.com/v1"
+        # Reuse pooled keep-alive connections instead of setting one up per request (one pool per process)
+        self._session = ProcessLocalSession(self._build_session)
+        self.cache = cache
+        self._cache: Dict[Tuple, Tuple[float, Dict]] = {}
+        self._cache_lock = threading.Lock()
         logger.info("WeatherAPI client initialized")
     
+    @staticmethod
+    def _build_session() -> requests.Session:
+        """Build the pooled session shared by this process's requests"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=config.WEATHER_POOL_SIZE, pool_maxsize=config.WEATHER_POOL_SIZE)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+    
+    @property
+    def session(self) -> requests.Session:
+        """Pooled session owned by the current process"""
+        return self._session.get()
+    
+    @session.setter
+    def session(self, session: requests.Session):
+        self._session.set(session)
+    
+    def close(self):
+        """Release the pooled connections held by the session"""
+        self._session.close()
+    
+    @staticmethod
+    def _cache_ttl(endpoint: str) -> int:
+        """Seconds a response stays fresh; forecasts change far less often than current conditions"""
+        return config.WEATHER_FORECAST_CACHE_TTL if endpoint == "forecast.json" else config.WEATHER_CACHE_TTL
+    
+    def _cache_get(self, endpoint: str, params: Dict) -> Optional[Dict]:
+        """Return a cached response that hasn't expired, if any"""
+        if self.cache is not None:
+            return self.cache.get(make_key(f"weather:{endpoint}", params))
+        with self._cache_lock:
+            cached = self._cache.get((endpoint, tuple(sorted(params.items()))))
+        if cached and time.monotonic() < cached[0]:
+            return cached[1]
+        return None
+    
+    def _cache_get_many(self, endpoint: str, params_list: List[Dict]) -> List[Optional[Dict]]:
+        """Return cached responses for several requests to one endpoint, reading the shared cache once"""
+        if self.cache is not None:
+            return self.cache.get_many([make_key(f"weather:{endpoint}", params) for params in params_list])
+        return [self._cache_get(endpoint, params) for params in params_list]
+    
+    def _cache_set(self, endpoint: str, params: Dict, data: Dict):
+        """Cache a successful response"""
+        ttl = self._cache_ttl(endpoint)
+        if self.cache is not None:
+            self.cache.set(make_key(f"weather:{endpoint}", params), data, timeout=ttl)
+            return
+        now = time.monotonic()
+        with self._cache_lock:
+            # Drop expired entries so the cache stays bounded by the number of recently viewed spots
+            self._cache = {k: v for k, v in self._cache.items() if now < v[0]}
+            self._cache[(endpoint, tuple(sorted(params.items())))] = (now + ttl, data)
+    
     def _make_request(self, endpoint: str, params: Dict) -> Dict:
         """
         Make request to WeatherAPI
@@ -34,46 +103,65 @@ class WeatherAPIClient:
         Returns:
             JSON response as dictionary
         """
+        cached = self._cache_get(endpoint, params)
+        if cached is not None:
+            return cached
+        return self._request(endpoint, params)
+    
+    def _request(self, endpoint: str, params: Dict) -> Dict:
+        """Request an endpoint from WeatherAPI, bypassing the cache lookup, and cache a successful response"""
         url = f"{self.base_url}/{endpoint}"
-        params["key"] = self.api_key
         
         try:
-            logger.debug(f"WeatherAPI request: {endpoint} with params: {params}")
-            response = requests.get(url, params=params, timeout=10)
+            logger.debug("WeatherAPI request: {} with params: {}", endpoint, params)
+            response = self.session.get(url, params={**params, "key": self.api_key}, timeout=10)
             response.raise_for_status()
             
-            data = response.json()
-            logger.debug(f"WeatherAPI response received")
+            data = orjson.loads(response.content)
+            logger.debug("WeatherAPI response received")
+            self._cache_set(endpoint, params, data)
             return data
             
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
             logger.error(f"WeatherAPI request failed: {e}")
             return {}
     
-    def get_current_weather(self, lat: float, lon: float) -> Dict:
-        """
-        Get current weather for coordinates
-        
-        Args:
-            lat: Latitude
-            lon: Longitude
-            
-        Returns:
-            Dictionary with weather data
-        """
-        params = {
-            "q": f"{lat},{lon}",
+    def _fetch_all(self, requests_list, cached: bool = True):
+        """Fetch several endpoints concurrently over the pooled session, returning responses in request order"""
+        fetch = self._make_request if cached else self._request
+        # A short-lived executor stays safe inside forked background-callback workers;
+        # _make_request never raises for HTTP errors, so one failure doesn't affect the others
+        with ThreadPoolExecutor(max_workers=min(len(requests_list), config.WEATHER_POOL_SIZE), thread_name_prefix="weather") as executor:
+            futures = [executor.submit(fetch, endpoint, params) for endpoint, params in requests_list]
+            return [future.result() for future in futures]
+    
+    @staticmethod
+    def _query(lat: float, lon: float) -> str:
+        """Location query rounded to ~1 km, so nearby requests share a cached response"""
+        return f"{round(lat, 2)},{round(lon, 2)}"
+    
+    def _current_params(self, lat: float, lon: float) -> Dict:
+        return {
+            "q": self._query(lat, lon),
             "aqi": "yes"  # Include air quality data if available
         }
-        
-        data = self._make_request("current.json", params)
-        
+    
+    def _forecast_params(self, lat: float, lon: float, days: int) -> Dict:
+        return {
+            "q": self._query(lat, lon),
+            "days": min(days, 10),
+            "aqi": "yes"
+        }
+    
+    @staticmethod
+    def _parse_current(data: Dict) -> Dict:
+        """Extract current conditions from a current.json response"""
         if not data:
             return {}
         
         current = data.get("current", {})
         
-        weather_data = {
+        return {
             "temperature_c": current.get("temp_c"),
             "temperature_f": current.get("temp_f"),
             "feels_like_c": current.get("feelslike_c"),
@@ -95,29 +183,10 @@ class WeatherAPIClient:
             "condition_icon": current.get("condition", {}).get("icon"),
             "last_updated": current.get("last_updated")
         }
-        
-        return weather_data
     
-    def get_forecast(self, lat: float, lon: float, days: int = 3) -> Dict:
-        """
-        Get weather forecast for coordinates
-        
-        Args:
-            lat: Latitude
-            lon: Longitude
-            days: Number of forecast days (1-10)
-            
-        Returns:
-            Dictionary with forecast data
-        """
-        params = {
-            "q": f"{lat},{lon}",
-            "days": min(days, 10),
-            "aqi": "yes"
-        }
-        
-        data = self._make_request("forecast.json", params)
-        
+    @staticmethod
+    def _parse_forecast(data: Dict) -> Dict:
+        """Extract daily summaries from a forecast.json response"""
         if not data:
             return {}
         
@@ -140,6 +209,98 @@ class WeatherAPIClient:
         
         return {"forecast": forecast_data}
     
+    def get_current_weather(self, lat: float, lon: float) -> Dict:
+        """
+        Get current weather for coordinates
+        
+        Args:
+            lat: Latitude
+            lon: Longitude
+            
+        Returns:
+            Dictionary with weather data
+        """
+        return self._parse_current(self._make_request("current.json", self._current_params(lat, lon)))
+    
+    def get_current_weather_batch(self, coords: List[Tuple[float, float]]) -> List[Dict]:
+        """
+        Get current weather for several coordinates with the requests in flight at once
+        
+        Args:
+            coords: List of (latitude, longitude) pairs
+            
+        Returns:
+            List of weather dictionaries in the order of coords (empty for failed requests)
+        """
+        if not coords:
+            return []
+        params_list = [self._current_params(lat, lon) for lat, lon in coords]
+        # One batched cache read; only the misses go out to the API, once per rounded spot
+        responses = self._cache_get_many("current.json", params_list)
+        missing: Dict[str, List[int]] = {}
+        for i, data in enumerate(responses):
+            if data is None:
+                missing.setdefault(params_list[i]["q"], []).append(i)
+        if missing:
+            fetched = self._fetch_all([("current.json", params_list[indices[0]]) for indices in missing.values()], cached=False)
+            for indices, data in zip(missing.values(), fetched):
+                for i in indices:
+                    responses[i] = data
+        return [self._parse_current(data) for data in responses]
+    
+    @staticmethod
+    def average_current_weather(weathers: List[Dict]) -> Dict:
+        """
+        Average the temperature, wind speed and humidity of several current-weather readings
+        
+        Args:
+            weathers: Weather dictionaries from get_current_weather_batch
+            
+        Returns:
+            Dictionary with the averaged readings, or empty if none are available
+        """
+        averaged = {}
+        for field, digits in (("temperature_c", 1), ("wind_speed_kph", 1), ("humidity", 0)):
+            values = [w[field] for w in weathers if w and isinstance(w.get(field), (int, float))]
+            if values:
+                mean = sum(values) / len(values)
+                averaged[field] = round(mean, digits) if digits else int(round(mean))
+        if averaged:
+            averaged["station_count"] = sum(1 for w in weathers if w)
+        return averaged
+    
+    def get_forecast(self, lat: float, lon: float, days: int = 3) -> Dict:
+        """
+        Get weather forecast for coordinates
+        
+        Args:
+            lat: Latitude
+            lon: Longitude
+            days: Number of forecast days (1-10)
+            
+        Returns:
+            Dictionary with forecast data
+        """
+        return self._parse_forecast(self._make_request("forecast.json", self._forecast_params(lat, lon, days)))
+    
+    def get_weather_bundle(self, lat: float, lon: float, days: int = 3) -> Tuple[Dict, Dict]:
+        """
+        Get current weather and forecast for coordinates with both requests in flight at once
+        
+        Args:
+            lat: Latitude
+            lon: Longitude
+            days: Number of forecast days (1-10)
+            
+        Returns:
+            Tuple of (current weather, forecast) dictionaries, as from get_current_weather and get_forecast
+        """
+        current, forecast = self._fetch_all([
+            ("current.json", self._current_params(lat, lon)),
+            ("forecast.json", self._forecast_params(lat, lon, days))
+        ])
+        return self._parse_current(current), self._parse_forecast(forecast)
+    
     def analyze_weather_air_quality_correlation(self, weather_data: Dict, aqi: float) -> Dict:
         """
         Analyze correlation between weather and air quality
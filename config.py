@@ -24,10 +24,19 @@ for dir_path in [DATA_DIR, LOGS_DIR, EXPORTS_DIR, CACHE_DIR]:
 # API Configuration
 OPENAQ_API_KEY = os.getenv("OPENAQ_API_KEY", "")
 OPENAQ_BASE_URL = "https://api.openaq.org/v3"
+OPENAQ_PAGE_LIMIT = int(os.getenv("OPENAQ_PAGE_LIMIT", "100"))  # Results per page for paginated fan-out
+OPENAQ_MAX_CONCURRENCY = int(os.getenv("OPENAQ_MAX_CONCURRENCY", "20"))  # Max in-flight requests
+OPENAQ_MAX_RETRIES = int(os.getenv("OPENAQ_MAX_RETRIES", "3"))  # Retries with backoff for rate-limited (429) or 5xx responses
+OPENAQ_REVALIDATE_SIZE = int(os.getenv("OPENAQ_REVALIDATE_SIZE", "256"))  # responses kept for ETag/Last-Modified revalidation
+OPENAQ_FRESH_TTL = int(os.getenv("OPENAQ_FRESH_TTL", "60"))  # seconds a kept response is reused without revalidating
 
 # WeatherAPI Configuration (Get free key from weatherapi.com)
 WEATHER_API_KEY = os.getenv("WEATHER_API_KEY", "")
 WEATHER_BASE_URL = "http://api.weatherapi.com/v1"
+WEATHER_CACHE_TTL = int(os.getenv("WEATHER_CACHE_TTL", "1800"))  # seconds to reuse current conditions for the same ~1 km spot
+WEATHER_FORECAST_CACHE_TTL = int(os.getenv("WEATHER_FORECAST_CACHE_TTL", "3600"))  # seconds to reuse a forecast
+WEATHER_POOL_SIZE = int(os.getenv("WEATHER_POOL_SIZE", "20"))  # pooled keep-alive connections to WeatherAPI
+WEATHER_SAMPLE_SIZE = int(os.getenv("WEATHER_SAMPLE_SIZE", "10"))  # stations averaged for the global weather stats
 
 # OpenAI Configuration (For Smart Analytics)
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
@@ -41,10 +50,14 @@ FLASK_SECRET_KEY = os.getenv("FLASK_SECRET_KEY", "dev-secret-key-change-in-produ
 # Server Configuration
 HOST = os.getenv("HOST", "0.0.0.0")
 PORT = int(os.getenv("PORT", "8050"))
+SERVER_WORKERS = int(os.getenv("WEB_CONCURRENCY", "2"))  # gunicorn worker processes
+SERVER_THREADS = int(os.getenv("SERVER_THREADS", "8"))  # requests served concurrently per worker
 
 # Cache Configuration
-CACHE_TYPE = os.getenv("CACHE_TYPE", "disk")
+CACHE_TYPE = os.getenv("CACHE_TYPE", "disk")  # "disk" (per host) or "redis" (shared across workers/hosts)
+CACHE_REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 CACHE_TIMEOUT = int(os.getenv("CACHE_TIMEOUT", "300"))  # 5 minutes
+CACHE_SIZE_LIMIT = int(os.getenv("CACHE_SIZE_LIMIT", str(256 * 1024 * 1024)))  # bytes, disk cache only
 
 # Logging Configuration
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -52,10 +65,30 @@ LOG_FILE = LOGS_DIR / "airwatch.log"
 
 # Data Refresh Configuration
 DATA_REFRESH_INTERVAL = int(os.getenv("DATA_REFRESH_INTERVAL", "300"))  # 5 minutes
+DATA_REFRESH_ENABLED = os.getenv("DATA_REFRESH_ENABLED", "True") == "True"  # Background refresh thread
+
+# Static Assets Configuration
+ASSETS_MAX_AGE = int(os.getenv("ASSETS_MAX_AGE", str(7 * 24 * 3600)))  # seconds
+SERVE_LOCALLY = os.getenv("SERVE_LOCALLY", "False") == "True"  # Serve Dash component bundles from this server instead of the CDN
 
 # Mapbox Configuration (Optional)
 MAPBOX_TOKEN = os.getenv("MAPBOX_TOKEN", "")
 
+# Map Clustering Configuration
+MAP_CLUSTER_THRESHOLD = int(os.getenv("MAP_CLUSTER_THRESHOLD", "500"))  # Cluster markers above this many stations
+MAP_CLUSTER_RADIUS = int(os.getenv("MAP_CLUSTER_RADIUS", "40"))  # pixels
+MAP_MAX_MARKERS = int(os.getenv("MAP_MAX_MARKERS", "200"))
+
+# Heatmap Tile Pyramid Configuration
+MAP_TILE_THRESHOLD = int(os.getenv("MAP_TILE_THRESHOLD", "2000"))  # Pre-aggregate heatmap above this many stations
+MAP_TILE_MAX_ZOOM = int(os.getenv("MAP_TILE_MAX_ZOOM", "14"))
+
+# Density Raster Configuration
+MAP_RASTER_THRESHOLD = int(os.getenv("MAP_RASTER_THRESHOLD", "10000"))  # Rasterize the density view above this many stations
+
+# Search Configuration
+SEARCH_DEBOUNCE_MS = int(os.getenv("SEARCH_DEBOUNCE_MS", "150"))  # Search after this much idle typing
+
 # Air Quality Index (AQI) Thresholds
 AQI_THRESHOLDS = {
     "pm25": [
@@ -0,0 +1,20 @@
+"""
+Gunicorn configuration
+Picked up automatically by `gunicorn app:server` when run from the project root
+"""
+
+import config
+
+bind = f"{config.HOST}:{config.PORT}"
+
+# Callbacks mostly wait on OpenAQ, WeatherAPI and the cache, so each worker serves
+# concurrent clients on threads instead of handling one request at a time
+worker_class = "gthread"
+workers = config.SERVER_WORKERS
+threads = config.SERVER_THREADS
+
+
+def post_worker_init(worker):
+    """Let the first worker to take the refresher lock keep the shared snapshot fresh"""
+    from app import start_data_refresher
+    start_data_refresher()
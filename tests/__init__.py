@@ -0,0 +1,4 @@
+"""
+AirWatch Tests
+Unit tests for the backend modules, run with `poetry run pytest`
+"""
@@ -0,0 +1,317 @@
+"""
+OpenAQ Client Tests
+Request handling against mocked HTTP transports
+"""
+
+import asyncio
+import threading
+import time
+
+import httpx
+import orjson
+import pytest
+import requests
+
+import config
+from backend import api_client
+from backend.api_client import OpenAQClient
+
+
+@pytest.fixture
+def client():
+    return OpenAQClient(api_key="test-key-1234")
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(api_client.asyncio, "sleep", sleep)
+    return delays
+
+
+def fetch_async(client, handler, endpoint="/locations", params=None):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http:
+            return await client._make_request_async(http, endpoint, params)
+    return asyncio.run(run())
+
+
+def test_async_retries_rate_limited_responses(client, sleeps):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": "2"})
+        if len(calls) == 2:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"results": [{"id": 1}]})
+
+    assert fetch_async(client, handler) == {"results": [{"id": 1}]}
+    assert len(calls) == 3
+    # Retry-After is honoured, otherwise exponential backoff
+    assert sleeps == [2.0, api_client.RETRY_BACKOFF * 2]
+
+
+def test_async_retries_are_bounded(client, sleeps):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(500)
+
+    data = fetch_async(client, handler)
+    assert data["status_code"] == 500
+    assert data["results"] == []
+    assert len(calls) == config.OPENAQ_MAX_RETRIES + 1
+    assert len(sleeps) == config.OPENAQ_MAX_RETRIES
+
+
+def test_async_retries_transport_errors(client, sleeps):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            raise httpx.ConnectError("connection reset", request=request)
+        return httpx.Response(200, json={"results": []})
+
+    assert fetch_async(client, handler) == {"results": []}
+    assert len(calls) == 2
+
+
+def test_async_does_not_retry_client_errors(client, sleeps):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(404)
+
+    assert fetch_async(client, handler)["status_code"] == 404
+    assert len(calls) == 1
+    assert sleeps == []
+
+
+@pytest.mark.parametrize("value, expected", [("3", 3.0), ("-1", 0.0), ("soon", None), (None, None),
+                                             ("Wed, 21 Oct 2015 07:28:00 GMT", 0.0)])
+def test_retry_after(value, expected):
+    headers = {"Retry-After": value} if value is not None else {}
+    assert api_client._retry_after(httpx.Response(429, headers=headers)) == expected
+
+
+class FakeSession:
+    """Stands in for requests.Session, answering from a list of (status, headers, body) tuples"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        self.calls.append(dict(headers or {}))
+        status, response_headers, body = self.responses.pop(0)
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(response_headers)
+        response._content = body
+        response.url = url
+        return response
+
+
+def test_revalidates_with_etag_and_reuses_body_on_304(client, monkeypatch):
+    monkeypatch.setattr(config, "OPENAQ_FRESH_TTL", 0)
+    client.session = FakeSession([
+        (200, {"ETag": '"v1"', "Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT"}, b'{"results": [{"id": 1}]}'),
+        (304, {"ETag": '"v1"'}, b""),
+    ])
+
+    first = client._make_request("/locations", {"limit": 1})
+    assert "If-None-Match" not in client.session.calls[0]
+
+    second = client._make_request("/locations", {"limit": 1})
+    assert second == {"results": [{"id": 1}]}
+    assert client.session.calls[1]["If-None-Match"] == '"v1"'
+    assert client.session.calls[1]["If-Modified-Since"] == "Wed, 21 Oct 2015 07:28:00 GMT"
+    assert client.session.calls[1]["X-API-Key"] == "test-key-1234"
+    assert first is not second
+
+
+def test_cached_body_is_not_shared_with_callers(client):
+    client.session = FakeSession([(200, {"ETag": '"v1"'}, b'{"results": [{"id": 1}]}')])
+
+    client._make_request("/locations")["results"].append({"id": 2})
+    # Within OPENAQ_FRESH_TTL the cached body answers without a request
+    assert client._make_request("/locations") == {"results": [{"id": 1}]}
+    assert len(client.session.calls) == 1
+
+
+def test_async_revalidates_with_etag(client, monkeypatch):
+    monkeypatch.setattr(config, "OPENAQ_FRESH_TTL", 0)
+    seen = []
+
+    def handler(request):
+        seen.append(request.headers.get("If-None-Match"))
+        if len(seen) == 1:
+            return httpx.Response(200, headers={"ETag": '"v1"'}, json={"results": [{"id": 1}]})
+        return httpx.Response(304)
+
+    assert fetch_async(client, handler) == {"results": [{"id": 1}]}
+    assert fetch_async(client, handler) == {"results": [{"id": 1}]}
+    assert seen == [None, '"v1"']
+
+
+@pytest.mark.parametrize("revalidate, requests_made", [(False, 1), (True, 2)])
+def test_explicit_refresh_skips_freshness_window(client, revalidate, requests_made):
+    client.session = FakeSession([
+        (200, {"ETag": '"v1"'}, b'{"results": [{"id": 1}]}'),
+        (304, {"ETag": '"v1"'}, b""),
+    ])
+
+    client.get_locations(limit=5)
+    assert client.get_locations(limit=5, revalidate=revalidate) == [{"id": 1}]
+    assert len(client.session.calls) == requests_made
+    if revalidate:
+        assert client.session.calls[1]["If-None-Match"] == '"v1"'
+
+
+@pytest.mark.parametrize("revalidate, requests_made", [(False, 1), (True, 2)])
+def test_explicit_refresh_skips_freshness_window_async(client, revalidate, requests_made):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(200, headers={"ETag": '"v1"'}, json={"results": [{"id": 1}]})
+        return httpx.Response(304)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http:
+            await client._make_request_async(http, "/locations")
+            return await client._make_request_async(http, "/locations", revalidate=revalidate)
+
+    assert asyncio.run(run()) == {"results": [{"id": 1}]}
+    assert len(calls) == requests_made
+
+
+def fake_pages(client, monkeypatch, page_sizes, gate=None):
+    """Serve measurement pages of the given sizes, optionally holding pages after the first on gate"""
+    pages = []
+
+    def make_request(endpoint, params=None, revalidate=False):
+        pages.append(params["page"])
+        if gate is not None and params["page"] > 1:
+            gate.wait(5)
+        size = page_sizes[params["page"] - 1] if params["page"] <= len(page_sizes) else 0
+        return {"results": [{"page": params["page"], "i": i} for i in range(size)]}
+
+    monkeypatch.setattr(client, "_make_request", make_request)
+    return pages
+
+
+def test_iter_measurements_reads_every_page(client, monkeypatch):
+    pages = fake_pages(client, monkeypatch, [3, 3, 1])
+    assert [m["page"] for m in client.iter_measurements(7, page_size=3)] == [1, 1, 1, 2, 2, 2, 3]
+    # The short third page ends iteration without requesting a fourth
+    assert pages == [1, 2, 3]
+
+
+def test_iter_measurements_respects_max_pages(client, monkeypatch):
+    pages = fake_pages(client, monkeypatch, [3, 3, 3])
+    assert len(list(client.iter_measurements(7, page_size=3, max_pages=2))) == 6
+    assert pages == [1, 2]
+
+
+def test_iter_measurements_early_stop_does_not_wait_for_prefetch(client, monkeypatch):
+    gate = threading.Event()
+    pages = fake_pages(client, monkeypatch, [3, 3, 3], gate=gate)
+    shutdowns = []
+
+    class RecordingExecutor(api_client.ThreadPoolExecutor):
+        def shutdown(self, wait=True, *, cancel_futures=False):
+            shutdowns.append((wait, cancel_futures))
+            super().shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    monkeypatch.setattr(api_client, "ThreadPoolExecutor", RecordingExecutor)
+
+    measurements = client.iter_measurements(7, page_size=3)
+    assert next(measurements)["page"] == 1
+    deadline = time.monotonic() + 5
+    while pages != [1, 2] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    started = time.monotonic()
+    measurements.close()
+    # The prefetch of page 2 is still held on the gate, so returning here means close didn't join it
+    assert time.monotonic() - started < 1
+    assert not gate.is_set()
+    # Queued prefetches are cancelled; the one already in flight finishes in the background
+    assert shutdowns == [(False, True)]
+    gate.set()
+    assert pages == [1, 2]
+
+
+SITES = [{"id": i, "coordinates": {"latitude": lat, "longitude": lon}}
+         for i, (lat, lon) in enumerate([(10.0, 175.0), (12.0, -175.0), (15.0, 0.0), (20.0, 90.0), (-40.0, -60.0)])]
+
+
+def bbox_session(sites=SITES):
+    body = orjson.dumps({"results": sites})
+    return FakeSession([(200, {}, body)] * 10)
+
+
+def test_bbox_inside_cached_box_is_filtered_locally(client):
+    client.session = bbox_session()
+    assert len(client.get_locations_by_bbox(-90, -180, 90, 180)) == 5
+    assert [loc["id"] for loc in client.get_locations_by_bbox(5, -10, 25, 100)] == [2, 3]
+    assert len(client.session.calls) == 1
+
+
+def test_bbox_partly_outside_cached_box_is_requested(client):
+    client.session = bbox_session(SITES[2:4])
+    client.get_locations_by_bbox(0, -10, 30, 100)
+    client.get_locations_by_bbox(0, 50, 30, 120)
+    client.get_locations_by_bbox(-10, -10, 30, 100)
+    assert len(client.session.calls) == 3
+
+
+def test_wrapped_bbox_inside_world_box(client):
+    client.session = bbox_session()
+    client.get_locations_by_bbox(-90, -180, 90, 180)
+    assert [loc["id"] for loc in client.get_locations_by_bbox(0, 170, 30, -170)] == [0, 1]
+    assert len(client.session.calls) == 1
+
+
+def test_boxes_inside_wrapped_cached_box(client):
+    client.session = bbox_session(SITES[:2])
+    client.get_locations_by_bbox(0, 160, 30, -160)
+    assert [loc["id"] for loc in client.get_locations_by_bbox(5, 170, 15, -170)] == [0, 1]
+    assert [loc["id"] for loc in client.get_locations_by_bbox(5, 170, 15, 180)] == [0]
+    assert [loc["id"] for loc in client.get_locations_by_bbox(5, -180, 15, -170)] == [1]
+    assert len(client.session.calls) == 1
+    # Spans the part of the globe the wrapped box leaves out
+    client.get_locations_by_bbox(5, -170, 15, 170)
+    assert len(client.session.calls) == 2
+
+
+def test_truncated_bbox_result_is_not_reused(client):
+    client.session = bbox_session()
+    client.get_locations_by_bbox(-90, -180, 90, 180, limit=5)
+    client.get_locations_by_bbox(5, -10, 25, 100, limit=5)
+    assert len(client.session.calls) == 2
+
+
+@pytest.mark.parametrize("outer, inner, expected", [
+    ((-10, 10), (-5, 5), True),
+    ((-10, 10), (-5, 15), False),
+    ((-180, 180), (170, -170), True),
+    ((-170, 170), (175, -175), False),
+    ((160, -160), (170, -170), True),
+    ((160, -160), (150, -170), False),
+    ((160, -160), (165, 175), True),
+    ((160, -160), (-175, -165), True),
+    ((160, -160), (-170, 170), False),
+])
+def test_lon_range_contains(outer, inner, expected):
+    assert api_client._lon_range_contains(outer, inner) is expected
@@ -0,0 +1,136 @@
+"""
+Cache Manager Tests
+Disk and Redis backends behind CacheManager
+"""
+
+import fnmatch
+
+import pytest
+import redis
+
+import config
+from backend import cache_manager
+from backend.cache_manager import CacheManager, RedisCache
+
+
+class FakeRedis:
+    """In-memory stand-in for the redis.Redis calls RedisCache makes"""
+
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+        self.mget_calls = 0
+
+    def ping(self):
+        return True
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def mget(self, keys):
+        self.mget_calls += 1
+        return [self.data.get(key) for key in keys]
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.expiry[key] = ex
+        return True
+
+    def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def scan_iter(self, match="*"):
+        return [key for key in list(self.data) if fnmatch.fnmatch(key, match)]
+
+    def info(self, section=None):
+        return {"used_memory": sum(len(value) for value in self.data.values())}
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    client = FakeRedis()
+    monkeypatch.setattr(cache_manager.redis.Redis, "from_url", staticmethod(lambda url: client))
+    return client
+
+
+@pytest.fixture
+def redis_cache(fake_redis, tmp_path):
+    return CacheManager(cache_dir=tmp_path, cache_type="redis")
+
+
+@pytest.fixture
+def disk_cache(tmp_path):
+    manager = CacheManager(cache_dir=tmp_path, cache_type="disk")
+    yield manager
+    manager.cache.close()
+
+
+def test_redis_round_trip(redis_cache, fake_redis):
+    assert isinstance(redis_cache.cache, RedisCache)
+    assert redis_cache.set("stations", {"count": 3}, timeout=60)
+    assert redis_cache.get("stations") == {"count": 3}
+    # Keys are namespaced and the timeout becomes the Redis expiry
+    assert fake_redis.expiry == {"airwatch:stations": 60}
+    assert redis_cache.delete("stations")
+    assert redis_cache.get("stations") is None
+
+
+def test_redis_get_many_is_one_round_trip(redis_cache, fake_redis):
+    redis_cache.set("a", 1)
+    redis_cache.set("c", [3])
+    assert redis_cache.get_many(["a", "b", "c"]) == [1, None, [3]]
+    assert fake_redis.mget_calls == 1
+    assert (redis_cache.hits, redis_cache.misses) == (2, 1)
+
+
+def test_redis_clear_only_removes_namespaced_keys(redis_cache, fake_redis):
+    fake_redis.set("other-app:key", b"keep")
+    redis_cache.set("a", 1)
+    redis_cache.set("b", 2)
+    assert len(redis_cache.cache) == 2
+    assert redis_cache.clear()
+    assert len(redis_cache.cache) == 0
+    assert fake_redis.get("other-app:key") == b"keep"
+
+
+def test_redis_stats(redis_cache):
+    redis_cache.set("a", 1)
+    stats = redis_cache.get_stats()
+    assert (stats["type"], stats["size"]) == ("redis", 1)
+    assert stats["volume"] > 0
+    assert stats["directory"] == config.CACHE_REDIS_URL
+
+
+def test_falls_back_to_disk_when_redis_is_unreachable(monkeypatch, tmp_path):
+    def unreachable(url):
+        raise redis.ConnectionError("connection refused")
+
+    monkeypatch.setattr(cache_manager.redis.Redis, "from_url", staticmethod(unreachable))
+    manager = CacheManager(cache_dir=tmp_path, cache_type="redis")
+    assert manager.cache_type == "disk"
+    assert manager.set("a", 1)
+    assert manager.get("a") == 1
+    manager.cache.close()
+
+
+def test_disk_get_many(disk_cache):
+    assert disk_cache.get_many([]) == []
+    disk_cache.set("a", 1)
+    disk_cache.set("c", {"x": 3})
+    assert disk_cache.get_many(["a", "b", "c"]) == [1, None, {"x": 3}]
+    assert (disk_cache.hits, disk_cache.misses) == (2, 1)
+
+
+def test_disk_size_limit_evicts_least_recently_read(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "CACHE_SIZE_LIMIT", 1_000_000)
+    manager = CacheManager(cache_dir=tmp_path, cache_type="disk")
+    value = b"x" * 40_000
+    for i in range(60):
+        manager.set(f"k{i}", value)
+        # Reading k0 keeps it recently used while k1 is never read again
+        assert manager.get("k0") == value
+    assert manager.cache.volume() <= 1_000_000 + len(value)
+    assert manager.get("k0") == value
+    assert manager.get("k1") is None
+    assert manager.get("k59") == value
+    manager.cache.close()
@@ -0,0 +1,64 @@
+"""
+Cluster Index Tests
+Station clustering for the map view
+"""
+
+import numpy as np
+import pytest
+
+from backend.cluster_index import ClusterIndex, bbox_mask
+
+
+@pytest.fixture
+def stations():
+    rng = np.random.default_rng(0)
+    lat = rng.uniform(-60, 70, 2000)
+    lon = rng.uniform(-180, 180, 2000)
+    aqi = rng.uniform(0, 300, 2000)
+    return lat, lon, aqi
+
+
+@pytest.mark.parametrize("zoom", [0, 1.5, 4, 8, 14])
+def test_clusters_conserve_station_count(stations, zoom):
+    index = ClusterIndex(*stations)
+    clusters = index.get_clusters(zoom=zoom)
+    assert clusters["count"].sum() == len(index)
+
+
+@pytest.mark.parametrize("max_clusters", [1, 10, 50, 200])
+def test_clusters_respect_max_clusters(stations, max_clusters):
+    clusters = ClusterIndex(*stations).get_clusters(zoom=10, max_clusters=max_clusters)
+    assert len(clusters["count"]) <= max_clusters
+    assert clusters["count"].sum() == len(stations[0])
+
+
+def test_cluster_max_aqi_and_members(stations):
+    lat, lon, aqi = stations
+    clusters = ClusterIndex(lat, lon, aqi).get_clusters(zoom=14, max_clusters=len(lat))
+    assert clusters["max_aqi"].max() == pytest.approx(aqi.max())
+    singles = clusters["count"] == 1
+    members = clusters["member"][singles]
+    np.testing.assert_allclose(clusters["lat"][singles], lat[members])
+    np.testing.assert_allclose(clusters["max_aqi"][singles], aqi[members])
+
+
+def test_clusters_in_bbox(stations):
+    lat, lon, aqi = stations
+    bbox = (-10.0, 35.0, 30.0, 60.0)
+    clusters = ClusterIndex(lat, lon, aqi).get_clusters(bbox=bbox, zoom=4)
+    assert clusters["count"].sum() == bbox_mask(lat, lon, bbox).sum()
+
+
+def test_clusters_across_antimeridian(stations):
+    lat, lon, aqi = stations
+    bbox = (170.0, -50.0, -170.0, 50.0)
+    expected = ((lon >= 170) | (lon <= -170)) & (lat >= -50) & (lat <= 50)
+    clusters = ClusterIndex(lat, lon, aqi).get_clusters(bbox=bbox, zoom=3, max_clusters=20)
+    assert expected.any()
+    assert clusters["count"].sum() == expected.sum()
+    assert len(clusters["count"]) <= 20
+
+
+def test_empty_viewport(stations):
+    clusters = ClusterIndex(*stations).get_clusters(bbox=(0.0, 80.0, 1.0, 81.0))
+    assert all(len(values) == 0 for values in clusters.values())
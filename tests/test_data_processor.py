@@ -0,0 +1,74 @@
+"""
+Data Processor Tests
+Batch processing must match per-location processing
+"""
+
+import math
+
+import pytest
+
+from backend import data_processor
+from backend.data_processor import DataProcessor
+
+
+LOCATIONS = [
+    {"id": 1, "name": "Full", "locality": "Centre", "country": {"name": "France", "code": "FR"},
+     "coordinates": {"latitude": 48.85, "longitude": 2.35},
+     "sensors": [{"id": 10, "parameter": {"name": "PM25", "units": "µg/m³"}}]},
+    {"id": 2, "name": "No coordinates", "country": {"name": "Germany", "code": "DE"}},
+    {"id": 3, "name": "Null coordinates", "coordinates": None, "country": {"name": "Spain", "code": "ES"}},
+    {"id": 4, "name": "List coordinates", "coordinates": [1.0, 2.0], "country": {"name": "Italy", "code": "IT"}},
+    {"id": 5, "name": "Partial coordinates", "coordinates": {"latitude": 10.5}},
+    {"id": 6, "name": "No country", "coordinates": {"latitude": 1.0, "longitude": 2.0}},
+    {"id": 7, "name": "Null country", "country": None},
+    {"id": 8, "name": "String country", "country": "Portugal"},
+    {"id": 9, "name": "Partial country", "country": {"code": "NL"}},
+    {"id": 10},
+]
+
+
+@pytest.fixture(scope="module")
+def processor():
+    return DataProcessor()
+
+
+def normalize(record):
+    # NaN and None are both "missing"; values compare at the batch's float32 precision
+    return {key: (None if isinstance(value, float) and math.isnan(value)
+                  else round(value, 4) if isinstance(value, float) else value)
+            for key, value in record.items()}
+
+
+@pytest.mark.parametrize("location", LOCATIONS, ids=lambda loc: loc.get("name", "empty"))
+def test_process_batch_matches_process_location_data(processor, location):
+    [batch] = processor.process_batch([location]).to_dict("records")
+    assert normalize(batch) == normalize(processor.process_location_data(location))
+
+
+def test_process_batch_keeps_order_and_skips_empty(processor):
+    df = processor.process_batch([LOCATIONS[0], None, {}, LOCATIONS[1]])
+    assert df["location_id"].tolist() == ["1", "2"]
+
+
+def test_process_batch_empty(processor):
+    df = processor.process_batch([])
+    assert df.empty
+    assert list(df.columns) == list(processor.process_location_data(LOCATIONS[0]))
+
+
+@pytest.mark.parametrize("aqi, category, color", [
+    (0, "Good", "#00e400"), (50, "Good", "#00e400"), (50.4, "Good", "#00e400"), (50.6, "Moderate", "#ffff00"),
+    (150, "Unhealthy for Sensitive Groups", "#ff7e00"), (301, "Hazardous", "#7e0023"),
+    (float("nan"), "Hazardous", "#7e0023"),
+])
+def test_aqi_category_and_color(processor, aqi, category, color):
+    assert processor.get_aqi_category(aqi) == category
+    assert processor.get_aqi_color(aqi) == color
+
+
+def test_aqi_lookups_share_rounded_cache_entries(processor):
+    data_processor._aqi_category.cache_clear()
+    for aqi in (42.0, 42.3, 41.7, 42):
+        processor.get_aqi_category(aqi)
+    info = data_processor._aqi_category.cache_info()
+    assert (info.misses, info.hits) == (1, 3)
@@ -0,0 +1,34 @@
+"""
+Database Tests
+Favorites cache invalidation across connections
+"""
+
+import os
+
+from backend.database import Database
+
+
+def test_favorites_seen_across_instances(tmp_path):
+    # Two instances stand in for two worker processes sharing one database file
+    writer = Database(tmp_path / "airwatch.db")
+    reader = Database(tmp_path / "airwatch.db")
+    assert not reader.is_favorite("42")
+
+    writer.add_favorite("42", "Paris Centre", "France")
+    assert reader.is_favorite("42")
+
+    writer.remove_favorite("42")
+    assert not reader.is_favorite("42")
+
+
+def test_favorites_reload_within_one_mtime_tick(tmp_path):
+    db_path = tmp_path / "airwatch.db"
+    writer = Database(db_path)
+    reader = Database(db_path)
+    stat = os.stat(db_path)
+    assert not reader.is_favorite("1")
+    for i in range(1, 6):
+        writer.add_favorite(str(i), f"Station {i}")
+        # On filesystems with a coarse clock, back-to-back commits leave the mtime unchanged
+        os.utime(db_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert reader.is_favorite(str(i))
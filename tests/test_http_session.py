@@ -0,0 +1,67 @@
+"""
+HTTP Session Tests
+Pooled sessions are rebuilt in forked processes
+"""
+
+import multiprocessing
+import os
+
+import pytest
+
+from backend import http_session
+from backend.api_client import OpenAQClient
+from backend.http_session import ProcessLocalSession
+
+
+class RecordingSession:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_session_is_reused_within_a_process():
+    sessions = ProcessLocalSession(RecordingSession)
+    assert sessions.get() is sessions.get()
+
+
+def test_session_is_rebuilt_after_fork(monkeypatch):
+    sessions = ProcessLocalSession(RecordingSession)
+    parent = sessions.get()
+
+    monkeypatch.setattr(http_session.os, "getpid", lambda: -1)
+    child = sessions.get()
+    assert child is not parent
+    # The parent's pooled sockets are left alone
+    assert not parent.closed
+
+
+def test_close_only_releases_sessions_this_process_owns(monkeypatch):
+    sessions = ProcessLocalSession(RecordingSession)
+    parent = sessions.get()
+    monkeypatch.setattr(http_session.os, "getpid", lambda: -1)
+    sessions.close()
+    assert not parent.closed
+
+    monkeypatch.undo()
+    owned = sessions.get()
+    sessions.close()
+    assert owned.closed
+
+
+def _child_session_id(client, queue):
+    queue.put(id(client.session))
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_forked_worker_gets_its_own_client_session():
+    client = OpenAQClient(api_key="test-key-1234")
+    parent_id = id(client.session)
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    worker = context.Process(target=_child_session_id, args=(client, queue))
+    worker.start()
+    child_id = queue.get(timeout=10)
+    worker.join(10)
+    assert child_id != parent_id
@@ -0,0 +1,62 @@
+"""
+Raster Tests
+Server-side density image for the map view
+"""
+
+import base64
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from backend.raster import render_density_image
+
+
+COLORSCALE = [[0, "rgb(0,228,0)"], [0.5, "rgb(255,126,0)"], [1, "rgb(126,0,35)"]]
+
+
+def decode(layer):
+    data = base64.b64decode(layer["source"].split(",", 1)[1])
+    return np.asarray(Image.open(io.BytesIO(data)))
+
+
+@pytest.fixture
+def stations():
+    rng = np.random.default_rng(0)
+    return rng.uniform(-50, 60, 300), rng.uniform(-170, 170, 300), rng.uniform(0, 300, 300)
+
+
+def test_renders_image_layer(stations):
+    layer = render_density_image(*stations, COLORSCALE, width=128, height=64)
+    assert layer["sourcetype"] == "image"
+    pixels = decode(layer)
+    assert pixels.shape == (64, 128, 4)
+    assert (pixels[..., 3] > 0).any()
+
+
+def test_empty_bbox_returns_none(stations):
+    assert render_density_image(*stations, COLORSCALE, bbox=(0.0, 80.0, 1.0, 81.0)) is None
+    assert render_density_image([], [], [], COLORSCALE) is None
+
+
+def test_antimeridian_bbox_falls_back_to_data_extent(stations):
+    lat, lon, aqi = stations
+    layer = render_density_image(lat, lon, aqi, COLORSCALE, bbox=(170.0, -60.0, -170.0, 60.0), width=64, height=32)
+    (west, north), _, (east, south), _ = layer["coordinates"]
+    assert (west, east) == pytest.approx((lon.min(), lon.max()))
+    assert (south, north) == pytest.approx((lat.min(), lat.max()))
+
+
+def test_non_finite_stations_are_skipped(stations):
+    lat, lon, aqi = stations
+    bbox = (-180.0, -60.0, 180.0, 70.0)
+    expected = decode(render_density_image(lat, lon, aqi, COLORSCALE, bbox=bbox, width=128, height=64))
+
+    with_nan = render_density_image(np.append(lat, [10.0, np.nan, 20.0]), np.append(lon, [10.0, 5.0, np.inf]),
+                                    np.append(aqi, [np.nan, 50.0, 80.0]), COLORSCALE, bbox=bbox, width=128, height=64)
+    np.testing.assert_array_equal(decode(with_nan), expected)
+
+
+def test_only_non_finite_stations_returns_none():
+    assert render_density_image([10.0, np.nan], [10.0, 20.0], [np.nan, 40.0], COLORSCALE) is None
@@ -0,0 +1,19 @@
+"""
+Report Generator Tests
+PDF reports built from processed location data
+"""
+
+from pathlib import Path
+
+from backend.report_generator import ReportGenerator
+
+
+def test_comparison_report_with_null_fields(tmp_path):
+    locations = [
+        {"name": None, "country": None, "max_aqi": 55, "max_aqi_category": None},
+        {"name": "Paris Centre", "country": "France", "max_aqi": 42, "max_aqi_category": "Good"},
+        {"name": "Multi\nline", "country": "France", "max_aqi": 12, "max_aqi_category": "Good"},
+    ]
+    path = Path(ReportGenerator(output_dir=tmp_path).generate_comparison_report(locations))
+    assert path.exists()
+    assert path.read_bytes().startswith(b"%PDF")
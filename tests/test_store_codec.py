@@ -0,0 +1,98 @@
+"""
+Store Codec Tests
+Round-trips through the compressed dcc.Store payload
+"""
+
+import pandas as pd
+import pytest
+
+from backend.store_codec import decode_frame, decode_records, encode_records, lookup_record, search_records
+
+
+RECORDS = [
+    {"id": 1, "location_id": "1", "name": "Paris Centre", "country": "France", "country_code": "FR",
+     "lat": 48.85, "lon": 2.35, "coordinates": {"latitude": 48.85, "longitude": 2.35}, "max_aqi": 42},
+    {"id": 2, "location_id": "2", "name": "Berlin Mitte", "country": "Germany", "country_code": "DE",
+     "lat": 52.52, "lon": 13.40, "coordinates": {"latitude": 52.52, "longitude": 13.40}, "max_aqi": 77},
+    {"id": 3, "location_id": "3", "name": "Lyon", "country": "France", "country_code": "FR",
+     "lat": 45.76, "lon": 4.84, "coordinates": {"latitude": 45.76, "longitude": 4.84}, "max_aqi": 12},
+]
+
+
+@pytest.fixture
+def payload():
+    return encode_records(pd.DataFrame(RECORDS))
+
+
+def test_decode_records_round_trip(payload):
+    assert decode_records(payload) == RECORDS
+
+
+def test_decode_records_columns(payload):
+    assert decode_records(payload, columns=["name", "missing"]) == [{"name": r["name"]} for r in RECORDS]
+
+
+def test_decode_frame_round_trip(payload):
+    pd.testing.assert_frame_equal(decode_frame(payload), pd.DataFrame(RECORDS))
+
+
+def test_decode_frame_fills_missing_columns(payload):
+    df = decode_frame(payload, columns=["name", "missing"])
+    assert list(df.columns) == ["name", "missing"]
+    assert df["missing"].isna().all()
+
+
+def test_decode_frame_returns_copies(payload):
+    decode_frame(payload)["name"] = "changed"
+    assert decode_frame(payload)["name"].tolist() == [r["name"] for r in RECORDS]
+
+
+@pytest.mark.parametrize("empty", [None, "", []])
+def test_empty_payloads(empty):
+    assert decode_records(empty) == []
+    assert decode_frame(empty, columns=["name"]).empty
+    assert lookup_record(empty, "1") is None
+    assert search_records(empty, "paris") == []
+
+
+def test_list_payloads_match_encoded(payload):
+    assert decode_records(RECORDS) == decode_records(payload)
+    pd.testing.assert_frame_equal(decode_frame(RECORDS, columns=["name", "lat"]),
+                                  decode_frame(payload, columns=["name", "lat"]))
+    assert lookup_record(RECORDS, 2) == lookup_record(payload, 2)
+    assert search_records(RECORDS, "fr") == search_records(payload, "fr")
+
+
+def test_lookup_record(payload):
+    assert lookup_record(payload, "2") == RECORDS[1]
+    assert lookup_record(payload, 3) == RECORDS[2]
+    assert lookup_record(payload, "404") is None
+
+
+def test_lookup_record_falls_back_to_id():
+    records = [{"id": 7, "location_id": "", "name": "No location ID"}]
+    assert lookup_record(encode_records(pd.DataFrame(records)), "7") == records[0]
+    assert lookup_record(records, "7") == records[0]
+
+
+def test_search_records(payload):
+    assert [r["name"] for r in search_records(payload, "fr")] == ["Paris Centre", "Lyon"]
+    assert [r["name"] for r in search_records(payload, "germany")] == ["Berlin Mitte"]
+    assert [r["name"] for r in search_records(payload, "fr", limit=1)] == ["Paris Centre"]
+    assert search_records(payload, "tokyo") == []
+
+
+def test_search_records_does_not_match_across_fields(payload):
+    # "lyon" + "france" must not match a query spanning both fields
+    assert search_records(payload, "lyonfrance") == []
+    assert search_records(payload, "lyon france") == []
+
+
+def test_encode_records_with_malformed_coordinates():
+    records = [
+        {"location_id": "1", "coordinates": {"latitude": 48.85, "longitude": 2.35}},
+        {"location_id": "2", "coordinates": [1.0, 2.0]},
+        {"location_id": "3", "coordinates": None},
+    ]
+    decoded = decode_records(encode_records(pd.DataFrame(records)))
+    assert [r["coordinates"] for r in decoded] == [records[0]["coordinates"], None, None]
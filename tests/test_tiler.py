@@ -0,0 +1,38 @@
+"""
+Tiler Tests
+Pre-aggregated heatmap tile pyramid
+"""
+
+import numpy as np
+import pytest
+
+from backend.tiler import TilePyramid
+
+
+@pytest.fixture
+def pyramid():
+    rng = np.random.default_rng(0)
+    lat = rng.uniform(-60, 70, 500)
+    lon = rng.uniform(-180, 180, 500)
+    aqi = rng.uniform(0, 300, 500)
+    return TilePyramid(lat, lon, aqi, max_zoom=6)
+
+
+def level_zoom(tiles):
+    return set((tiles["cell"] >> 58).tolist())
+
+
+@pytest.mark.parametrize("zoom, expected", [(-3, 0), (0, 0), (2.9, 2), (6, 6), (6.5, 6), (20, 6)])
+def test_zoom_is_clamped(pyramid, zoom, expected):
+    assert level_zoom(pyramid.get_tiles(zoom=zoom)) == {expected}
+
+
+@pytest.mark.parametrize("zoom", range(7))
+def test_levels_conserve_station_count(pyramid, zoom):
+    assert pyramid.get_tiles(zoom=zoom)["count"].sum() == 500
+
+
+def test_tiles_in_bbox(pyramid):
+    tiles = pyramid.get_tiles(bbox=(170.0, -90.0, -170.0, 90.0), zoom=6)
+    assert len(tiles["cell"]) > 0
+    assert ((tiles["lon"] >= 170) | (tiles["lon"] <= -170)).all()